@@ -0,0 +1,203 @@
+"""
+Per-account send health and circuit breaking.
+
+Every send attempt is recorded with its latency and outcome. From a rolling
+window we derive the error rate and latency percentiles, and a circuit
+breaker per account decides whether sends may proceed:
+
+- closed:    sends flow normally
+- open:      sends are paused until the cooldown expires (auth failures
+             such as expired cookies open the circuit immediately)
+- half_open: one probe send is allowed; success closes the circuit,
+             failure re-opens it with a doubled cooldown
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+AUTH_FAILURE_CODES = (401, 403)
+
+
+def is_auth_failure(status_code: Optional[int], body: str = '') -> bool:
+    """Detect expired cookies / invalid credentials from a Zoho response"""
+    if status_code in AUTH_FAILURE_CODES:
+        return True
+    body = (body or '')[:500].upper()
+    return 'INVALID_TOKEN' in body or 'AUTHENTICATION_FAILURE' in body or 'OAUTH_SCOPE_MISMATCH' in body
+
+
+class AccountHealth:
+    """Rolling send statistics and breaker state for one account"""
+
+    def __init__(self, window_size: int, window_seconds: float):
+        self.samples = deque(maxlen=window_size)  # (timestamp, ok, latency)
+        self.window_seconds = window_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.cooldown = 0.0
+        self.trips = 0
+        self.reason = ''
+        self.auth_failed = False
+        self.probe_in_flight = False
+        self.probe_started_at = 0.0
+        self.total_sent = 0
+        self.total_failed = 0
+        self.last_error = None
+        self.last_success_at = None
+
+    def _recent(self, now: float):
+        cutoff = now - self.window_seconds
+        return [s for s in self.samples if s[0] >= cutoff]
+
+    def summary(self, now: float) -> Dict[str, Any]:
+        recent = self._recent(now)
+        latencies = sorted(s[2] for s in recent)
+        failures = sum(1 for s in recent if not s[1])
+
+        def pct(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))], 3)
+
+        retry_in = max(0.0, self.opened_at + self.cooldown - now) if self.state == OPEN else 0.0
+        return {
+            'state': self.state,
+            'reason': self.reason,
+            'auth_failed': self.auth_failed,
+            'error_rate': round(failures / len(recent) * 100, 1) if recent else 0,
+            'samples': len(recent),
+            'latency_p50': pct(50),
+            'latency_p95': pct(95),
+            'latency_p99': pct(99),
+            'consecutive_failures': self.consecutive_failures,
+            'retry_in': round(retry_in, 1),
+            'trips': self.trips,
+            'total_sent': self.total_sent,
+            'total_failed': self.total_failed,
+            'last_error': self.last_error,
+            'last_success_at': self.last_success_at,
+        }
+
+
+class AccountHealthTracker:
+    """Health models and circuit breakers for all sending accounts"""
+
+    def __init__(self, window_size: int = 100, window_seconds: float = 300,
+                 error_rate_threshold: float = 0.5, min_samples: int = 10,
+                 consecutive_failure_threshold: int = 5,
+                 base_cooldown: float = 30, max_cooldown: float = 900,
+                 auth_cooldown: float = 600, probe_timeout: float = 120):
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.consecutive_failure_threshold = consecutive_failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.auth_cooldown = auth_cooldown
+        self.probe_timeout = probe_timeout
+        self._accounts: Dict[Any, AccountHealth] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, account_id: Any) -> AccountHealth:
+        health = self._accounts.get(account_id)
+        if health is None:
+            health = self._accounts[account_id] = AccountHealth(self.window_size, self.window_seconds)
+        return health
+
+    def allow(self, account_id: Any) -> Tuple[bool, float, str]:
+        """Check whether a send may proceed
+
+        Returns (allowed, wait_seconds, state). When the cooldown of an open
+        circuit has elapsed the first caller is let through as the
+        half-open probe; others keep waiting until it reports back.
+        """
+        now = time.time()
+        with self._lock:
+            health = self._get(account_id)
+            if health.state == CLOSED:
+                return True, 0.0, CLOSED
+            if health.state == OPEN:
+                remaining = health.opened_at + health.cooldown - now
+                if remaining > 0:
+                    return False, remaining, OPEN
+                health.state = HALF_OPEN
+                health.probe_in_flight = False
+            # A probe that never reported back (e.g. its thread died) must not
+            # wedge the breaker in half-open forever
+            if not health.probe_in_flight or now - health.probe_started_at > self.probe_timeout:
+                health.probe_in_flight = True
+                health.probe_started_at = now
+                return True, 0.0, HALF_OPEN
+            return False, 1.0, HALF_OPEN
+
+    def record(self, account_id: Any, ok: bool, latency: float,
+               status_code: Optional[int] = None, error: Optional[str] = None,
+               auth_failed: bool = False) -> str:
+        """Record one send attempt and return the resulting breaker state"""
+        now = time.time()
+        with self._lock:
+            health = self._get(account_id)
+            health.samples.append((now, ok, latency))
+
+            if ok:
+                health.total_sent += 1
+                health.consecutive_failures = 0
+                health.last_success_at = now
+                if health.state != CLOSED:
+                    health.state = CLOSED
+                    health.reason = ''
+                    health.auth_failed = False
+                    health.trips = 0
+                    health.probe_in_flight = False
+                return health.state
+
+            health.total_failed += 1
+            health.consecutive_failures += 1
+            health.last_error = error or (f'HTTP {status_code}' if status_code else 'error')
+
+            if auth_failed:
+                health.auth_failed = True
+                self._trip(health, now, f'Authentication failed ({health.last_error})', self.auth_cooldown)
+            elif health.state == HALF_OPEN:
+                self._trip(health, now, f'Probe failed ({health.last_error})')
+            elif health.state == CLOSED:
+                recent = health._recent(now)
+                failures = sum(1 for s in recent if not s[1])
+                if health.consecutive_failures >= self.consecutive_failure_threshold:
+                    self._trip(health, now, f'{health.consecutive_failures} consecutive failures')
+                elif len(recent) >= self.min_samples and failures / len(recent) >= self.error_rate_threshold:
+                    self._trip(health, now, f'Error rate {failures / len(recent) * 100:.0f}%')
+            return health.state
+
+    def _trip(self, health: AccountHealth, now: float, reason: str, cooldown: Optional[float] = None) -> None:
+        health.trips += 1
+        health.state = OPEN
+        health.opened_at = now
+        health.reason = reason
+        health.probe_in_flight = False
+        if cooldown is None:
+            cooldown = min(self.base_cooldown * (2 ** (health.trips - 1)), self.max_cooldown)
+        health.cooldown = cooldown
+        print(f"🔌 Circuit opened for account: {reason} (retry in {cooldown:.0f}s)")
+
+    def reset(self, account_id: Any) -> None:
+        """Forget an account's history (e.g. after its credentials are updated)"""
+        with self._lock:
+            self._accounts.pop(account_id, None)
+
+    def snapshot(self, account_id: Any) -> Dict[str, Any]:
+        with self._lock:
+            return self._get(account_id).summary(time.time())
+
+    def snapshot_all(self) -> Dict[Any, Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            return {account_id: health.summary(now) for account_id, health in self._accounts.items()}
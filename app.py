@@ -11,6 +11,7 @@ import random
 import requests
 from datetime import datetime, timedelta
 import uuid
+import hmac
 import csv
 import pandas as pd
 
@@ -26,7 +27,18 @@ import pandas as pd
 import csv
 from werkzeug.utils import secure_filename
 
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from bisect import bisect_left
+
 import zoho_oauth_integration
+from versioned_cache import data_cache
+from template_cache import TemplateCapabilityCache
+from account_health import AccountHealthTracker, is_auth_failure
+from suppression import (
+    BOUNCE, MANUAL, REASONS, UNSUBSCRIBE, SuppressionIntake, SuppressionStore, make_unsubscribe_token,
+    read_unsubscribe_token
+)
+from bounce_store import HARD, BounceIntake, BounceStore, parse_bounce_events
 import logging
 import gc
 import psutil
@@ -50,6 +62,10 @@ NOTIFICATIONS_FILE = 'notifications.json'
 BOUNCE_DATA_FILE = 'bounce_data.json'
 DELIVERY_DATA_FILE = 'delivery_data.json'
 DATA_LISTS_FILE = 'data_lists.json'
+SUPPRESSION_DB_FILE = 'suppression.db'
+SUPPRESSION_JOURNAL_PREFIX = 'suppression_intake'
+BOUNCE_DB_FILE = 'bounce_events.db'
+BOUNCE_JOURNAL_PREFIX = 'bounce_intake'
 SCHEDULED_CAMPAIGNS_FILE = 'scheduled_campaigns.json'
 
 # Default rate limiting settings - Conservative for reliable delivery
@@ -340,13 +356,11 @@ def add_scheduled_campaign(campaign_id, schedule_time, schedule_type='once', rep
     
     # Auto-reset completed campaigns to ready status
     if campaign['status'] == 'completed':
-        campaign['status'] = 'ready'
-        campaign['total_sent'] = 0
-        campaign['total_attempted'] = 0
-        campaign['started_at'] = None
-        campaign['completed_at'] = None
-        write_json_file_simple(CAMPAIGNS_FILE, campaigns)
-        print(f"🔄 Auto-reset completed campaign {campaign_id} to ready status for scheduling")
+        reset = transition_campaign(campaign_id, ['completed'], status='ready', total_sent=0, total_attempted=0,
+                                    started_at=None, completed_at=None)
+        if reset:
+            campaign = reset
+            print(f"🔄 Auto-reset completed campaign {campaign_id} to ready status for scheduling")
     
     # Ensure campaign is in ready state
     if campaign['status'] not in ['ready', 'failed']:
@@ -404,8 +418,8 @@ def get_scheduled_campaigns():
 
 def execute_scheduled_campaign(schedule):
     """Execute a scheduled campaign with duplicate prevention"""
-        campaign_id = schedule['campaign_id']
-        
+    campaign_id = schedule['campaign_id']
+    
     # Get or create execution lock for this campaign
     if campaign_id not in execution_locks:
         execution_locks[campaign_id] = threading.Lock()
@@ -414,77 +428,73 @@ def execute_scheduled_campaign(schedule):
     with execution_locks[campaign_id]:
         try:
             # Double-check campaign status before execution
-        campaigns = read_json_file_simple(CAMPAIGNS_FILE)
-        campaign = next((c for c in campaigns if c['id'] == campaign_id), None)
-        
-        if not campaign:
-            print(f"❌ Campaign {campaign_id} not found")
-            return False
-        
+            campaign = next((c for c in read_json_snapshot(CAMPAIGNS_FILE) if c['id'] == campaign_id), None)
+            
+            if not campaign:
+                print(f"❌ Campaign {campaign_id} not found")
+                return False
+            
             # Check if campaign is already running or completed
             if campaign['status'] in ['running', 'completed']:
                 print(f"⚠️ Campaign {campaign_id} is already {campaign['status']}, skipping execution")
                 return False
             
-        # Load account data
-        accounts = read_json_file_simple(ACCOUNTS_FILE)
-        account = next((a for a in accounts if a['id'] == campaign['account_id']), None)
-        
-        if not account:
-            print(f"❌ Account {campaign['account_id']} not found")
-            return False
-        
-        print(f"🚀 Executing scheduled campaign: {campaign['name']} (ID: {campaign_id})")
+            # Load account data
+            account = next((a for a in read_json_snapshot(ACCOUNTS_FILE) if a['id'] == campaign['account_id']), None)
+            
+            if not account:
+                print(f"❌ Account {campaign['account_id']} not found")
+                return False
+            
+            print(f"🚀 Executing scheduled campaign: {campaign['name']} (ID: {campaign_id})")
             
             # Mark campaign as running to prevent duplicate execution
-            campaign['status'] = 'running'
-            campaign['started_at'] = datetime.now().isoformat()
-            write_json_file_simple(CAMPAIGNS_FILE, campaigns)
-        
-        # Start the campaign
-        result = send_universal_campaign_emails(campaign, account)
-        
-        if result and result.get('success'):
-            print(f"✅ Scheduled campaign {campaign_id} executed successfully")
-            try:
-                add_notification(f"Scheduled campaign '{campaign['name']}' executed successfully", 'success', campaign_id)
-            except:
-                print(f"⚠️ Could not add notification for campaign {campaign_id}")
-            return True
-        else:
-            error_msg = result.get('message', 'Unknown error') if result else 'No result returned'
-            print(f"❌ Scheduled campaign {campaign_id} failed: {error_msg}")
+            started_at = datetime.now().isoformat()
+            update_campaign(campaign_id, status='running', started_at=started_at)
+            campaign = dict(campaign.thaw(), status='running', started_at=started_at)
+            
+            # Start the campaign
+            result = send_universal_campaign_emails(campaign, account.thaw())
+            
+            if result and result.get('paused'):
+                # Left paused and resumable by the sender; not a failure to reset
+                print(f"⏸️ Scheduled campaign {campaign_id} paused: {result.get('pause_reason')}")
+                return False
+            
+            if result and result.get('success'):
+                print(f"✅ Scheduled campaign {campaign_id} executed successfully")
+                try:
+                    add_notification(f"Scheduled campaign '{campaign['name']}' executed successfully", 'success', campaign_id)
+                except:
+                    print(f"⚠️ Could not add notification for campaign {campaign_id}")
+                return True
+            else:
+                error_msg = result.get('message', 'Unknown error') if result else 'No result returned'
+                print(f"❌ Scheduled campaign {campaign_id} failed: {error_msg}")
                 
                 # Reset campaign status on failure
-                campaign['status'] = 'ready'
-                campaign['started_at'] = None
-                write_json_file_simple(CAMPAIGNS_FILE, campaigns)
+                update_campaign(campaign_id, status='ready', started_at=None)
                 
-            try:
-                add_notification(f"Scheduled campaign '{campaign['name']}' failed: {error_msg}", 'error', campaign_id)
-            except:
-                print(f"⚠️ Could not add notification for campaign {campaign_id}")
-            return False
-            
-    except Exception as e:
+                try:
+                    add_notification(f"Scheduled campaign '{campaign['name']}' failed: {error_msg}", 'error', campaign_id)
+                except:
+                    print(f"⚠️ Could not add notification for campaign {campaign_id}")
+                return False
+        
+        except Exception as e:
             print(f"❌ Error executing scheduled campaign {campaign_id}: {str(e)}")
             
             # Reset campaign status on error
             try:
-                campaigns = read_json_file_simple(CAMPAIGNS_FILE)
-                campaign = next((c for c in campaigns if c['id'] == campaign_id), None)
-                if campaign:
-                    campaign['status'] = 'ready'
-                    campaign['started_at'] = None
-                    write_json_file_simple(CAMPAIGNS_FILE, campaigns)
+                update_campaign(campaign_id, status='ready', started_at=None)
             except:
                 pass
             
             try:
                 add_notification(f"Error executing scheduled campaign: {str(e)}", 'error', campaign_id)
-        except:
-            print(f"⚠️ Could not add notification for error")
-        return False
+            except:
+                print(f"⚠️ Could not add notification for error")
+            return False
 
 def calculate_next_run(schedule):
     """Calculate the next run time for a recurring schedule"""
@@ -801,6 +811,32 @@ init_data_files()
 # Global variable to track running campaigns
 running_campaigns = {}
 
+# Rolling send health and circuit breaker per account
+account_health = AccountHealthTracker()
+MAX_CIRCUIT_WAIT = 120  # Stop a send loop instead of waiting longer than this for a circuit to close
+
+# Global suppression list (bounces, complaints, unsubscribes, manual blocks)
+suppression_store = SuppressionStore(SUPPRESSION_DB_FILE)
+suppression_store.import_bounce_data(BOUNCE_DATA_FILE)
+
+# Unsubscribe/complaint events are queued at request speed and applied in batches;
+# running campaigns check each recipient, so they take effect within about a second
+suppression_intake = SuppressionIntake(suppression_store, SUPPRESSION_JOURNAL_PREFIX)
+suppression_intake.start()
+
+# Signs unsubscribe links. Unset disables them: {{unsubscribe_url}} is left as
+# is and /unsubscribe answers 503 (never fall back to the public SECRET_KEY)
+UNSUBSCRIBE_SECRET = os.getenv('UNSUBSCRIBE_SECRET')
+if not UNSUBSCRIBE_SECRET:
+    print("⚠️ UNSUBSCRIBE_SECRET is not set - unsubscribe links are disabled")
+PUBLIC_BASE_URL = os.getenv('PUBLIC_BASE_URL', 'http://localhost:5000').rstrip('/')
+SUPPRESSION_INTAKE_KEY = os.getenv('SUPPRESSION_INTAKE_KEY')  # Shared secret for machine-posted events
+UNSUBSCRIBE_PLACEHOLDER = '{{unsubscribe_url}}'
+BOUNCE_WEBHOOK_KEY = os.getenv('BOUNCE_WEBHOOK_KEY')  # Shared secret for the bounce webhook; unset disables it
+
+def unsubscribe_url(email, campaign_id=None):
+    return f"{PUBLIC_BASE_URL}/unsubscribe/{make_unsubscribe_token(UNSUBSCRIBE_SECRET, email, campaign_id)}"
+
 class User(UserMixin):
     def __init__(self, user_data):
         self.id = user_data['id']
@@ -1212,35 +1248,45 @@ def add_data_list(name, geography, isp, emails, filename=None, description=""):
         print(f"Error adding data list: {e}")
         return None
 
+def iter_data_list_emails(list_id, start_line=1):
+    """Yield emails from a data list file line by line, from start_line on"""
+    data_lists = get_data_lists()
+    data_list = next((lst for lst in data_lists if lst['id'] == list_id), None)
+    
+    if not data_list or not data_list.get('filename'):
+        return
+    
+    file_path = os.path.join(DATA_LISTS_DIR, data_list['filename'])
+    if not os.path.exists(file_path):
+        return
+    
+    # Convert start_line to 0-based index
+    start_index = max(0, start_line - 1)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f):
+            if line_number < start_index:
+                continue
+            email = line.strip()
+            if email:
+                yield email
+
 def get_data_list_emails(list_id, start_line=1):
     """Get emails from a specific data list with start line support"""
     try:
-        data_lists = get_data_lists()
-        data_list = next((lst for lst in data_lists if lst['id'] == list_id), None)
-        
-        if not data_list or not data_list.get('filename'):
-            return []
-        
-        file_path = os.path.join(DATA_LISTS_DIR, data_list['filename'])
-        if not os.path.exists(file_path):
-            return []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            all_lines = f.readlines()
-        
-        # Convert start_line to 0-based index and ensure it's valid
-        start_index = max(0, start_line - 1)
-        if start_index >= len(all_lines):
-            return []
-        
-        # Get emails from start_line onwards
-        emails = [line.strip() for line in all_lines[start_index:] if line.strip()]
-        
-        return emails
+        return list(iter_data_list_emails(list_id, start_line))
     except Exception as e:
         print(f"Error getting data list emails: {e}")
         return []
 
+def apply_suppression(emails, campaign):
+    """Drop suppressed recipients (any iterable, filtered as it is read) and report the counts"""
+    allowed, stats = suppression_store.filter_emails(emails)
+    if stats['suppressed']:
+        breakdown = ', '.join(f"{count} {reason}" for reason, count in sorted(stats['by_reason'].items()))
+        print(f"🚫 Suppressed {stats['suppressed']} of {stats['checked']} recipients for campaign {campaign['id']} ({breakdown})")
+        add_notification(f"{stats['suppressed']} suppressed recipients excluded from campaign '{campaign['name']}' ({breakdown})", 'info', campaign['id'])
+    return allowed, stats
+
 def delete_data_list(list_id):
     """Delete a data list and its file"""
     try:
@@ -1417,10 +1463,10 @@ def logout():
 def accounts():
     try:
         accounts = get_user_accounts(current_user)
-        return render_template('accounts.html', accounts=accounts)
+        return render_template('accounts.html', accounts=accounts, account_health=account_health.snapshot_all())
     except Exception as e:
         print(f"Error loading accounts: {str(e)}")
-        return render_template('accounts.html', accounts=[])
+        return render_template('accounts.html', accounts=[], account_health={})
 
 @app.route('/campaigns')
 @login_required
@@ -1488,9 +1534,9 @@ def edit_campaign(campaign_id):
 def live_campaigns():
     """New page to monitor all running campaigns and recently completed ones"""
     try:
-        all_campaigns = read_json_file_simple(CAMPAIGNS_FILE)
-        if not isinstance(all_campaigns, list):
-            all_campaigns = []
+        all_campaigns = read_json_snapshot(CAMPAIGNS_FILE)
+        if not isinstance(all_campaigns, tuple):
+            all_campaigns = ()
     except Exception as e:
         print(f"❌ Error loading campaigns for live view: {str(e)}")
         all_campaigns = []
@@ -1508,8 +1554,10 @@ def live_campaigns():
     
     # Filter campaigns: running + completed today + ready
     active_campaigns = []
-    for campaign in campaigns:
+    for snapshot in campaigns:
         try:
+            # Work on a copy so the page's 'logs' field never leaks into the cache
+            campaign = snapshot.thaw()
             if campaign.get('status') == 'running':
                 # Load logs for running campaigns
                 try:
@@ -1658,28 +1706,10 @@ def api_accounts():
                 'created_by': current_user.id
             }
             
-            # Detect available templates for this account
-            print(f"🔍 Detecting templates for new account: {data['name']}")
-            try:
-                available_templates = detect_available_templates(new_account)
-                if available_templates:
-                    new_account['template_info'] = available_templates
-                    # Store Zoho templates if available
-                    first_template = available_templates[0] if available_templates else None
-                    if first_template:
-                        new_account['zoho_templates'] = first_template.get('zoho_templates', [])
-                        new_account['template_mapping'] = first_template.get('template_mapping', {})
-                    print(f"✅ Detected {len(available_templates)} templates for account")
-                else:
-                    print(f"⚠️ No templates detected for account")
-                    new_account['template_info'] = []
-                    new_account['zoho_templates'] = []
-                    new_account['template_mapping'] = {}
-            except Exception as e:
-                print(f"⚠️ Error detecting templates: {e}")
-                new_account['template_info'] = []
-                new_account['zoho_templates'] = []
-                new_account['template_mapping'] = {}
+            # Templates are detected in the background once the account is saved
+            new_account['template_info'] = []
+            new_account['zoho_templates'] = []
+            new_account['template_mapping'] = {}
             
             print(f"📝 New account data: {json.dumps(new_account, indent=2)}")
             
@@ -1687,9 +1717,10 @@ def api_accounts():
             
             # Save to file with error handling
             try:
-                with open(ACCOUNTS_FILE, 'w') as f:
-                    json.dump(accounts, f, indent=2)
+                data_cache.write_json(ACCOUNTS_FILE, accounts)
                 print(f"✅ Successfully saved account to {ACCOUNTS_FILE}")
+                print(f"🔍 Detecting templates for new account in background: {data['name']}")
+                template_capabilities.refresh_async(new_account)
             except PermissionError as e:
                 print(f"❌ Permission error saving account: {e}")
                 error_msg = f"Permission denied: Cannot write to {ACCOUNTS_FILE}. Please check file permissions on the server."
@@ -1756,9 +1787,11 @@ def api_account(account_id):
         account.update(data)
         
         try:
-            with open(ACCOUNTS_FILE, 'w') as f:
-                json.dump(accounts, f, indent=2)
+            data_cache.write_json(ACCOUNTS_FILE, accounts)
             print(f"✅ Successfully updated account {account_id}")
+            # New credentials get a clean health record and closed circuit
+            if 'cookies' in data or 'headers' in data:
+                account_health.reset(account_id)
         except PermissionError as e:
             print(f"❌ Permission error saving updated account: {e}")
             error_msg = f"Permission denied: Cannot write to {ACCOUNTS_FILE}. Please check file permissions on the server."
@@ -1790,8 +1823,7 @@ def api_account(account_id):
             return jsonify({'error': f'Failed to remove account from list: {str(e)}'}), 500
         
         try:
-            with open(ACCOUNTS_FILE, 'w') as f:
-                json.dump(accounts, f, indent=2)
+            data_cache.write_json(ACCOUNTS_FILE, accounts)
             print(f"✅ Successfully saved updated accounts to file")
         except PermissionError as e:
             print(f"❌ Permission error saving accounts file: {e}")
@@ -1810,6 +1842,26 @@ def api_account(account_id):
         print(f"🎉 Account '{account_name}' deleted successfully")
         return jsonify({'success': True, 'message': f'Account {account_name} deleted successfully'})
 
+@app.route('/api/accounts/health', methods=['GET'])
+@login_required
+def api_accounts_health():
+    """Send health and circuit breaker state for the user's accounts"""
+    accounts = get_user_accounts(current_user)
+    return jsonify({
+        str(account['id']): account_health.snapshot(account['id'])
+        for account in accounts
+    })
+
+@app.route('/api/accounts/<int:account_id>/health/reset', methods=['POST'])
+@login_required
+def reset_account_health(account_id):
+    """Close an account's circuit and clear its health history"""
+    account = next((a for a in get_user_accounts(current_user) if a['id'] == account_id), None)
+    if not account:
+        return jsonify({'error': 'Account not found'}), 404
+    account_health.reset(account_id)
+    return jsonify({'success': True, 'health': account_health.snapshot(account_id)})
+
 @app.route('/api/accounts/<int:account_id>/templates', methods=['GET'])
 @login_required
 def get_account_templates(account_id):
@@ -1835,10 +1887,19 @@ def get_account_templates(account_id):
 def api_campaigns():
     if request.method == 'GET':
         try:
-            campaigns = get_user_campaigns(current_user)
+            # Keyset pagination over a summary projection (no message bodies):
+            # ?limit=100&status=running&after=<created_at,id>
+            limit = max(1, min(request.args.get('limit', CAMPAIGN_PAGE_DEFAULT, type=int), CAMPAIGN_PAGE_MAX))
+            try:
+                after = parse_campaign_cursor(request.args.get('after'))
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Invalid after cursor', 'campaigns': []}), 400
+            campaigns, next_after = get_user_campaign_page(current_user, limit, after, request.args.get('status'))
             return jsonify({
                 'success': True,
-                'campaigns': campaigns
+                'campaigns': campaigns,
+                'next_after': next_after,
+                'has_more': next_after is not None
             })
         except Exception as e:
             print(f"Error loading campaigns: {str(e)}")
@@ -1894,15 +1955,12 @@ def api_campaigns():
             if not isinstance(campaigns, list):
                 campaigns = []
             
-            # Generate new campaign ID
-            new_id = max([camp['id'] for camp in campaigns], default=0) + 1 if campaigns else 1
-            
             # Handle rate limiting settings
             rate_limits = data.get('rate_limits')
             
             # Create campaign object with new universal structure
             new_campaign = {
-                'id': new_id,
+                'id': None,  # Assigned by add_campaign under the write lock
                 'name': str(data['name'])[:100],  # Limit name length
                 'account_id': int(data['account_id']),  # Keep for backward compatibility
                 'account_ids': data.get('account_ids', [int(data['account_id'])]),  # Support multiple accounts
@@ -1927,12 +1985,14 @@ def api_campaigns():
                 'system_version': 'universal_v2'  # Mark as using new system
             }
             
-            # Add to campaigns list
-            campaigns.append(new_campaign)
-            
             # Robust file writing with detailed error handling
             print(f"💾 Attempting to save campaign to {CAMPAIGNS_FILE}")
-            save_success = write_json_file_simple(CAMPAIGNS_FILE, campaigns)
+            try:
+                new_id = add_campaign(new_campaign)
+                save_success = True
+            except Exception as e:
+                print(f"❌ Error saving campaign: {str(e)}")
+                save_success = False
             
             if save_success:
                 # Add notification
@@ -2031,8 +2091,9 @@ def api_campaign(campaign_id):
         campaign['started_at'] = None
         campaign['completed_at'] = None
         
-        # Save updated campaigns
-        write_success = write_json_file_simple(CAMPAIGNS_FILE, campaigns)
+        # Save updated campaign (re-read under the write lock, not this request's copy)
+        updated = transition_campaign(campaign_id, **{k: v for k, v in campaign.items() if k != 'id'})
+        write_success = updated is not None
         
         if write_success:
         add_notification(f"Campaign '{campaign['name']}' updated successfully", 'success', campaign_id)
@@ -2046,8 +2107,11 @@ def api_campaign(campaign_id):
             return jsonify({'error': 'Access denied. You can only delete your own campaigns.'}), 403
         
         campaign_name = campaign['name']
-        campaigns.remove(campaign)
-        write_success = write_json_file_simple(CAMPAIGNS_FILE, campaigns)
+        try:
+            write_success = remove_campaign(campaign_id) is not None
+        except Exception as e:
+            print(f"❌ Error deleting campaign {campaign_id}: {str(e)}")
+            write_success = False
         
         if write_success:
         add_notification(f"Campaign '{campaign_name}' deleted successfully", 'warning')
@@ -2103,17 +2167,14 @@ def start_campaign(campaign_id):
         # Use new universal system
         print(f"🚀 Starting universal campaign: {campaign['name']}")
         
-        # Update campaign status
-        campaign['status'] = 'running'
-        campaign['started_at'] = datetime.now().isoformat()
-        campaign['total_sent'] = 0
-        campaign['total_attempted'] = 0
-        
-        with open(CAMPAIGNS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(campaigns, f)
+        # Update campaign status (only if nobody started or changed it meanwhile)
+        campaign = begin_campaign_run(campaign_id)
+        if not campaign:
+            return jsonify({'error': 'Campaign status changed, please retry'}), 409
         
-        # Clear previous logs
-        save_campaign_logs(campaign_id, [])
+        # Clear previous logs, unless this run resumes a paused one
+        if not campaign.get('resume_index'):
+            save_campaign_logs(campaign_id, [])
         
         # Add to running campaigns
         running_campaigns[campaign_id] = True
@@ -2143,17 +2204,14 @@ def start_campaign(campaign_id):
         # Legacy campaign - use old system for backward compatibility
         print(f"🚀 Starting legacy campaign: {campaign['name']}")
         
-        # Update campaign status
-        campaign['status'] = 'running'
-        campaign['started_at'] = datetime.now().isoformat()
-        campaign['total_sent'] = 0
-        campaign['total_attempted'] = 0
-        
-        with open(CAMPAIGNS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(campaigns, f)
+        # Update campaign status (only if nobody started or changed it meanwhile)
+        campaign = begin_campaign_run(campaign_id)
+        if not campaign:
+            return jsonify({'error': 'Campaign status changed, please retry'}), 409
         
-        # Clear previous logs
-        save_campaign_logs(campaign_id, [])
+        # Clear previous logs, unless this run resumes a paused one
+        if not campaign.get('resume_index'):
+            save_campaign_logs(campaign_id, [])
         
         # Add to running campaigns
         running_campaigns[campaign_id] = True
@@ -2180,11 +2238,8 @@ def stop_campaign(campaign_id):
         return jsonify({'error': 'Campaign is not running'}), 400
     
     # Stop campaign
-    campaign['status'] = 'stopped'
-    campaign['stopped_at'] = datetime.now().isoformat()
-    
-    with open(CAMPAIGNS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(campaigns, f)
+    if not transition_campaign(campaign_id, ['running'], status='stopped', stopped_at=datetime.now().isoformat()):
+        return jsonify({'error': 'Campaign is not running'}), 400
     
     # Remove from running campaigns
     if campaign_id in running_campaigns:
@@ -2215,14 +2270,18 @@ def relaunch_campaign(campaign_id):
     if not account:
         return jsonify({'error': 'Account not found'}), 404
     
-    # Reset campaign status
-    campaign['status'] = 'running'
-    campaign['started_at'] = datetime.now().isoformat()
-    campaign['total_sent'] = 0
-    campaign['total_attempted'] = 0
-    
-    with open(CAMPAIGNS_FILE, 'w') as f:
-        json.dump(campaigns, f)
+    # Reset campaign status, unless another request started it meanwhile
+    def relaunch(campaigns):
+        current = next((c for c in campaigns if c['id'] == campaign_id), None)
+        if current is None or current.get('status') == 'running':
+            return None
+        current.update(status='running', started_at=datetime.now().isoformat(), total_sent=0, total_attempted=0,
+                       **CLEARED_RESUME_POINT)
+        return dict(current)
+    relaunched = update_json_file(CAMPAIGNS_FILE, relaunch, default=[])
+    if not relaunched:
+        return jsonify({'error': 'Campaign is already running'}), 400
+    campaign = relaunched
     
     # Clear previous logs
     save_campaign_logs(campaign_id, [])
@@ -2329,48 +2388,50 @@ def clear_all_notifications():
 def api_stats():
     """Optimized stats endpoint with caching"""
     try:
-        # Cache stats for 30 seconds
-        if hasattr(api_stats, 'cache') and time.time() - getattr(api_stats, 'cache_time', 0) < 30:
-            return jsonify(api_stats.cache)
-        
-        campaigns = get_campaigns_optimized()
-        accounts = get_accounts_optimized()
-        
-        # Calculate stats efficiently
-        total_campaigns = len(campaigns)
-        active_campaigns = sum(1 for c in campaigns.values() if c.get('status') in ['running', 'ready'])
-        total_accounts = len(accounts)
-        
-        # Calculate delivery stats efficiently
-        total_sent = sum(c.get('total_sent', 0) for c in campaigns.values())
-        total_delivered = sum(c.get('delivered_count', 0) for c in campaigns.values())
-        total_bounced = sum(c.get('bounced_count', 0) for c in campaigns.values())
-        
-        # Calculate rates
-        delivery_rate = round((total_delivered / total_sent * 100), 1) if total_sent > 0 else 0
-        bounce_rate = round((total_bounced / total_sent * 100), 1) if total_sent > 0 else 0
-        
-        stats = {
-            'total_campaigns': total_campaigns,
-            'active_campaigns': active_campaigns,
-            'total_accounts': total_accounts,
-            'total_sent': total_sent,
-            'total_delivered': total_delivered,
-            'total_bounced': total_bounced,
-            'delivery_rate': delivery_rate,
-            'bounce_rate': bounce_rate,
-            'emails_today': 0,  # Simplified for performance
-            'status_counts': {}  # Simplified for performance
-        }
-        
-        # Cache the result
-        api_stats.cache = stats
-        api_stats.cache_time = time.time()
-        
+        # Recomputed only when campaigns.json or accounts.json change
+        stats = data_cache.get_derived('api_stats', (CAMPAIGNS_FILE, ACCOUNTS_FILE), compute_dashboard_stats)
         return jsonify(stats)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def compute_dashboard_stats():
+    """Aggregate dashboard stats from the campaign and account files"""
+    campaigns = read_json_snapshot(CAMPAIGNS_FILE)
+    accounts = read_json_snapshot(ACCOUNTS_FILE)
+    
+    # Calculate stats efficiently
+    total_campaigns = len(campaigns)
+    active_campaigns = sum(1 for c in campaigns if c.get('status') in ['running', 'ready'])
+    total_accounts = len(accounts)
+    
+    # Calculate delivery stats efficiently
+    total_sent = sum(c.get('total_sent', 0) for c in campaigns)
+    total_delivered = sum(c.get('delivered_count', 0) for c in campaigns)
+    total_bounced = sum(c.get('bounced_count', 0) for c in campaigns)
+    
+    # Calculate rates
+    delivery_rate = round((total_delivered / total_sent * 100), 1) if total_sent > 0 else 0
+    bounce_rate = round((total_bounced / total_sent * 100), 1) if total_sent > 0 else 0
+    
+    return {
+        'total_campaigns': total_campaigns,
+        'active_campaigns': active_campaigns,
+        'total_accounts': total_accounts,
+        'total_sent': total_sent,
+        'total_delivered': total_delivered,
+        'total_bounced': total_bounced,
+        'delivery_rate': delivery_rate,
+        'bounce_rate': bounce_rate,
+        'emails_today': 0,  # Simplified for performance
+        'status_counts': {}  # Simplified for performance
+    }
+
+@app.route('/api/cache/stats')
+@login_required
+def api_cache_stats():
+    """Hit/miss metrics for the shared data cache"""
+    return jsonify(data_cache.stats())
+
 @app.route('/api/campaigns/<int:campaign_id>/delivery-stats')
 @login_required
 def get_campaign_delivery_stats(campaign_id):
@@ -2462,14 +2523,8 @@ def refresh_campaign_logs_api(campaign_id):
 def delete_campaign_api(campaign_id):
     """Delete a campaign"""
     try:
-        with open(CAMPAIGNS_FILE, 'r') as f:
-            campaigns = json.load(f)
-        
         # Find and remove the campaign
-        campaigns = [c for c in campaigns if c['id'] != campaign_id]
-        
-        with open(CAMPAIGNS_FILE, 'w') as f:
-            json.dump(campaigns, f, indent=2)
+        remove_campaign(campaign_id)
         
         # Also remove campaign logs
         try:
@@ -2508,11 +2563,8 @@ def pause_campaign_api(campaign_id):
             return jsonify({'success': False, 'message': 'Campaign is not running'}), 400
         
         # Update campaign status
-        campaign['status'] = 'paused'
-        campaign['paused_at'] = datetime.now().isoformat()
-        
-        with open(CAMPAIGNS_FILE, 'w') as f:
-            json.dump(campaigns, f, indent=2)
+        if not transition_campaign(campaign_id, ['running'], status='paused', paused_at=datetime.now().isoformat()):
+            return jsonify({'success': False, 'message': 'Campaign is not running'}), 400
         
         # Remove from running campaigns
         if campaign_id in running_campaigns:
@@ -2541,11 +2593,8 @@ def stop_campaign_api(campaign_id):
             return jsonify({'success': False, 'message': 'Campaign is not running or paused'}), 400
         
         # Update campaign status
-        campaign['status'] = 'stopped'
-        campaign['stopped_at'] = datetime.now().isoformat()
-        
-        with open(CAMPAIGNS_FILE, 'w') as f:
-            json.dump(campaigns, f, indent=2)
+        if not transition_campaign(campaign_id, ['running', 'paused'], status='stopped', stopped_at=datetime.now().isoformat()):
+            return jsonify({'success': False, 'message': 'Campaign is not running or paused'}), 400
         
         # Remove from running campaigns
         if campaign_id in running_campaigns:
@@ -2574,11 +2623,9 @@ def resume_campaign_api(campaign_id):
             return jsonify({'success': False, 'message': 'Campaign is not paused'}), 400
         
         # Update campaign status
-        campaign['status'] = 'running'
-        campaign['resumed_at'] = datetime.now().isoformat()
-        
-        with open(CAMPAIGNS_FILE, 'w') as f:
-            json.dump(campaigns, f, indent=2)
+        campaign = transition_campaign(campaign_id, ['paused'], status='running', resumed_at=datetime.now().isoformat())
+        if not campaign:
+            return jsonify({'success': False, 'message': 'Campaign is not paused'}), 400
         
         # Add back to running campaigns
         running_campaigns[campaign_id] = {
@@ -2949,6 +2996,144 @@ def get_data_list_emails_api(list_id):
     except Exception as e:
         return jsonify({'error': f'Error getting emails: {str(e)}'}), 500
 
+@app.route('/api/suppression', methods=['GET', 'POST'])
+@login_required
+def api_suppression():
+    """List suppressed addresses or add manual blocks"""
+    if not has_permission(current_user, 'manage_data'):
+        return jsonify({'error': 'Access denied. You need manage_data permission.'}), 403
+    
+    if request.method == 'GET':
+        reason = request.args.get('reason')
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        return jsonify({
+            'success': True,
+            'stats': suppression_store.stats(),
+            'intake': suppression_intake.stats(),
+            'entries': suppression_store.list_entries(reason, limit, offset)
+        })
+    
+    data = request.get_json(silent=True) or {}
+    emails = data.get('emails') or []
+    if isinstance(emails, str):
+        emails = emails.split('\n')
+    reason = data.get('reason', MANUAL)
+    if reason not in REASONS:
+        return jsonify({'error': f"reason must be one of {', '.join(REASONS)}"}), 400
+    
+    added = suppression_store.add_many(
+        (email.strip(), reason, f"user:{current_user.username}", None) for email in emails if isinstance(email, str)
+    )
+    print(f"🚫 {current_user.username} added {added} {reason} suppressions")
+    return jsonify({'success': True, 'added': added, 'stats': suppression_store.stats()})
+
+@app.route('/api/suppression/<path:email>', methods=['DELETE'])
+@login_required
+def api_remove_suppression(email):
+    """Lift the suppression for one address"""
+    if not has_permission(current_user, 'manage_data'):
+        return jsonify({'error': 'Access denied. You need manage_data permission.'}), 403
+    if not suppression_store.remove(email):
+        return jsonify({'error': 'Address is not suppressed'}), 404
+    print(f"✅ {current_user.username} removed suppression for {email}")
+    return jsonify({'success': True})
+
+@app.route('/unsubscribe/<token>', methods=['GET', 'POST'])
+def unsubscribe(token):
+    """Unsubscribe link target: GET asks for confirmation, POST opts out
+
+    The RFC 8058 one-click branch serves external senders that put this URL
+    in a List-Unsubscribe header; the Zoho Deluge sends here cannot set
+    headers, so mail from this app only ever reaches the link form.
+    """
+    if not UNSUBSCRIBE_SECRET:
+        return render_template('unsubscribe.html', state='unavailable'), 503
+    parsed = read_unsubscribe_token(UNSUBSCRIBE_SECRET, token)
+    if not parsed:
+        return render_template('unsubscribe.html', state='invalid'), 400
+    email, campaign_id = parsed
+    
+    if request.method == 'GET':
+        return render_template('unsubscribe.html', state='confirm', email=email)
+    
+    suppression_intake.submit(email, UNSUBSCRIBE, 'unsubscribe_link', campaign_id)
+    if request.form.get('List-Unsubscribe') == 'One-Click':
+        return '', 200
+    return render_template('unsubscribe.html', state='done', email=email)
+
+@app.route('/api/suppression/events', methods=['POST'])
+def api_suppression_events():
+    """Bulk intake for unsubscribe/complaint/bounce events posted by other systems (feedback loops, ESP hooks)"""
+    provided_key = request.headers.get('X-Intake-Key', '')
+    if not SUPPRESSION_INTAKE_KEY or not hmac.compare_digest(provided_key, SUPPRESSION_INTAKE_KEY):
+        return jsonify({'error': 'Invalid intake key'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    events = data.get('events')
+    if not isinstance(events, list):
+        return jsonify({'error': 'Expected {"events": [{"email", "type", "campaign_id"}]}'}), 400
+    
+    accepted = suppression_intake.submit_many(
+        (event.get('email'), event.get('type'), event.get('source', 'api'), event.get('campaign_id'))
+        for event in events if isinstance(event, dict)
+    )
+    return jsonify({'success': True, 'accepted': accepted, 'rejected': len(events) - accepted}), 202
+
+def apply_new_bounces(events):
+    """Follow-up for newly recorded bounce events: suppress hard bounces, bump campaign counters"""
+    hard = [(email, BOUNCE, 'bounce_webhook', campaign_id)
+            for _, email, campaign_id, bounce_type, _, _ in events if bounce_type == HARD]
+    suppressed = suppression_store.add_many(hard) if hard else 0
+    
+    per_campaign = {}
+    for _, _, campaign_id, _, _, _ in events:
+        if campaign_id is not None:
+            per_campaign[campaign_id] = per_campaign.get(campaign_id, 0) + 1
+    if per_campaign:
+        def apply(campaigns):
+            for c in campaigns:
+                added = per_campaign.get(str(c.get('id')))
+                if added:
+                    c['bounced_count'] = c.get('bounced_count', 0) + added
+        # One read-modify-write of campaigns.json per batch, not per event
+        update_json_file(CAMPAIGNS_FILE, apply, default=[])
+    print(f"📭 Recorded {len(events)} bounces ({len(hard)} hard, {suppressed} newly suppressed)")
+
+@app.route('/webhook/zoho/bounce', methods=['POST'])
+def webhook_zoho_bounce():
+    """Bounce webhook: dedupes, journals and acknowledges; events are applied in batches"""
+    provided_key = request.headers.get('X-Webhook-Key') or request.args.get('key', '')
+    if not BOUNCE_WEBHOOK_KEY or not hmac.compare_digest(provided_key, BOUNCE_WEBHOOK_KEY):
+        return jsonify({'error': 'Invalid webhook key'}), 403
+    
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({'error': 'Expected a JSON body'}), 400
+    events = parse_bounce_events(payload, request.headers.get('Idempotency-Key'))
+    if not events:
+        return jsonify({'error': 'No bounce events with an email address'}), 400
+    
+    accepted, duplicates = bounce_intake.submit_many(events)
+    return jsonify({'success': True, 'accepted': accepted, 'duplicates': duplicates}), 202
+
+@app.route('/api/bounces')
+@login_required
+def api_bounces():
+    """Recorded bounces, optionally for one campaign or bounce type"""
+    if not has_permission(current_user, 'manage_data'):
+        return jsonify({'error': 'Access denied. You need manage_data permission.'}), 403
+    
+    campaign_id = request.args.get('campaign_id')
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    return jsonify({
+        'success': True,
+        'counts': bounce_store.counts(campaign_id),
+        'intake': bounce_intake.stats(),
+        'bounces': bounce_store.get_bounces(campaign_id, request.args.get('type'), limit, offset)
+    })
+
 @app.route('/api/data-lists/<int:list_id>/campaign-emails')
 @login_required
 def get_data_list_campaign_emails(list_id):
@@ -2964,12 +3149,19 @@ def get_data_list_campaign_emails(list_id):
         return jsonify({'error': f'Error getting emails: {str(e)}'}), 500
 
 def send_campaign_emails(campaign, account):
-    """Send emails for a campaign in background thread with IMPROVED feedback and bounce detection"""
+    """Send emails for a campaign in background thread with IMPROVED feedback and bounce detection
+
+    Legacy campaigns send the Zoho template content as stored in Zoho, which
+    this process never sees, so {{unsubscribe_url}} is not filled in and
+    recipients get no unsubscribe link. Only universal_v2 campaigns
+    (send_sequential_emails) carry one.
+    """
     campaign_id = campaign['id']
     
     try:
         print(f"🚀 Starting campaign: {campaign['name']} (ID: {campaign_id})")
         print(f"📧 Using SIMPLE email sending without rate limits")
+        print(f"⚠️ Legacy campaign: the Zoho template is sent as is, without a per-recipient unsubscribe link")
         
         # Create initial log entry
         start_log = {
@@ -2984,20 +3176,13 @@ def send_campaign_emails(campaign, account):
         add_campaign_log(campaign_id, start_log)
         socketio.emit('email_progress', start_log)
         
-        # Parse recipients, subjects, and senders
-        destinataires = [email.strip() for email in campaign['destinataires'].split('\n') if email.strip()]
+        # Parse recipients (minus suppressed addresses), subjects, and senders
+        destinataires, suppression_stats = apply_suppression(
+            (email.strip() for email in campaign['destinataires'].split('\n') if email.strip()), campaign
+        )
         subjects = [subject.strip() for subject in campaign['subjects'].split('\n') if subject.strip()]
         froms = [sender.strip() for sender in campaign['froms'].split('\n') if sender.strip()]
         
-        # Filter out bounced emails for relaunch
-        original_count = len(destinataires)
-        destinataires = filter_bounced_emails(destinataires, campaign_id)
-        filtered_count = len(destinataires)
-        
-        if original_count != filtered_count:
-            print(f"🚫 Relaunch: Filtered out {original_count - filtered_count} bounced emails")
-            add_notification(f"Relaunch: {original_count - filtered_count} bounced emails excluded from campaign '{campaign['name']}'", 'info', campaign_id)
-        
         if not destinataires:
             error_msg = "❌ No recipients found in campaign"
             print(error_msg)
@@ -3047,6 +3232,12 @@ def send_campaign_emails(campaign, account):
                 socketio.emit('email_progress', stop_log)
                 break
             
+            # Unsubscribes and complaints received while the campaign runs
+            suppressed_reason = suppression_store.is_suppressed(email)
+            if suppressed_reason:
+                print(f"🚫 Skipping {email}: suppressed ({suppressed_reason})")
+                continue
+            
             # Select random subject and sender
             subject = random.choice(subjects) if subjects else "Default Subject"
             sender = random.choice(froms) if froms else "Default Sender"
@@ -3112,12 +3303,25 @@ def send_campaign_emails(campaign, account):
             
             try:
                 # Make API request
-                response = requests.post(
-                    url,
-                    json=json_data,
-                    cookies=account['cookies'],
-                    headers=enhanced_headers,
-                    timeout=30
+                send_started = time.time()
+                try:
+                    response = requests.post(
+                        url,
+                        json=json_data,
+                        cookies=account['cookies'],
+                        headers=enhanced_headers,
+                        timeout=30
+                    )
+                except requests.exceptions.RequestException as e:
+                    account_health.record(account['id'], False, time.time() - send_started, error=str(e))
+                    raise
+                
+                account_health.record(
+                    account['id'],
+                    response.status_code == 200,
+                    time.time() - send_started,
+                    status_code=response.status_code,
+                    auth_failed=response.status_code != 200 and is_auth_failure(response.status_code, response.text)
                 )
                 
                 # Parse response
@@ -3232,13 +3436,7 @@ def send_campaign_emails(campaign, account):
                 socketio.emit('email_progress', network_log)
             
             # Update campaign progress
-            campaigns = read_json_file_simple(CAMPAIGNS_FILE)
-            campaign_index = next((i for i, c in enumerate(campaigns) if c['id'] == campaign_id), None)
-            
-            if campaign_index is not None:
-                campaigns[campaign_index]['total_sent'] = sent_count
-                campaigns[campaign_index]['total_attempted'] = i + 1
-                write_json_file_simple(CAMPAIGNS_FILE, campaigns)
+            update_campaign(campaign_id, total_sent=sent_count, total_attempted=i + 1)
             
             # Small delay between emails to avoid overwhelming the API
             time.sleep(0.5)
@@ -3262,15 +3460,13 @@ def send_campaign_emails(campaign, account):
         socketio.emit('email_progress', completion_log)
         
         # Update campaign status
-        campaigns = read_json_file_simple(CAMPAIGNS_FILE)
-        campaign_index = next((i for i, c in enumerate(campaigns) if c['id'] == campaign_id), None)
-        
-        if campaign_index is not None:
-            campaigns[campaign_index]['status'] = 'completed'
-            campaigns[campaign_index]['completed_at'] = datetime.now().isoformat()
-            campaigns[campaign_index]['total_sent'] = sent_count
-            campaigns[campaign_index]['total_attempted'] = total_emails
-            write_json_file_simple(CAMPAIGNS_FILE, campaigns)
+        update_campaign(
+            campaign_id,
+            status='completed',
+            completed_at=datetime.now().isoformat(),
+            total_sent=sent_count,
+            total_attempted=total_emails
+        )
         
         # Remove from running campaigns
         if campaign_id in running_campaigns:
@@ -3295,12 +3491,7 @@ def send_campaign_emails(campaign, account):
         socketio.emit('email_progress', error_log)
         
         # Update campaign status to error
-        campaigns = read_json_file_simple(CAMPAIGNS_FILE)
-        campaign_index = next((i for i, c in enumerate(campaigns) if c['id'] == campaign_id), None)
-        
-        if campaign_index is not None:
-            campaigns[campaign_index]['status'] = 'error'
-            write_json_file_simple(CAMPAIGNS_FILE, campaigns)
+        update_campaign(campaign_id, status='error')
         
         # Remove from running campaigns
         if campaign_id in running_campaigns:
@@ -3837,6 +4028,64 @@ def get_user_campaigns(user):
     # Regular users can only see their own campaigns
     return [camp for camp in campaigns if camp.get('created_by') == user.id]
 
+CAMPAIGN_PAGE_DEFAULT = 100
+CAMPAIGN_PAGE_MAX = 500
+CAMPAIGN_SUMMARY_FIELDS = (
+    'id', 'name', 'subject', 'status', 'account_id', 'data_list_id', 'created_by', 'created_at',
+    'started_at', 'completed_at', 'total_sent', 'total_attempted', 'total_failed', 'start_line'
+)
+
+def _campaign_id_key(campaign_id):
+    """Sort key for campaign ids, which are ints in older files and strings in newer ones"""
+    if isinstance(campaign_id, int) or (isinstance(campaign_id, str) and campaign_id.isdigit()):
+        return (0, int(campaign_id))
+    return (1, str(campaign_id))
+
+def campaign_sort_key(created_at, campaign_id):
+    return (created_at or '', _campaign_id_key(campaign_id))
+
+def parse_campaign_cursor(after):
+    """Parse an `after=<created_at,id>` cursor; raises ValueError if malformed"""
+    if not after:
+        return None
+    created_at, sep, campaign_id = after.rpartition(',')
+    if not sep or not campaign_id:
+        raise ValueError(after)
+    return campaign_sort_key(created_at, campaign_id)
+
+def build_campaign_summary_index():
+    """Campaign summaries sorted by (created_at, id), with their sort keys for bisecting"""
+    summaries = []
+    for campaign in read_json_snapshot(CAMPAIGNS_FILE):
+        summary = {field: campaign.get(field) for field in CAMPAIGN_SUMMARY_FIELDS if field in campaign}
+        summaries.append((campaign_sort_key(campaign.get('created_at'), campaign.get('id')), summary))
+    summaries.sort(key=lambda item: item[0])
+    return [item[0] for item in summaries], [item[1] for item in summaries]
+
+def get_user_campaign_page(user, limit, after=None, status=None):
+    """One page of campaign summaries, newest first, plus the cursor for the next page"""
+    keys, summaries = data_cache.get_derived('campaign_summaries', (CAMPAIGNS_FILE,), build_campaign_summary_index)
+    see_all = user.role == 'admin' or has_permission(user, 'view_all_campaigns')
+    
+    # Walk backwards from just below the cursor
+    position = (bisect_left(keys, after) if after is not None else len(keys)) - 1
+    page = []
+    while position >= 0 and len(page) <= limit:
+        summary = summaries[position]
+        position -= 1
+        if not see_all and summary.get('created_by') != user.id:
+            continue
+        if status and summary.get('status') != status:
+            continue
+        page.append(dict(summary))
+    
+    next_after = None
+    if len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        next_after = f"{last.get('created_at') or ''},{last.get('id')}"
+    return page, next_after
+
 # Password reset tokens storage
 PASSWORD_RESET_TOKENS_FILE = 'password_reset_tokens.json'
 
@@ -4126,16 +4375,9 @@ def refresh_account_templates(account_id):
         if current_user.role != 'admin' and account.get('created_by') != current_user.id:
             return jsonify({'error': 'Permission denied'}), 403
         
-        # Detect templates
+        # Detect templates (explicit refresh runs inline and updates the cache)
         print(f"🔍 Refreshing templates for account: {account['name']}")
-        available_templates = detect_available_templates(account)
-        
-        # Update account with new template info
-        for i, acc in enumerate(accounts):
-            if acc['id'] == account_id:
-                accounts[i]['template_info'] = available_templates
-                write_json_file_simple(ACCOUNTS_FILE, accounts)
-                break
+        available_templates = template_capabilities.refresh(account)
         
         # Get the first available template info for additional details
         first_template = available_templates[0] if available_templates else None
@@ -4362,72 +4604,161 @@ def cleanup_memory():
         pass
 
 def read_json_file_simple(file_path):
-    """Optimized JSON file reading with caching"""
+    """Optimized JSON file reading with caching (returns a private mutable copy)"""
     try:
-        # Check cache first
-        cache_key = file_path
-        if hasattr(read_json_file_simple, 'cache') and cache_key in read_json_file_simple.cache:
-            cache_entry = read_json_file_simple.cache[cache_key]
-            if time.time() - cache_entry['timestamp'] < 30:  # 30 second cache
-                return cache_entry['data']
-        
-        # Read from file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Update cache
-        if not hasattr(read_json_file_simple, 'cache'):
-            read_json_file_simple.cache = {}
-        read_json_file_simple.cache[cache_key] = {
-            'data': data,
-            'timestamp': time.time()
-        }
-        
-        return data
+        return data_cache.get_json(file_path)
     except Exception as e:
         # Only log errors, not every read operation
-        if 'ERROR' not in str(e):
-            return {}
-            return {}
+        return {}
+
+def read_json_snapshot(file_path):
+    """Read-only cached view of a JSON file (no copy); use for display/lookups"""
+    try:
+        return data_cache.get_snapshot(file_path)
+    except Exception as e:
+        return ()
 
 def write_json_file_simple(file_path, data):
-    """Optimized JSON file writing with cache invalidation"""
+    """Optimized JSON file writing; the written data becomes the cached snapshot"""
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        # Invalidate cache
-        if hasattr(read_json_file_simple, 'cache') and file_path in read_json_file_simple.cache:
-            del read_json_file_simple.cache[file_path]
-        
+        data_cache.write_json(file_path, data)
         return True
     except Exception as e:
             return False
 
+def update_json_file(file_path, mutator, default=None):
+    """Read-modify-write a JSON file under its write lock (write-through cache)"""
+    return data_cache.update_json(file_path, mutator, default=default)
+
+def update_campaign(campaign_id, **fields):
+    """Update fields of one campaign in campaigns.json; returns False if not found"""
+    def apply(campaigns):
+        for c in campaigns:
+            if c['id'] == campaign_id:
+                c.update(fields)
+                return True
+        return False
+    try:
+        return update_json_file(CAMPAIGNS_FILE, apply, default=[])
+    except Exception as e:
+        print(f"❌ Error updating campaign {campaign_id}: {str(e)}")
+        return False
+
+def transition_campaign(campaign_id, from_statuses=None, **fields):
+    """Update a campaign only if its status is in from_statuses (None: any)
+
+    Check and write happen under the campaigns.json write lock, so a stop
+    cannot be undone by a sender thread's stale copy. Returns a copy of the
+    updated campaign, or None if it is missing or its status has moved on.
+    """
+    def apply(campaigns):
+        for c in campaigns:
+            if c['id'] == campaign_id:
+                if from_statuses is not None and c.get('status') not in from_statuses:
+                    return None
+                c.update(fields)
+                return dict(c)
+        return None
+    try:
+        return update_json_file(CAMPAIGNS_FILE, apply, default=[])
+    except Exception as e:
+        print(f"❌ Error updating campaign {campaign_id}: {str(e)}")
+        return None
+
+def add_campaign(campaign):
+    """Append a campaign, assigning the next id under the write lock; returns the id"""
+    def apply(campaigns):
+        campaign['id'] = max((c['id'] for c in campaigns), default=0) + 1
+        campaigns.append(campaign)
+        return campaign['id']
+    return update_json_file(CAMPAIGNS_FILE, apply, default=[])
+
+# Where a sender-paused campaign picks up again (see pause_campaign_run)
+CLEARED_RESUME_POINT = {'resume_index': 0, 'resume_email': None, 'pause_reason': None}
+
+def begin_campaign_run(campaign_id):
+    """Mark a ready, stopped or paused campaign running; returns it, or None
+
+    A campaign the sender paused (circuit breaker, rate limit) keeps its
+    resume point and counters, so the run continues with the recipients it
+    had not reached. Any other start begins again from the first recipient.
+    """
+    def apply(campaigns):
+        for c in campaigns:
+            if c['id'] == campaign_id:
+                if c.get('status') not in ('ready', 'stopped', 'paused'):
+                    return None
+                if c.get('status') != 'paused' or not c.get('resume_index'):
+                    c.update(total_sent=0, total_attempted=0, **CLEARED_RESUME_POINT)
+                c.update(status='running', started_at=datetime.now().isoformat())
+                return dict(c)
+        return None
+    try:
+        return update_json_file(CAMPAIGNS_FILE, apply, default=[])
+    except Exception as e:
+        print(f"❌ Error starting campaign {campaign_id}: {str(e)}")
+        return None
+
+def carried_totals(campaign):
+    """(sent, attempted) already counted before this run, for a resumed campaign"""
+    if campaign.get('resume_index'):
+        return campaign.get('total_sent', 0), campaign.get('total_attempted', 0)
+    return 0, 0
+
+def resume_position(campaign, recipients):
+    """Index in recipients where this run starts: 0, or the first recipient a paused run did not reach"""
+    resume_index = campaign.get('resume_index') or 0
+    if not resume_index:
+        return 0
+    # The address is authoritative; the index shifts if suppressions were added meanwhile
+    resume_email = campaign.get('resume_email')
+    if resume_email:
+        try:
+            return recipients.index(resume_email)
+        except ValueError:
+            pass
+    return min(resume_index, len(recipients))
+
+def pause_campaign_run(campaign, recipients, next_index, result):
+    """Leave a campaign whose sender stopped early paused at recipients[next_index]
+
+    Counters include this run, so starting the campaign again resumes
+    instead of resending. A campaign stopped from the UI meanwhile stays stopped.
+    """
+    carried_sent, carried_attempted = carried_totals(campaign)
+    paused = transition_campaign(
+        campaign['id'], ['running'], status='paused', paused_at=datetime.now().isoformat(),
+        pause_reason=result.get('pause_reason'), resume_index=next_index,
+        resume_email=recipients[next_index] if next_index < len(recipients) else None,
+        total_sent=carried_sent + result.get('emails_sent', 0),
+        total_attempted=carried_attempted + result.get('total_attempted', 0)
+    )
+    if paused:
+        print(f"⏸️ Campaign '{campaign['name']}' paused before recipient {next_index + 1}/{len(recipients)}: "
+              f"{result.get('pause_reason')}")
+    return paused
+
+def remove_campaign(campaign_id):
+    """Remove a campaign from campaigns.json; returns it, or None if it was not there"""
+    def apply(campaigns):
+        for i, c in enumerate(campaigns):
+            if c['id'] == campaign_id:
+                return campaigns.pop(i)
+        return None
+    return update_json_file(CAMPAIGNS_FILE, apply, default=[])
+
 # Optimized data loading functions
 def get_accounts_optimized():
     """Optimized accounts loading with caching"""
-    if not hasattr(get_accounts_optimized, 'cache') or time.time() - getattr(get_accounts_optimized, 'last_load', 0) > 60:
-        accounts = read_json_file_simple(ACCOUNTS_FILE)
-        get_accounts_optimized.cache = accounts
-        get_accounts_optimized.last_load = time.time()
-    return get_accounts_optimized.cache
+    return read_json_file_simple(ACCOUNTS_FILE)
 
 def get_campaigns_optimized():
     """Optimized campaigns loading with caching"""
-    if not hasattr(get_campaigns_optimized, 'cache') or time.time() - getattr(get_campaigns_optimized, 'last_load', 0) > 60:
-        campaigns = read_json_file_simple(CAMPAIGNS_FILE)
-        get_campaigns_optimized.cache = campaigns
-        get_campaigns_optimized.last_load = time.time()
-    return get_campaigns_optimized.cache
+    return read_json_file_simple(CAMPAIGNS_FILE)
 
 def get_users_optimized():
     """Optimized users loading with caching"""
-    if not hasattr(get_users_optimized, 'cache') or time.time() - getattr(get_users_optimized, 'last_load', 0) > 60:
-        users = read_json_file_simple(USERS_FILE)
-        get_users_optimized.cache = users
-        get_users_optimized.last_load = time.time()
-    return get_users_optimized.cache
+    return read_json_file_simple(USERS_FILE)
 
 # Replace excessive print statements with minimal logging
 def log_important(message, level="INFO"):
@@ -4436,8 +4767,68 @@ def log_important(message, level="INFO"):
         print(f"[{level}] {message}")
 
 # Template detection and management functions
-def detect_available_templates(account):
-    """Detect available email templates for an account and fetch template IDs"""
+TEMPLATE_PROBE_WORKERS = 5      # Concurrent probes per account
+TEMPLATE_PROBE_TIMEOUT = 10     # Per-probe timeout in seconds
+TEMPLATE_DETECTION_DEADLINE = 20  # Overall detection deadline in seconds
+
+def zoho_browser_headers(account):
+    """Account headers plus the browser headers Zoho expects"""
+    headers = account['headers'].copy()
+    headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:140.0) Gecko/20100101 Firefox/140.0',
+        'Accept': 'application/json',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate, br, zstd',
+        'Referer': 'https://crm.zoho.com/',
+        'X-Requested-With': 'XMLHttpRequest',
+        'Origin': 'https://crm.zoho.com',
+        'Connection': 'keep-alive',
+        'Sec-Fetch-Dest': 'empty',
+        'Sec-Fetch-Mode': 'cors',
+        'Sec-Fetch-Site': 'same-origin',
+        'Priority': 'u=0',
+        'TE': 'trailers'
+    })
+    return headers
+
+def probe_template_function(session, template_num, timeout):
+    """POST a no-op script to send_email_template{N}; True if the function exists"""
+    url = f"https://crm.zoho.com/crm/v7/settings/functions/send_email_template{template_num}/actions/test"
+    
+    # Create a simple test script
+    test_script = f'''void automation.Send_Email_Template{template_num}()
+{{
+    // Simple test to check if template exists
+    info "Template {template_num} test";
+}}'''
+    
+    json_data = {
+        'functions': [
+            {
+                'script': test_script,
+                'arguments': {},
+            },
+        ],
+    }
+    
+    response = session.post(url, json=json_data, timeout=timeout)
+    return response.status_code == 200, url, response.status_code
+
+def detect_available_templates(account, on_partial=None, deadline=TEMPLATE_DETECTION_DEADLINE):
+    """Detect available email templates for an account and fetch template IDs
+    
+    Template functions are probed concurrently over one pooled session.
+    Detection stops at the deadline; on_partial(templates) is called with the
+    templates found so far each time a new one is confirmed (callers keep
+    these in memory; the final list is what gets persisted).
+    """
+    started = time.time()
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=TEMPLATE_PROBE_WORKERS)
+    session.mount('https://', adapter)
+    session.headers.update(zoho_browser_headers(account))
+    session.cookies.update(account['cookies'])
+    
     try:
         print(f"🔍 Detecting templates for account: {account['name']}")
         
@@ -4448,29 +4839,7 @@ def detect_available_templates(account):
         print(f"📧 Fetching email templates from Zoho CRM...")
         try:
             templates_url = "https://www.zohoapis.com/crm/v7/settings/email_templates"
-            headers = account['headers'].copy()
-            headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:140.0) Gecko/20100101 Firefox/140.0',
-                'Accept': 'application/json',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br, zstd',
-                'Referer': 'https://crm.zoho.com/',
-                'X-Requested-With': 'XMLHttpRequest',
-                'Origin': 'https://crm.zoho.com',
-                'Connection': 'keep-alive',
-                'Sec-Fetch-Dest': 'empty',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'same-origin',
-                'Priority': 'u=0',
-                'TE': 'trailers'
-            })
-            
-            response = requests.get(
-                templates_url,
-                cookies=account['cookies'],
-                headers=headers,
-                timeout=15
-            )
+            response = session.get(templates_url, timeout=min(15, deadline))
             
             if response.status_code == 200:
                 templates_data = response.json()
@@ -4488,7 +4857,6 @@ def detect_available_templates(account):
                         'subject': template.get('subject', ''),
                         'content': template.get('content', '')[:100] + '...' if template.get('content') else ''
                     }
-                    print(f"📋 Found template: {template_name} (ID: {template_id})")
             else:
                 print(f"⚠️ Could not fetch templates from Zoho CRM (Status: {response.status_code})")
                 zoho_templates = []
@@ -4499,114 +4867,98 @@ def detect_available_templates(account):
             zoho_templates = []
             template_mapping = {}
         
-        # Now test each template function
-        for template_num in template_numbers:
-            try:
-                # Test template endpoint
-                url = f"https://crm.zoho.com/crm/v7/settings/functions/send_email_template{template_num}/actions/test"
-                
-                # Create a simple test script
-                test_script = f'''void automation.Send_Email_Template{template_num}()
-{{
-    // Simple test to check if template exists
-    info "Template {template_num} test";
-}}'''
+        # Now test the template functions concurrently
+        remaining = max(deadline - (time.time() - started), 1)
+        probe_timeout = min(TEMPLATE_PROBE_TIMEOUT, remaining)
+        executor = ThreadPoolExecutor(max_workers=TEMPLATE_PROBE_WORKERS)
+        futures = {
+            executor.submit(probe_template_function, session, template_num, probe_timeout): template_num
+            for template_num in template_numbers
+        }
+        
+        try:
+            for future in as_completed(futures, timeout=remaining):
+                template_num = futures[future]
+                try:
+                    available, url, status_code = future.result()
+                except Exception as e:
+                    print(f"⚠️ Error testing template {template_num}: {str(e)}")
+                    continue
                 
-                json_data = {
-                    'functions': [
-                        {
-                            'script': test_script,
-                            'arguments': {},
-                        },
-                    ],
-                }
+                if not available:
+                    print(f"❌ Template {template_num} not available (Status: {status_code})")
+                    continue
                 
-                headers = account['headers'].copy()
-                headers.update({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:140.0) Gecko/20100101 Firefox/140.0',
-                    'Accept': 'application/json',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate, br, zstd',
-                    'Referer': 'https://crm.zoho.com/',
-                    'X-Requested-With': 'XMLHttpRequest',
-                    'Origin': 'https://crm.zoho.com',
-                    'Connection': 'keep-alive',
-                    'Sec-Fetch-Dest': 'empty',
-                    'Sec-Fetch-Mode': 'cors',
-                    'Sec-Fetch-Site': 'same-origin',
-                    'Priority': 'u=0',
-                    'TE': 'trailers'
+                available_templates.append({
+                    'number': template_num,
+                    'url': url,
+                    'function_name': f'Send_Email_Template{template_num}',
+                    'status': 'available',
+                    'zoho_templates': zoho_templates,  # Include all fetched templates
+                    'template_mapping': template_mapping  # Include template mapping
                 })
+                available_templates.sort(key=lambda t: t['number'])
+                print(f"✅ Template {template_num} is available")
                 
-                response = requests.post(
-                    url,
-                    json=json_data,
-                    cookies=account['cookies'],
-                    headers=headers,
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    template_info = {
-                        'number': template_num,
-                        'url': url,
-                        'function_name': f'Send_Email_Template{template_num}',
-                        'status': 'available',
-                        'zoho_templates': zoho_templates,  # Include all fetched templates
-                        'template_mapping': template_mapping  # Include template mapping
-                    }
-                    available_templates.append(template_info)
-                    print(f"✅ Template {template_num} is available")
-                else:
-                    print(f"❌ Template {template_num} not available (Status: {response.status_code})")
-                    
-            except Exception as e:
-                print(f"⚠️ Error testing template {template_num}: {str(e)}")
-                continue
-        
-        print(f"📊 Found {len(available_templates)} available templates")
+                if on_partial:
+                    try:
+                        on_partial(list(available_templates))
+                    except Exception as e:
+                        print(f"⚠️ Could not save partial template info: {e}")
+        except FuturesTimeoutError:
+            pending = [futures[f] for f in futures if not f.done()]
+            print(f"⏰ Template detection deadline reached, unfinished probes: {pending}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        print(f"📊 Found {len(available_templates)} available templates in {time.time() - started:.1f}s")
         return available_templates
         
     except Exception as e:
         print(f"❌ Error detecting templates: {str(e)}")
         return []
+    finally:
+        # Probes abandoned at the deadline fail fast once the pool is closed
+        session.close()
+
+def save_account_template_info(account, available_templates):
+    """Persist detected templates on the account record"""
+    first_template = available_templates[0] if available_templates else None
+    fields = {
+        'template_info': available_templates,
+        'template_info_updated_at': time.time(),
+        'zoho_templates': first_template.get('zoho_templates', []) if first_template else [],
+        'template_mapping': first_template.get('template_mapping', {}) if first_template else {}
+    }
+    
+    def apply(accounts):
+        for acc in accounts:
+            if acc['id'] == account['id']:
+                acc.update(fields)
+                return True
+        return False
+    
+    return update_json_file(ACCOUNTS_FILE, apply, default=[])
+
+# Detection results per account; send paths read this and never probe inline
+template_capabilities = TemplateCapabilityCache(detect_available_templates, on_refresh=save_account_template_info)
 
 def get_account_template_info(account, template_id=None):
-    """Get template information for an account"""
+    """Get template information for an account (never blocks on detection)"""
     try:
-        # If account has stored template info, use it
-        if 'template_info' in account and account['template_info']:
-            templates = account['template_info']
-            
-            # If specific template_id requested, find it
-            if template_id:
-                for template in templates:
-                    if template.get('template_id') == template_id:
-                        return template
-                return None
-            
-            # Return first available template as default
-            return templates[0] if templates else None
+        templates = template_capabilities.get(account)
+        if not templates:
+            print(f"🔍 No template info yet for account {account['name']}, detection scheduled in background")
+            return None
         
-        # Fallback: detect templates if not stored
-        print(f"🔍 No stored template info, detecting templates for account: {account['name']}")
-        available_templates = detect_available_templates(account)
+        # If specific template_id requested, prefer it
+        if template_id:
+            for template in templates:
+                if template.get('template_id') == template_id:
+                    return template
         
-        # Update account with template info
-        if available_templates:
-            account['template_info'] = available_templates
-            # Save updated account info
-            try:
-                accounts = read_json_file_simple(ACCOUNTS_FILE)
-                for i, acc in enumerate(accounts):
-                    if acc['id'] == account['id']:
-                        accounts[i]['template_info'] = available_templates
-                        write_json_file_simple(ACCOUNTS_FILE, accounts)
-                        break
-            except Exception as e:
-                print(f"⚠️ Could not save template info: {e}")
-        
-        return available_templates[0] if available_templates else None
+        # Return first available template as default
+        return templates[0]
         
     except Exception as e:
         print(f"❌ Error getting template info: {str(e)}")
@@ -4623,83 +4975,14 @@ def get_template_url_and_function(account, template_id=None):
                 'function_name': template_info['function_name'],
                 'template_number': template_info['number']
             }
-        else:
-            # Test which templates are actually available for this account
-            print(f"🔍 Testing available templates for account: {account['name']}")
-            available_templates = []
-            
-            # Test templates 1-10 to see which ones exist
-            for template_num in range(1, 11):
-                test_url = f"https://crm.zoho.com/crm/v7/settings/functions/send_email_template{template_num}/actions/test"
-                
-                try:
-                    # Create a simple test script
-                    test_script = f'''void automation.Send_Email_Template{template_num}()
-{{
-    info "Testing template {template_num}";
-}}'''
-                    
-                    test_data = {'functions': [{'script': test_script, 'arguments': {}}]}
-                    
-                    # Use account headers
-                    headers = account['headers'].copy()
-                    headers.update({
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:140.0) Gecko/20100101 Firefox/140.0',
-                        'Accept': 'application/json',
-                        'Accept-Language': 'en-US,en;q=0.5',
-                        'Accept-Encoding': 'gzip, deflate, br, zstd',
-                        'Referer': 'https://crm.zoho.com/',
-                        'X-Requested-With': 'XMLHttpRequest',
-                        'Origin': 'https://crm.zoho.com',
-                        'Connection': 'keep-alive',
-                        'Sec-Fetch-Dest': 'empty',
-                        'Sec-Fetch-Mode': 'cors',
-                        'Sec-Fetch-Site': 'same-origin',
-                        'Priority': 'u=0',
-                        'TE': 'trailers'
-                    })
-                    
-                    response = requests.post(test_url, json=test_data, cookies=account['cookies'], headers=headers, timeout=10)
-                    
-                    if response.status_code == 200:
-                        print(f"✅ Template {template_num} is available")
-                        available_templates.append({
-                            'url': test_url,
-                            'function_name': f'Send_Email_Template{template_num}',
-                            'number': template_num
-                        })
-                    else:
-                        print(f"❌ Template {template_num} not available (Status: {response.status_code})")
-                        
-                except Exception as e:
-                    print(f"❌ Error testing template {template_num}: {e}")
-                    continue
-            
-            if available_templates:
-                # Use the first available template
-                selected_template = available_templates[0]
-                print(f"🎯 Using template {selected_template['number']} for account {account['name']}")
-                
-                # Save this info to the account for future use
-                try:
-                    accounts = read_json_file_simple(ACCOUNTS_FILE)
-                    for i, acc in enumerate(accounts):
-                        if acc['id'] == account['id']:
-                            accounts[i]['template_info'] = available_templates
-                            write_json_file_simple(ACCOUNTS_FILE, accounts)
-                            break
-                except Exception as e:
-                    print(f"⚠️ Could not save template info: {e}")
-                
-                return selected_template
-            else:
-                # No templates found, use template1 as last resort
-                print(f"⚠️ No templates found for account {account['name']}, using template1 as fallback")
-                return {
-                    'url': "https://crm.zoho.com/crm/v7/settings/functions/send_email_template1/actions/test",
-                    'function_name': 'Send_Email_Template1',
-                    'template_number': 1
-                }
+        
+        # Detection pending or nothing found, use template1 as last resort
+        print(f"⚠️ No templates known for account {account['name']}, using template1 as fallback")
+        return {
+            'url': "https://crm.zoho.com/crm/v7/settings/functions/send_email_template1/actions/test",
+            'function_name': 'Send_Email_Template1',
+            'template_number': 1
+        }
             
     except Exception as e:
         print(f"❌ Error getting template URL: {str(e)}")
@@ -4887,22 +5170,25 @@ def send_universal_campaign_emails(campaign, account):
         # Get emails from data list with start line support
         try:
             start_line = campaign.get('start_line', 1)
-            emails = get_data_list_emails(data_list_id, start_line)
-            if not emails:
+            filtered_emails, suppression_stats = apply_suppression(iter_data_list_emails(data_list_id, start_line), campaign)
+            if not suppression_stats['checked']:
                 print("❌ No emails found in data list")
                 return
-            print(f"📧 Found {len(emails)} emails in data list (starting from line {start_line})")
+            print(f"📧 Found {suppression_stats['checked']} emails in data list (starting from line {start_line}), "
+                  f"{len(filtered_emails)} after suppression")
         except Exception as e:
             print(f"❌ Error getting emails from data list: {str(e)}")
             return
         
-        # Use all emails (no bounce filtering since bounce system was removed)
-        filtered_emails = emails
-        
         if not filtered_emails:
             print("❌ No emails to send to")
             return
         
+        # A campaign the sender paused continues with the recipients it did not reach
+        position = resume_position(campaign, filtered_emails)
+        if position:
+            print(f"▶️ Resuming at recipient {position + 1}/{len(filtered_emails)}")
+        
         # Get campaign content
         subject = campaign['subject']
         message = campaign['message']  # Custom template content
@@ -4918,7 +5204,7 @@ def send_universal_campaign_emails(campaign, account):
         # Send emails using sequential email function (one by one)
         result = send_sequential_emails(
             account=account,
-            recipients=filtered_emails,
+            recipients=filtered_emails[position:],
             subject=subject,
             message=message,
             from_name=from_name,
@@ -4927,15 +5213,17 @@ def send_universal_campaign_emails(campaign, account):
             test_after_config=test_after_config
         )
         
-        # Update campaign status based on result
-        campaigns = read_json_file_simple(CAMPAIGNS_FILE)
-        campaign_index = next((i for i, c in enumerate(campaigns) if c['id'] == campaign['id']), None)
-        if campaign_index is not None:
-            if result['success']:
-                campaigns[campaign_index]['status'] = 'completed'
-                campaigns[campaign_index]['completed_at'] = datetime.now().isoformat()
-                campaigns[campaign_index]['total_sent'] = result.get('emails_sent', 0)
-                campaigns[campaign_index]['total_attempted'] = result.get('total_attempted', 0)
+        # Update campaign status based on result; a campaign stopped or
+        # paused from the UI meanwhile keeps that status
+        if result.get('paused'):
+            # Resumable: starting the campaign again picks up at the first unsent recipient
+            pause_campaign_run(campaign, filtered_emails, position + result['next_index'], result)
+        elif result['success']:
+            carried_sent, carried_attempted = carried_totals(campaign)
+            if transition_campaign(campaign['id'], ['running'], status='completed', completed_at=datetime.now().isoformat(),
+                                   total_sent=carried_sent + result.get('emails_sent', 0),
+                                   total_attempted=carried_attempted + result.get('total_attempted', 0),
+                                   **CLEARED_RESUME_POINT):
                 # Add success log
                 add_campaign_log(campaign['id'], {
                     'timestamp': datetime.now().isoformat(),
@@ -4945,10 +5233,9 @@ def send_universal_campaign_emails(campaign, account):
                 })
                 print(f"✅ Campaign completed successfully - {result.get('emails_sent', 0)} emails sent")
                 add_notification(f"Campaign '{campaign['name']}' completed successfully", 'success', campaign['id'])
-            else:
-                campaigns[campaign_index]['status'] = 'failed'
-                campaigns[campaign_index]['failed_at'] = datetime.now().isoformat()
-                campaigns[campaign_index]['total_attempted'] = result.get('total_attempted', 0)
+        else:
+            if transition_campaign(campaign['id'], ['running'], status='failed', failed_at=datetime.now().isoformat(),
+                                   total_attempted=result.get('total_attempted', 0)):
                 # Add failure log
                 add_campaign_log(campaign['id'], {
                     'timestamp': datetime.now().isoformat(),
@@ -4958,13 +5245,13 @@ def send_universal_campaign_emails(campaign, account):
                 })
                 print(f"❌ Campaign failed: {result.get('message', 'Unknown error')}")
                 add_notification(f"Campaign '{campaign['name']}' failed: {result.get('message', 'Unknown error')}", 'error', campaign['id'])
-            # Save updated campaign
-            write_json_file_simple(CAMPAIGNS_FILE, campaigns)
         
         # Remove from running campaigns
         if campaign['id'] in running_campaigns:
             del running_campaigns[campaign['id']]
         
+        return result
+        
     except Exception as e:
         print(f"❌ Error in universal campaign sending: {str(e)}")
         import traceback
@@ -4972,13 +5259,7 @@ def send_universal_campaign_emails(campaign, account):
         
         # Update campaign status to failed
         try:
-            campaigns = read_json_file_simple(CAMPAIGNS_FILE)
-            campaign_index = next((i for i, c in enumerate(campaigns) if c['id'] == campaign['id']), None)
-            
-            if campaign_index is not None:
-                campaigns[campaign_index]['status'] = 'failed'
-                campaigns[campaign_index]['failed_at'] = datetime.now().isoformat()
-                
+            if transition_campaign(campaign['id'], status='failed', failed_at=datetime.now().isoformat()):
                 # Add error log
                 add_campaign_log(campaign['id'], {
                     'timestamp': datetime.now().isoformat(),
@@ -4986,8 +5267,6 @@ def send_universal_campaign_emails(campaign, account):
                     'message': f'Campaign error: {str(e)}',
                     'details': {'error': str(e)}
                 })
-                
-                write_json_file_simple(CAMPAIGNS_FILE, campaigns)
         except:
             pass
         
@@ -4996,6 +5275,7 @@ def send_universal_campaign_emails(campaign, account):
             del running_campaigns[campaign['id']]
         
         add_notification(f"Campaign '{campaign['name']}' failed with error: {str(e)}", 'error', campaign['id'])
+        return {'success': False, 'message': str(e)}
 
 def send_multi_account_campaign(campaign, accounts, recipients, subject, message, from_name=None, template_id=None, test_after_config=None):
     """
@@ -5005,6 +5285,13 @@ def send_multi_account_campaign(campaign, accounts, recipients, subject, message
         print(f"🚀 Starting multi-account campaign: {campaign['name']}")
         print(f"📧 Using {len(accounts)} accounts for {len(recipients)} recipients")
         
+        # A campaign the sender paused continues with the recipients it did not reach
+        all_recipients = recipients
+        position = resume_position(campaign, all_recipients)
+        if position:
+            print(f"▶️ Resuming at recipient {position + 1}/{len(all_recipients)}")
+            recipients = all_recipients[position:]
+        
         # Split recipients between accounts
         total_recipients = len(recipients)
         accounts_count = len(accounts)
@@ -5029,7 +5316,8 @@ def send_multi_account_campaign(campaign, accounts, recipients, subject, message
             account_recipients.append({
                 'account': account,
                 'recipients': account_recipients_chunk,
-                'count': len(account_recipients_chunk)
+                'count': len(account_recipients_chunk),
+                'start': start_index
             })
             
             print(f"📧 Account {account['name']}: {len(account_recipients_chunk)} recipients")
@@ -5057,7 +5345,17 @@ def send_multi_account_campaign(campaign, accounts, recipients, subject, message
                 test_after_config=test_after_config
             )
             
-            if result.get('success'):
+            if result.get('paused'):
+                # Chunks go out in order, so everything from here on is still unsent:
+                # pause the campaign there instead of dropping the rest
+                next_index = account_data['start'] + result['next_index']
+                total_sent += result.get('emails_sent', 0)
+                total_failed += result.get('emails_failed', 0)
+                pause_campaign_run(campaign, all_recipients, position + next_index,
+                                   dict(result, emails_sent=total_sent, total_attempted=next_index))
+                return dict(result, emails_sent=total_sent, emails_failed=total_failed,
+                            total_attempted=next_index, next_index=next_index, accounts_used=len(accounts))
+            elif result.get('success'):
                 total_sent += result.get('emails_sent', 0)
                 total_failed += result.get('emails_failed', 0)
                 print(f"✅ Account {account['name']} completed: {result.get('emails_sent', 0)} sent, {result.get('emails_failed', 0)} failed")
@@ -5092,6 +5390,10 @@ def send_sequential_emails(account, recipients, subject, message, from_name=None
     """
     Sequential email sending function - sends emails one by one with proper delays
     This ensures emails are sent sequentially, not in parallel
+    
+    If sending has to stop early (unhealthy account, rate limit), the result
+    has success False, paused True, pause_reason, and next_index: the
+    position in recipients of the first one not attempted.
     """
     try:
         print(f"📧 Starting sequential email sending to {len(recipients)} recipients")
@@ -5131,6 +5433,8 @@ def send_sequential_emails(account, recipients, subject, message, from_name=None
         emails_sent = 0
         emails_failed = 0
         burst_count = 0
+        pause_reason = None
+        next_index = len(recipients)
         
         # Emit campaign start event
         if campaign_id:
@@ -5150,6 +5454,12 @@ def send_sequential_emails(account, recipients, subject, message, from_name=None
         # Send emails one by one
         for i, recipient in enumerate(recipients):
             try:
+                # Unsubscribes and complaints received while the campaign runs
+                suppressed_reason = suppression_store.is_suppressed(recipient)
+                if suppressed_reason:
+                    print(f"🚫 Skipping {recipient}: suppressed ({suppressed_reason})")
+                    continue
+                
                 # Check rate limit before each email
                 allowed, wait_time, reason = check_rate_limit(user_id, campaign_id)
                 if not allowed:
@@ -5160,14 +5470,54 @@ def send_sequential_emails(account, recipients, subject, message, from_name=None
                     allowed, wait_time, reason = check_rate_limit(user_id, campaign_id)
                     if not allowed:
                         print(f"❌ Still rate limited after waiting: {reason}")
+                        pause_reason = f"rate limited: {reason}"
+                        next_index = i
+                        if campaign_id:
+                            add_notification(f"Campaign paused: {pause_reason}", 'error', campaign_id)
+                        break
+                
+                # Circuit breaker: pause while this account is unhealthy
+                allowed, wait_time, breaker_state = account_health.allow(account['id'])
+                stop_reason = None
+                while not allowed:
+                    health = account_health.snapshot(account['id'])
+                    if health['auth_failed'] and wait_time > 0:
+                        stop_reason = f"authentication failed for account {account['name']} - please update its cookies"
                         break
+                    if wait_time > MAX_CIRCUIT_WAIT:
+                        stop_reason = f"account {account['name']} is unhealthy ({health['reason']}), retry in {wait_time:.0f}s"
+                        break
+                    print(f"🔌 Circuit {breaker_state} for {account['name']}: waiting {wait_time:.1f}s before retrying")
+                    time.sleep(wait_time)
+                    allowed, wait_time, breaker_state = account_health.allow(account['id'])
+                
+                if stop_reason:
+                    print(f"⏹️ Stopping sends: {stop_reason}")
+                    if campaign_id:
+                        add_campaign_log(campaign_id, {
+                            'timestamp': datetime.now().isoformat(),
+                            'status': 'error',
+                            'message': f'⏹️ Sending paused after {i}/{len(recipients)} emails: {stop_reason}',
+                            'email': None,
+                            'subject': subject,
+                            'sender': f"{from_display} <{account.get('org_id', 'test')}@zoho.com>"
+                        })
+                        add_notification(f"Campaign paused: {stop_reason}", 'error', campaign_id)
+                    pause_reason = stop_reason
+                    next_index = i
+                    break
+                
+                # Per-recipient unsubscribe link for templates that include the placeholder
+                recipient_message = escaped_message
+                if UNSUBSCRIBE_SECRET and UNSUBSCRIBE_PLACEHOLDER in recipient_message:
+                    recipient_message = recipient_message.replace(UNSUBSCRIBE_PLACEHOLDER, unsubscribe_url(recipient, campaign_id))
                 
                 # Create Deluge script for single email
                 script = f'''void automation.{function_name}()
 {{
     // Sequential email sending - single recipient
     emailSubject = "{escaped_subject}";
-    emailMessage = "{escaped_message}";
+    emailMessage = "{recipient_message}";
     
     // Single recipient
     destinataires = ["{recipient}"];
@@ -5205,7 +5555,21 @@ def send_sequential_emails(account, recipients, subject, message, from_name=None
                 
                 print(f"📧 Sending email {i+1}/{len(recipients)} to: {recipient}")
                 
-                response = requests.post(url, json=json_data, cookies=account['cookies'], headers=headers, timeout=60)
+                send_started = time.time()
+                try:
+                    response = requests.post(url, json=json_data, cookies=account['cookies'], headers=headers, timeout=60)
+                except requests.exceptions.RequestException as e:
+                    account_health.record(account['id'], False, time.time() - send_started, error=str(e))
+                    raise
+                
+                auth_failed = response.status_code != 200 and is_auth_failure(response.status_code, response.text)
+                account_health.record(
+                    account['id'],
+                    response.status_code == 200,
+                    time.time() - send_started,
+                    status_code=response.status_code,
+                    auth_failed=auth_failed
+                )
                 
                 if response.status_code == 200:
                     print(f"✅ Email {i+1} sent successfully to {recipient}")
@@ -5368,6 +5732,20 @@ def send_sequential_emails(account, recipients, subject, message, from_name=None
                     except Exception as e:
                         print(f"⚠️ Socket.IO emission failed: {e}")
         
+        if pause_reason:
+            print(f"⏸️ Sequential email sending paused at {next_index}/{len(recipients)}: {pause_reason}")
+            return {
+                'success': False,
+                'paused': True,
+                'pause_reason': pause_reason,
+                'next_index': next_index,
+                'message': f'Sending paused after {next_index}/{len(recipients)} recipients: {pause_reason}',
+                'emails_sent': emails_sent,
+                'emails_failed': emails_failed,
+                'total_attempted': next_index,
+                'account_name': account['name']
+            }
+        
         print(f"🏁 Sequential email sending completed!")
         print(f"✅ Successfully sent: {emails_sent}")
         print(f"❌ Failed: {emails_failed}")
@@ -5769,12 +6147,9 @@ def duplicate_campaign(campaign_id):
         if not has_permission(current_user, 'view_all_campaigns') and original_campaign.get('created_by') != current_user.id:
             return jsonify({'error': 'Access denied. You can only duplicate your own campaigns.'}), 403
         
-        # Generate new campaign ID
-        new_id = max([camp['id'] for camp in campaigns], default=0) + 1 if campaigns else 1
-        
         # Create duplicate campaign with all original configurations
         duplicated_campaign = {
-            'id': new_id,
+            'id': None,  # Assigned by add_campaign under the write lock
             'name': f"{original_campaign['name']} (Copy)",
             'account_id': original_campaign['account_id'],
             'subject': original_campaign.get('subject', ''),
@@ -5795,10 +6170,12 @@ def duplicate_campaign(campaign_id):
         }
         
         # Add to campaigns list
-        campaigns.append(duplicated_campaign)
-        
-        # Save updated campaigns
-        write_success = write_json_file_simple(CAMPAIGNS_FILE, campaigns)
+        try:
+            new_id = add_campaign(duplicated_campaign)
+            write_success = True
+        except Exception as e:
+            print(f"❌ Error saving duplicated campaign: {str(e)}")
+            write_success = False
         
         if write_success:
             add_notification(f"Campaign '{original_campaign['name']}' duplicated successfully", 'success', new_id)
@@ -5829,11 +6206,8 @@ def reset_campaign_status(campaign_id):
             }), 404
         
         # Reset campaign status to ready
-        campaign['status'] = 'ready'
-        campaign['total_sent'] = 0
-        campaign['total_attempted'] = 0
-        campaign['started_at'] = None
-        campaign['completed_at'] = None
+        transition_campaign(campaign_id, status='ready', total_sent=0, total_attempted=0,
+                            started_at=None, completed_at=None)
         
         # Clear execution tracker for this campaign
         campaign_key = f"campaign_{campaign_id}"
@@ -5844,9 +6218,6 @@ def reset_campaign_status(campaign_id):
         if campaign_id in execution_locks:
             del execution_locks[campaign_id]
         
-        # Save updated campaign
-        write_json_file_simple(CAMPAIGNS_FILE, campaigns)
-        
         add_notification(f"Campaign '{campaign['name']}' status reset to ready", 'success')
         return jsonify({
             'success': True,
@@ -5931,91 +6302,38 @@ from functools import lru_cache
 from collections import defaultdict
 import time
 
-# Global caches for better performance
-_account_cache = {}
-_campaign_cache = {}
-_user_cache = {}
-_data_list_cache = {}
-_cache_lock = threading.Lock()
-
-# Cache TTL (Time To Live) in seconds
-CACHE_TTL = 300  # 5 minutes
-
-def clear_expired_cache():
-    """Clear expired cache entries"""
-    global _account_cache, _campaign_cache, _user_cache, _data_list_cache
-    current_time = time.time()
-    
-    with _cache_lock:
-        # Clear expired account cache
-        expired_accounts = [k for k, v in _account_cache.items() if current_time - v['timestamp'] > CACHE_TTL]
-        for k in expired_accounts:
-            del _account_cache[k]
-        
-        # Clear expired campaign cache
-        expired_campaigns = [k for k, v in _campaign_cache.items() if current_time - v['timestamp'] > CACHE_TTL]
-        for k in expired_campaigns:
-            del _campaign_cache[k]
-        
-        # Clear expired user cache
-        expired_users = [k for k, v in _user_cache.items() if current_time - v['timestamp'] > CACHE_TTL]
-        for k in expired_users:
-            del _user_cache[k]
-        
-        # Clear expired data list cache
-        expired_lists = [k for k, v in _data_list_cache.items() if current_time - v['timestamp'] > CACHE_TTL]
-        for k in expired_lists:
-            del _data_list_cache[k]
+# All JSON data caching goes through data_cache (see versioned_cache.py);
+# entries are validated against file mtime/size so there is no TTL to expire.
 
-# Schedule cache cleanup every 5 minutes
+# Schedule memory cleanup every 5 minutes
 def schedule_cache_cleanup():
     while True:
         time.sleep(300)  # 5 minutes
-        clear_expired_cache()
         gc.collect()  # Force garbage collection
 
 # Start cache cleanup thread
 cache_cleanup_thread = threading.Thread(target=schedule_cache_cleanup, daemon=True)
 cache_cleanup_thread.start()
 
+# Bounce webhook events; started here because journal replay uses the campaign file helpers above
+bounce_store = BounceStore(BOUNCE_DB_FILE)
+bounce_intake = BounceIntake(bounce_store, BOUNCE_JOURNAL_PREFIX, on_new=apply_new_bounces)
+bounce_intake.start()
+
 # Optimized file reading with caching
-def read_json_file_optimized(file_path, cache_dict, cache_key):
+def read_json_file_optimized(file_path):
     """Optimized JSON file reading with caching"""
-    current_time = time.time()
-    
-    with _cache_lock:
-        if cache_key in cache_dict:
-            cache_entry = cache_dict[cache_key]
-            if current_time - cache_entry['timestamp'] < CACHE_TTL:
-                return cache_entry['data']
-    
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        with _cache_lock:
-            cache_dict[cache_key] = {
-                'data': data,
-                'timestamp': current_time
-            }
-        
-        return data
+        return data_cache.get_json(file_path)
     except Exception as e:
         print(f"❌ Error reading {file_path}: {str(e)}")
         return {}
 
 # Optimized file writing with cache invalidation
-def write_json_file_optimized(file_path, data, cache_dict, cache_key):
-    """Optimized JSON file writing with cache invalidation"""
+def write_json_file_optimized(file_path, data):
+    """Optimized JSON file writing with cache write-through"""
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        # Invalidate cache
-        with _cache_lock:
-            if cache_key in cache_dict:
-                del cache_dict[cache_key]
-        
+        data_cache.write_json(file_path, data)
         return True
     except Exception as e:
         print(f"❌ Error writing {file_path}: {str(e)}")
@@ -6060,36 +6378,36 @@ def replace_prints_with_optimized_logging():
 # Optimized data loading functions
 def load_accounts_optimized():
     """Optimized accounts loading with caching"""
-    return read_json_file_optimized(ACCOUNTS_FILE, _account_cache, 'accounts')
+    return read_json_file_optimized(ACCOUNTS_FILE)
 
 def load_campaigns_optimized():
     """Optimized campaigns loading with caching"""
-    return read_json_file_optimized(CAMPAIGNS_FILE, _campaign_cache, 'campaigns')
+    return read_json_file_optimized(CAMPAIGNS_FILE)
 
 def load_users_optimized():
     """Optimized users loading with caching"""
-    return read_json_file_optimized(USERS_FILE, _user_cache, 'users')
+    return read_json_file_optimized(USERS_FILE)
 
 def load_data_lists_optimized():
     """Optimized data lists loading with caching"""
-    return read_json_file_optimized(DATA_LISTS_FILE, _data_list_cache, 'data_lists')
+    return read_json_file_optimized(DATA_LISTS_FILE)
 
 # Optimized saving functions
 def save_accounts_optimized(accounts):
     """Optimized accounts saving with cache invalidation"""
-    return write_json_file_optimized(ACCOUNTS_FILE, accounts, _account_cache, 'accounts')
+    return write_json_file_optimized(ACCOUNTS_FILE, accounts)
 
 def save_campaigns_optimized(campaigns):
     """Optimized campaigns saving with cache invalidation"""
-    return write_json_file_optimized(CAMPAIGNS_FILE, campaigns, _campaign_cache, 'campaigns')
+    return write_json_file_optimized(CAMPAIGNS_FILE, campaigns)
 
 def save_users_optimized(users):
     """Optimized users saving with cache invalidation"""
-    return write_json_file_optimized(USERS_FILE, users, _user_cache, 'users')
+    return write_json_file_optimized(USERS_FILE, users)
 
 def save_data_lists_optimized(data_lists):
     """Optimized data lists saving with cache invalidation"""
-    return write_json_file_optimized(DATA_LISTS_FILE, data_lists, _data_list_cache, 'data_lists')
+    return write_json_file_optimized(DATA_LISTS_FILE, data_lists)
 
 # ... existing code ...
 
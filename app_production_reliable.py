@@ -15,6 +15,7 @@ import time
 import logging
 import traceback
 import signal
+import socket
 import sys
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
@@ -23,6 +24,8 @@ from collections import defaultdict
 import threading
 import sqlite3
 import pickle
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks
@@ -58,15 +61,174 @@ app.add_middleware(
 )
 
 # Production-grade persistent storage
+CAMPAIGN_COLUMNS = (
+    'id', 'name', 'account_id', 'data_list_id', 'subject', 'message', 'from_name',
+    'start_line', 'status', 'created_at', 'started_at', 'completed_at',
+    'total_sent', 'total_failed', 'total_attempted', 'last_email_index',
+    'error_count', 'last_error', 'config'
+)
+
+# Statement text is kept constant so sqlite3's per-connection statement cache
+# reuses the prepared statements
+SAVE_CAMPAIGN_SQL = (
+    f"INSERT OR REPLACE INTO campaigns ({', '.join(CAMPAIGN_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in CAMPAIGN_COLUMNS)})"
+)
+GET_CAMPAIGN_SQL = 'SELECT * FROM campaigns WHERE id = ?'
+GET_ALL_CAMPAIGNS_SQL = 'SELECT * FROM campaigns ORDER BY created_at DESC'
+LOG_EMAIL_SQL = 'INSERT INTO campaign_logs (campaign_id, email, status, message, timestamp) VALUES (?, ?, ?, ?, ?)'
+GET_LOGS_SQL = 'SELECT * FROM campaign_logs WHERE campaign_id = ? ORDER BY timestamp DESC LIMIT ?'
+
+# Durable work queue (email_queue). Rows move pending -> processing (claimed,
+# with a lease) -> sent | failed; a failed attempt goes back to pending with
+# available_at pushed out by exponential backoff. Leases that expire (the
+# claiming processor died) are claimed again, so no work is lost.
+# (campaign_id, position) is unique, so enqueueing the same list twice (two
+# processors starting together, or a restart) adds nothing.
+ENQUEUE_SQL = (
+    'INSERT OR IGNORE INTO email_queue (campaign_id, email, position, status, retry_count, created_at, available_at) '
+    "VALUES (?, ?, ?, 'pending', 0, ?, ?)"
+)
+CLAIM_SQL = '''
+    UPDATE email_queue
+    SET status = 'processing', claimed_by = ?, claimed_at = ?
+    WHERE id IN (
+        SELECT id FROM email_queue
+        WHERE campaign_id = ?
+          AND ((status = 'pending' AND available_at <= ?) OR (status = 'processing' AND claimed_at < ?))
+        ORDER BY position
+        LIMIT ?
+    )
+    RETURNING id, email, position, retry_count
+'''
+MARK_SENT_SQL = '''
+    UPDATE email_queue SET status = 'sent', processed_at = ?, last_error = NULL
+    WHERE id IN (SELECT value FROM json_each(?))
+'''
+RETRY_SQL = '''
+    UPDATE email_queue
+    SET status = 'pending', retry_count = retry_count + 1, available_at = ?, last_error = ?, claimed_by = NULL
+    WHERE id = ?
+'''
+MARK_FAILED_SQL = '''
+    UPDATE email_queue SET status = 'failed', retry_count = retry_count + 1, processed_at = ?, last_error = ?
+    WHERE id = ?
+'''
+RELEASE_SQL = '''
+    UPDATE email_queue SET status = 'pending', claimed_by = NULL
+    WHERE campaign_id = ? AND status = 'processing' AND claimed_by = ?
+'''
+RESET_FINISHED_QUEUE_SQL = '''
+    DELETE FROM email_queue
+    WHERE campaign_id = ?
+      AND NOT EXISTS (SELECT 1 FROM email_queue WHERE campaign_id = ? AND status IN ('pending', 'processing'))
+'''
+# Collapse duplicate rows left by double enqueues (keeping the furthest
+# along), then move rows that still collide, e.g. pre-position rows that all
+# defaulted to 0, out of the way so the unique index can be built
+DEDUPE_QUEUE_SQL = '''
+    DELETE FROM email_queue WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY campaign_id, position, email
+                ORDER BY CASE status WHEN 'sent' THEN 0 WHEN 'failed' THEN 1 WHEN 'processing' THEN 2 ELSE 3 END, id
+            ) AS rank
+            FROM email_queue
+        ) WHERE rank > 1
+    )
+'''
+RENUMBER_COLLISIONS_SQL = '''
+    UPDATE email_queue SET position = -id
+    WHERE id NOT IN (SELECT MIN(id) FROM email_queue GROUP BY campaign_id, position)
+'''
+QUEUE_COUNTS_SQL = 'SELECT status, COUNT(*), MIN(available_at) FROM email_queue WHERE campaign_id = ? GROUP BY status'
+APPLY_BATCH_SQL = '''
+    UPDATE campaigns
+    SET total_sent = total_sent + ?, total_failed = total_failed + ?,
+        total_attempted = total_attempted + ?, last_email_index = MAX(last_email_index, ?)
+    WHERE id = ?
+'''
+
+# Campaign liveness: the processing loop beats at most every
+# HEARTBEAT_INTERVAL, checking after every send, so the longest gap between
+# beats is HEARTBEAT_INTERVAL plus one send with all its retries. A running
+# campaign whose beat is older than HEARTBEAT_STALE_SECONDS has lost its
+# processor and is taken over.
+CLAIM_HEARTBEAT_SQL = '''
+    INSERT INTO campaign_heartbeats (campaign_id, worker_id, beat_at, recoveries)
+    VALUES (?, ?, ?, 0)
+    ON CONFLICT(campaign_id) DO UPDATE
+    SET worker_id = excluded.worker_id, beat_at = excluded.beat_at, recoveries = recoveries + ?
+    WHERE ? IS NULL OR campaign_heartbeats.beat_at < ?
+'''
+BEAT_SQL = '''
+    UPDATE campaign_heartbeats
+    SET beat_at = ?, recoveries = CASE WHEN ? THEN 0 ELSE recoveries END
+    WHERE campaign_id = ? AND worker_id = ?
+'''
+STALE_CAMPAIGNS_SQL = '''
+    SELECT c.id AS campaign_id, c.started_at, h.worker_id, h.beat_at, COALESCE(h.recoveries, 0) AS recoveries
+    FROM campaigns c
+    LEFT JOIN campaign_heartbeats h ON h.campaign_id = c.id
+    WHERE c.status = 'running' AND COALESCE(h.beat_at, c.started_at, '') < ?
+'''
+
+SEND_MAX_RETRIES = 3
+SEND_WORST_CASE_SECONDS = 10  # One _send_email_reliable call, backoff included
+HEARTBEAT_INTERVAL = 5
+HEARTBEAT_STALE_SECONDS = max(30, 2 * (HEARTBEAT_INTERVAL + SEND_WORST_CASE_SECONDS))
+RECOVERY_CHECK_INTERVAL = 10
+MAX_RECOVERIES = 5            # Takeovers without progress before a campaign is failed
+
+QUEUE_LEASE_SECONDS = 300     # A claimed batch not reported within this is claimed again
+QUEUE_MAX_RETRIES = 3         # Attempts before an address is marked failed
+QUEUE_RETRY_BASE_SECONDS = 60  # Backoff: base * 2**retry_count, capped
+QUEUE_RETRY_MAX_SECONDS = 3600
+
 class ReliableStorage:
-    def __init__(self, db_path: str = "campaign_manager.db"):
+    """SQLite storage with one persistent WAL-mode connection per thread
+
+    WAL lets readers proceed while a write is in progress, so no Python-level
+    lock is needed; concurrent writers wait on SQLite's busy timeout.
+    """
+
+    def __init__(self, db_path: str = "campaign_manager.db", busy_timeout: float = 30.0):
         self.db_path = db_path
-        self.lock = threading.RLock()
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         self.init_database()
-    
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')  # durable at checkpoints, safe with WAL
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout * 1000)}')
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Close every thread's connection (on shutdown)"""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
     def init_database(self):
         """Initialize SQLite database with proper schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        conn = self._conn()
+        with conn:
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS campaigns (
                     id TEXT PRIMARY KEY,
@@ -118,63 +280,81 @@ class ReliableStorage:
             
             # Create indexes for performance
             conn.execute('CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns(status)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_campaign_logs_campaign_id ON campaign_logs(campaign_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_campaign_logs_campaign_id ON campaign_logs(campaign_id, timestamp)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_email_queue_status ON email_queue(status)')
-            
-            conn.commit()
-    
+
+            # Work-queue columns, added in place on databases created before them
+            existing = {row['name'] for row in conn.execute('PRAGMA table_info(email_queue)')}
+            for column, ddl in (('position', 'INTEGER DEFAULT 0'), ('available_at', 'TEXT'),
+                                ('claimed_by', 'TEXT'), ('claimed_at', 'TEXT'), ('last_error', 'TEXT')):
+                if column not in existing:
+                    conn.execute(f'ALTER TABLE email_queue ADD COLUMN {column} {ddl}')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_email_queue_claim ON email_queue(campaign_id, status, position)')
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_email_queue_position'"
+            ).fetchone():
+                conn.execute(DEDUPE_QUEUE_SQL)
+                conn.execute(RENUMBER_COLLISIONS_SQL)
+                conn.execute('CREATE UNIQUE INDEX idx_email_queue_position ON email_queue(campaign_id, position)')
+
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS campaign_heartbeats (
+                    campaign_id TEXT PRIMARY KEY,
+                    worker_id TEXT,
+                    beat_at TEXT,
+                    recoveries INTEGER DEFAULT 0
+                )
+            ''')
+
+    @staticmethod
+    def _campaign_params(campaign_data: dict) -> tuple:
+        defaults = {'start_line': 1, 'status': 'ready', 'total_sent': 0, 'total_failed': 0,
+                    'total_attempted': 0, 'last_email_index': 0, 'error_count': 0}
+        params = [campaign_data.get(column, defaults.get(column)) for column in CAMPAIGN_COLUMNS]
+        params[-1] = json.dumps(campaign_data.get('config', {}))
+        return tuple(params)
+
+    @staticmethod
+    def _campaign_from_row(row) -> dict:
+        campaign = dict(row)
+        campaign['config'] = json.loads(campaign.get('config') or '{}')
+        return campaign
+
     def save_campaign(self, campaign_data: dict):
         """Save campaign with error handling"""
         try:
-            with self.lock:
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.execute('''
-                        INSERT OR REPLACE INTO campaigns 
-                        (id, name, account_id, data_list_id, subject, message, from_name, 
-                         start_line, status, created_at, started_at, completed_at, 
-                         total_sent, total_failed, total_attempted, last_email_index, 
-                         error_count, last_error, config)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        campaign_data.get('id'),
-                        campaign_data.get('name'),
-                        campaign_data.get('account_id'),
-                        campaign_data.get('data_list_id'),
-                        campaign_data.get('subject'),
-                        campaign_data.get('message'),
-                        campaign_data.get('from_name'),
-                        campaign_data.get('start_line', 1),
-                        campaign_data.get('status', 'ready'),
-                        campaign_data.get('created_at'),
-                        campaign_data.get('started_at'),
-                        campaign_data.get('completed_at'),
-                        campaign_data.get('total_sent', 0),
-                        campaign_data.get('total_failed', 0),
-                        campaign_data.get('total_attempted', 0),
-                        campaign_data.get('last_email_index', 0),
-                        campaign_data.get('error_count', 0),
-                        campaign_data.get('last_error'),
-                        json.dumps(campaign_data.get('config', {}))
-                    ))
-                    conn.commit()
+            conn = self._conn()
+            with conn:
+                conn.execute(SAVE_CAMPAIGN_SQL, self._campaign_params(campaign_data))
             return True
         except Exception as e:
             logger.error(f"Error saving campaign {campaign_data.get('id')}: {e}")
             return False
+
+    def save_campaign_progress(self, campaign_data: dict, log_rows: List[tuple]):
+        """Save a batch's email logs and the campaign checkpoint in one transaction
+
+        log_rows are (email, status, message) tuples.
+        """
+        try:
+            conn = self._conn()
+            timestamp = datetime.now().isoformat()
+            campaign_id = campaign_data.get('id')
+            with conn:
+                conn.executemany(LOG_EMAIL_SQL, [
+                    (campaign_id, email, status, message, timestamp) for email, status, message in log_rows
+                ])
+                conn.execute(SAVE_CAMPAIGN_SQL, self._campaign_params(campaign_data))
+            return True
+        except Exception as e:
+            logger.error(f"Error saving progress for campaign {campaign_data.get('id')}: {e}")
+            return False
     
     def get_campaign(self, campaign_id: str) -> dict:
         """Get campaign with error handling"""
         try:
-            with self.lock:
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.row_factory = sqlite3.Row
-                    cursor = conn.execute('SELECT * FROM campaigns WHERE id = ?', (campaign_id,))
-                    row = cursor.fetchone()
-                    if row:
-                        campaign = dict(row)
-                        campaign['config'] = json.loads(campaign.get('config', '{}'))
-                        return campaign
-            return {}
+            row = self._conn().execute(GET_CAMPAIGN_SQL, (campaign_id,)).fetchone()
+            return self._campaign_from_row(row) if row else {}
         except Exception as e:
             logger.error(f"Error getting campaign {campaign_id}: {e}")
             return {}
@@ -182,52 +362,224 @@ class ReliableStorage:
     def get_all_campaigns(self) -> dict:
         """Get all campaigns"""
         try:
-            with self.lock:
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.row_factory = sqlite3.Row
-                    cursor = conn.execute('SELECT * FROM campaigns ORDER BY created_at DESC')
-                    campaigns = {}
-                    for row in cursor.fetchall():
-                        campaign = dict(row)
-                        campaign['config'] = json.loads(campaign.get('config', '{}'))
-                        campaigns[campaign['id']] = campaign
-                    return campaigns
+            campaigns = {}
+            for row in self._conn().execute(GET_ALL_CAMPAIGNS_SQL):
+                campaign = self._campaign_from_row(row)
+                campaigns[campaign['id']] = campaign
+            return campaigns
         except Exception as e:
             logger.error(f"Error getting all campaigns: {e}")
             return {}
     
     def log_email(self, campaign_id: str, email: str, status: str, message: str = ""):
         """Log email with timestamp"""
+        self.log_emails(campaign_id, [(email, status, message)])
+
+    def log_emails(self, campaign_id: str, log_rows: List[tuple]):
+        """Log many (email, status, message) results in one transaction"""
+        if not log_rows:
+            return
         try:
-            with self.lock:
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.execute('''
-                        INSERT INTO campaign_logs (campaign_id, email, status, message, timestamp)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (campaign_id, email, status, message, datetime.now().isoformat()))
-                    conn.commit()
+            timestamp = datetime.now().isoformat()
+            conn = self._conn()
+            with conn:
+                conn.executemany(LOG_EMAIL_SQL, [
+                    (campaign_id, email, status, message, timestamp) for email, status, message in log_rows
+                ])
         except Exception as e:
-            logger.error(f"Error logging email for campaign {campaign_id}: {e}")
+            logger.error(f"Error logging emails for campaign {campaign_id}: {e}")
     
     def get_campaign_logs(self, campaign_id: str, limit: int = 1000) -> list:
         """Get campaign logs"""
         try:
-            with self.lock:
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.row_factory = sqlite3.Row
-                    cursor = conn.execute('''
-                        SELECT * FROM campaign_logs 
-                        WHERE campaign_id = ? 
-                        ORDER BY timestamp DESC 
-                        LIMIT ?
-                    ''', (campaign_id, limit))
-                    return [dict(row) for row in cursor.fetchall()]
+            return [dict(row) for row in self._conn().execute(GET_LOGS_SQL, (campaign_id, limit))]
         except Exception as e:
             logger.error(f"Error getting logs for campaign {campaign_id}: {e}")
             return []
 
-# Global storage instance
+    def update_campaign_fields(self, campaign_id: str, **fields) -> bool:
+        """Update only the given columns, leaving concurrently-incremented counters alone"""
+        columns = [column for column in fields if column in CAMPAIGN_COLUMNS and column != 'id']
+        if not columns:
+            return False
+        values = [json.dumps(fields[c]) if c == 'config' else fields[c] for c in columns]
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    f"UPDATE campaigns SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+                    (*values, campaign_id)
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error updating campaign {campaign_id}: {e}")
+            return False
+
+    # Durable work queue
+
+    def enqueue_emails(self, campaign_id: str, emails: List[str], start_position: int = 0, chunk_size: int = 5000) -> int:
+        """Add a campaign's recipients to the queue (in chunked transactions)
+
+        Positions already queued are skipped; returns how many rows were added.
+        """
+        conn = self._conn()
+        now = datetime.now().isoformat()
+        added = 0
+        for offset in range(0, len(emails), chunk_size):
+            with conn:
+                added += conn.executemany(ENQUEUE_SQL, [
+                    (campaign_id, email, start_position + offset + i, now, now)
+                    for i, email in enumerate(emails[offset:offset + chunk_size])
+                ]).rowcount
+        return added
+
+    def reset_finished_queue(self, campaign_id: str) -> int:
+        """Clear a queue with nothing left to do, so a relaunch sends the list again
+
+        A queue that still has pending or in-flight rows is left alone (the
+        restart resumes it). Returns the number of rows removed.
+        """
+        conn = self._conn()
+        with conn:
+            removed = conn.execute(RESET_FINISHED_QUEUE_SQL, (campaign_id, campaign_id)).rowcount
+            if removed:
+                conn.execute('UPDATE campaigns SET last_email_index = 0 WHERE id = ?', (campaign_id,))
+        return removed
+
+    def claim_batch(self, campaign_id: str, worker_id: str, limit: int = 50,
+                    lease_seconds: float = QUEUE_LEASE_SECONDS) -> List[dict]:
+        """Atomically claim up to `limit` due recipients (or ones with expired leases)"""
+        now = datetime.now()
+        lease_cutoff = (now - timedelta(seconds=lease_seconds)).isoformat()
+        conn = self._conn()
+        with conn:
+            rows = conn.execute(CLAIM_SQL, (
+                worker_id, now.isoformat(), campaign_id, now.isoformat(), lease_cutoff, limit
+            )).fetchall()
+        return sorted((dict(row) for row in rows), key=lambda item: item['position'])
+
+    @staticmethod
+    def retry_delay(retry_count: int) -> float:
+        return min(QUEUE_RETRY_BASE_SECONDS * (2 ** retry_count), QUEUE_RETRY_MAX_SECONDS)
+
+    def complete_batch(self, campaign_id: str, sent: List[dict], failed: List[tuple],
+                       max_retries: int = QUEUE_MAX_RETRIES) -> Dict[str, int]:
+        """Record a claimed batch's outcome in one transaction
+
+        sent are claimed items; failed are (item, error) pairs. Failed items
+        with retries left go back to pending with backoff; the rest are marked
+        failed. Logs and the campaign's counters are written alongside.
+        """
+        now = datetime.now()
+        timestamp = now.isoformat()
+        retries, finals = [], []
+        for item, error in failed:
+            if item['retry_count'] + 1 < max_retries:
+                available_at = (now + timedelta(seconds=self.retry_delay(item['retry_count']))).isoformat()
+                retries.append((available_at, error, item['id']))
+            else:
+                finals.append((timestamp, error, item['id']))
+
+        log_rows = [(campaign_id, item['email'], 'sent', 'Successfully sent', timestamp) for item in sent]
+        log_rows += [(campaign_id, item['email'], 'failed', error, timestamp) for item, error in failed]
+        positions = [item['position'] for item in sent] + [item['position'] for item, _ in failed]
+
+        conn = self._conn()
+        with conn:
+            if sent:
+                conn.execute(MARK_SENT_SQL, (timestamp, json.dumps([item['id'] for item in sent])))
+            conn.executemany(RETRY_SQL, retries)
+            conn.executemany(MARK_FAILED_SQL, finals)
+            conn.executemany(LOG_EMAIL_SQL, log_rows)
+            conn.execute(APPLY_BATCH_SQL, (
+                len(sent), len(finals), len(sent) + len(finals), max(positions, default=0), campaign_id
+            ))
+        return {'sent': len(sent), 'retrying': len(retries), 'failed': len(finals)}
+
+    def release_claims(self, campaign_id: str, worker_id: str) -> int:
+        """Hand back a worker's in-flight claims (e.g. when it is stopped)"""
+        conn = self._conn()
+        with conn:
+            return conn.execute(RELEASE_SQL, (campaign_id, worker_id)).rowcount
+
+    # Heartbeats
+
+    def claim_heartbeat(self, campaign_id: str, worker_id: str, stale_before: Optional[str] = None) -> bool:
+        """Become the campaign's processor
+
+        Unconditional when stale_before is None (a fresh start). Otherwise
+        only succeeds if the current beat is older than stale_before, so of
+        several recovering processes exactly one takes over; a takeover
+        counts as a recovery.
+        """
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(CLAIM_HEARTBEAT_SQL, (
+                campaign_id, worker_id, datetime.now().isoformat(),
+                0 if stale_before is None else 1, stale_before, stale_before
+            ))
+        return cursor.rowcount == 1
+
+    def beat(self, campaign_id: str, worker_id: str, progressed: bool = False) -> bool:
+        """Refresh the heartbeat; False means another processor has taken over"""
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(BEAT_SQL, (datetime.now().isoformat(), progressed, campaign_id, worker_id))
+        return cursor.rowcount == 1
+
+    def clear_heartbeat(self, campaign_id: str):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM campaign_heartbeats WHERE campaign_id = ?', (campaign_id,))
+
+    def stale_campaigns(self, stale_before: str) -> List[dict]:
+        """Running campaigns whose heartbeat (or start, if none) is older than stale_before"""
+        return [dict(row) for row in self._conn().execute(STALE_CAMPAIGNS_SQL, (stale_before,))]
+
+    def queue_counts(self, campaign_id: str) -> Dict[str, Any]:
+        """Rows per status, plus when the earliest pending retry becomes due"""
+        counts: Dict[str, Any] = {'pending': 0, 'processing': 0, 'sent': 0, 'failed': 0, 'next_available_at': None}
+        for status, count, next_available in self._conn().execute(QUEUE_COUNTS_SQL, (campaign_id,)):
+            counts[status] = count
+            if status == 'pending':
+                counts['next_available_at'] = next_available
+        return counts
+
+    def ping(self) -> bool:
+        self._conn().execute('SELECT 1').fetchone()
+        return True
+
+class AsyncStorage:
+    """Runs ReliableStorage calls on a dedicated thread pool
+
+    Async code awaits these instead of calling storage directly, so disk I/O
+    never blocks the event loop. The pool's threads each keep their own
+    SQLite connection.
+    """
+
+    def __init__(self, storage: ReliableStorage, max_workers: int = 4):
+        self.storage = storage
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='storage')
+
+    async def _run(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(method, *args))
+
+    def __getattr__(self, name):
+        method = getattr(self.storage, name)
+        if not callable(method):
+            return method
+
+        async def call(*args):
+            return await self._run(method, *args)
+        return call
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        self.storage.close()
+
+# Global storage instance; async code goes through async_storage
 storage = ReliableStorage()
+async_storage = AsyncStorage(storage)
 
 # Reliable WebSocket connection manager
 class ReliableConnectionManager:
@@ -342,6 +694,9 @@ class ReliableCampaignProcessor:
     def __init__(self):
         self.running_campaigns = {}
         self.campaign_tasks = {}
+        # Identifies this process's queue claims and heartbeats
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._last_beat = {}
         self.recovery_task = None
         self.stats_task = None
         self.start_background_tasks()
@@ -352,7 +707,7 @@ class ReliableCampaignProcessor:
             while True:
                 try:
                     await self.recover_stalled_campaigns()
-                    await asyncio.sleep(60)  # Check every minute
+                    await asyncio.sleep(RECOVERY_CHECK_INTERVAL)
                 except Exception as e:
                     logger.error(f"Recovery loop error: {e}")
                     await asyncio.sleep(30)
@@ -373,46 +728,74 @@ class ReliableCampaignProcessor:
             self.stats_task = asyncio.create_task(stats_loop())
     
     async def recover_stalled_campaigns(self):
-        """Recover campaigns that may have stalled"""
+        """Take over running campaigns whose processor stopped heartbeating
+
+        Liveness is judged by heartbeat age, not runtime, so long campaigns
+        are never killed and a dead one is resumed within seconds. The queue
+        is the checkpoint: the dead processor's claims are released and the
+        new task carries on with whatever is still pending.
+        """
         try:
-            campaigns = storage.get_all_campaigns()
-            current_time = datetime.now()
+            stale_before = (datetime.now() - timedelta(seconds=HEARTBEAT_STALE_SECONDS)).isoformat()
             
-            for campaign_id, campaign in campaigns.items():
-                if campaign.get('status') == 'running':
-                    # Check if campaign has been running too long without updates
-                    started_at = campaign.get('started_at')
-                    if started_at:
-                        start_time = datetime.fromisoformat(started_at)
-                        runtime = (current_time - start_time).total_seconds()
-                        
-                        # If running for more than 2 hours, consider it stalled
-                        if runtime > 7200:
-                            logger.warning(f"Recovering stalled campaign {campaign_id}")
-                            campaign['status'] = 'failed'
-                            campaign['last_error'] = 'Campaign stalled - auto-recovered'
-                            campaign['completed_at'] = current_time.isoformat()
-                            storage.save_campaign(campaign)
-                            
-                            # Remove from running campaigns
-                            if campaign_id in self.running_campaigns:
-                                del self.running_campaigns[campaign_id]
-                            
-                            # Cancel task if exists
-                            if campaign_id in self.campaign_tasks:
-                                self.campaign_tasks[campaign_id].cancel()
-                                del self.campaign_tasks[campaign_id]
-                            
-                            # Broadcast update
-                            await manager.broadcast_campaign_update(campaign_id, campaign)
+            for stale in await async_storage.stale_campaigns(stale_before):
+                campaign_id = stale['campaign_id']
+                
+                # Our own task is still alive (e.g. waiting on a slow send)
+                task = self.campaign_tasks.get(campaign_id)
+                if task and not task.done():
+                    continue
+                
+                if stale['recoveries'] >= MAX_RECOVERIES:
+                    logger.error(f"Campaign {campaign_id} stalled {stale['recoveries']} times without progress, failing it")
+                    await async_storage.update_campaign_fields(
+                        campaign_id, status='failed', completed_at=datetime.now().isoformat(),
+                        last_error='Campaign repeatedly stalled - auto-recovery gave up'
+                    )
+                    await async_storage.clear_heartbeat(campaign_id)
+                    await manager.broadcast_campaign_update(campaign_id, await async_storage.get_campaign(campaign_id))
+                    continue
+                
+                # Exactly one processor wins the takeover
+                if not await async_storage.claim_heartbeat(campaign_id, self.worker_id, stale_before):
+                    continue
+                
+                if stale['worker_id']:
+                    await async_storage.release_claims(campaign_id, stale['worker_id'])
+                logger.warning(f"Recovering stalled campaign {campaign_id} (last heartbeat {stale['beat_at'] or 'never'} "
+                               f"from {stale['worker_id'] or 'unknown'})")
+                
+                campaign = await async_storage.get_campaign(campaign_id)
+                self.running_campaigns[campaign_id] = campaign
+                self.campaign_tasks[campaign_id] = asyncio.create_task(self._process_campaign(campaign_id))
+                await manager.broadcast_campaign_update(campaign_id, campaign)
         
         except Exception as e:
             logger.error(f"Error in recovery process: {e}")
     
+    async def _heartbeat(self, campaign_id: str, progressed: bool = False, force: bool = False) -> bool:
+        """Beat at most every HEARTBEAT_INTERVAL; False if the campaign was taken over"""
+        now = time.monotonic()
+        if not force and not progressed and now - self._last_beat.get(campaign_id, 0) < HEARTBEAT_INTERVAL:
+            return True
+        self._last_beat[campaign_id] = now
+        return await async_storage.beat(campaign_id, self.worker_id, progressed)
+    
+    async def _sleep_with_heartbeat(self, campaign_id: str, seconds: float) -> bool:
+        """Sleep without letting the heartbeat go stale"""
+        deadline = time.monotonic() + seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            await asyncio.sleep(min(remaining, HEARTBEAT_INTERVAL))
+            if not await self._heartbeat(campaign_id):
+                return False
+    
     async def broadcast_stats(self):
         """Broadcast updated statistics"""
         try:
-            campaigns = storage.get_all_campaigns()
+            campaigns = await async_storage.get_all_campaigns()
             
             total_campaigns = len(campaigns)
             active_campaigns = sum(1 for c in campaigns.values() if c.get('status') == 'running')
@@ -437,19 +820,27 @@ class ReliableCampaignProcessor:
     async def start_campaign(self, campaign_id: str):
         """Start campaign with robust error handling"""
         try:
-            campaign = storage.get_campaign(campaign_id)
+            campaign = await async_storage.get_campaign(campaign_id)
             if not campaign:
                 raise ValueError(f"Campaign {campaign_id} not found")
             
             if campaign.get('status') == 'running':
                 raise ValueError(f"Campaign {campaign_id} is already running")
             
+            # A finished queue would make the relaunch complete without sending
+            if await async_storage.reset_finished_queue(campaign_id):
+                campaign['last_email_index'] = 0
+                logger.info(f"Campaign {campaign_id}: previous run finished, queue reset for relaunch")
+            
             # Mark as running
             campaign['status'] = 'running'
             campaign['started_at'] = datetime.now().isoformat()
             campaign['error_count'] = 0
             campaign['last_error'] = None
-            storage.save_campaign(campaign)
+            await async_storage.update_campaign_fields(
+                campaign_id, status='running', started_at=campaign['started_at'], error_count=0, last_error=None
+            )
+            await async_storage.claim_heartbeat(campaign_id, self.worker_id)
             
             # Add to running campaigns
             self.running_campaigns[campaign_id] = campaign
@@ -467,11 +858,11 @@ class ReliableCampaignProcessor:
         except Exception as e:
             logger.error(f"Error starting campaign {campaign_id}: {e}")
             # Update campaign status to failed
-            campaign = storage.get_campaign(campaign_id)
+            campaign = await async_storage.get_campaign(campaign_id)
             if campaign:
                 campaign['status'] = 'failed'
                 campaign['last_error'] = str(e)
-                storage.save_campaign(campaign)
+                await async_storage.update_campaign_fields(campaign_id, status='failed', last_error=str(e))
                 await manager.broadcast_campaign_update(campaign_id, campaign)
             return False
     
@@ -487,12 +878,16 @@ class ReliableCampaignProcessor:
             if campaign_id in self.running_campaigns:
                 del self.running_campaigns[campaign_id]
             
-            # Update database
-            campaign = storage.get_campaign(campaign_id)
+            # Update database; unsent recipients stay queued for a restart
+            await async_storage.release_claims(campaign_id, self.worker_id)
+            await async_storage.clear_heartbeat(campaign_id)
+            campaign = await async_storage.get_campaign(campaign_id)
             if campaign:
                 campaign['status'] = 'stopped'
                 campaign['completed_at'] = datetime.now().isoformat()
-                storage.save_campaign(campaign)
+                await async_storage.update_campaign_fields(
+                    campaign_id, status='stopped', completed_at=campaign['completed_at']
+                )
                 await manager.broadcast_campaign_update(campaign_id, campaign)
             
             logger.info(f"Stopped campaign {campaign_id}")
@@ -503,87 +898,120 @@ class ReliableCampaignProcessor:
             return False
     
     async def _process_campaign(self, campaign_id: str):
-        """Process campaign with robust error handling and retry logic"""
+        """Process campaign from its durable email_queue
+
+        Recipients are enqueued once per run (enqueueing is idempotent, so two
+        processors starting together queue each address once); after that the
+        campaign's progress lives in the queue, so a restart (or a second
+        processor sharing the campaign) simply claims whatever is still pending.
+        """
         try:
-            campaign = storage.get_campaign(campaign_id)
+            campaign = await async_storage.get_campaign(campaign_id)
             if not campaign:
                 logger.error(f"Campaign {campaign_id} not found during processing")
                 return
             
             logger.info(f"Processing campaign {campaign_id}: {campaign.get('name')}")
             
-            # Get email list (simulate for now)
-            emails = await self._get_email_list(campaign.get('data_list_id'), campaign.get('start_line', 1))
-            
-            if not emails:
-                campaign['status'] = 'failed'
-                campaign['last_error'] = 'No emails found in data list'
-                storage.save_campaign(campaign)
-                await manager.broadcast_campaign_update(campaign_id, campaign)
-                return
-            
-            # Resume from last processed email if campaign was restarted
-            start_index = campaign.get('last_email_index', 0)
-            emails_to_process = emails[start_index:]
-            
-            logger.info(f"Campaign {campaign_id}: Processing {len(emails_to_process)} emails (starting from index {start_index})")
+            counts = await async_storage.queue_counts(campaign_id)
+            if not any(counts[status] for status in ('pending', 'processing', 'sent', 'failed')):
+                # First run: load the list (skipping anything a pre-queue run already sent)
+                emails = await self._get_email_list(campaign.get('data_list_id'), campaign.get('start_line', 1))
+                if not emails:
+                    await async_storage.update_campaign_fields(
+                        campaign_id, status='failed', last_error='No emails found in data list'
+                    )
+                    await manager.broadcast_campaign_update(campaign_id, await async_storage.get_campaign(campaign_id))
+                    return
+                start_index = campaign.get('last_email_index', 0)
+                added = await async_storage.enqueue_emails(campaign_id, emails[start_index:], start_index)
+                logger.info(f"Campaign {campaign_id}: queued {added} emails (starting from index {start_index})")
+            else:
+                logger.info(f"Campaign {campaign_id}: resuming queue {counts}")
             
             batch_size = 50  # Process in smaller batches for reliability
             batch_delay = 2.0  # 2 seconds between batches
             
-            for i in range(0, len(emails_to_process), batch_size):
+            while True:
+                sent, failed = [], []
+                recording = None  # This batch's complete_batch, once started
                 try:
+                    # Stop if another processor took this campaign over
+                    if not await self._heartbeat(campaign_id):
+                        logger.warning(f"Campaign {campaign_id} was taken over by another processor")
+                        return
+                    
                     # Check if campaign should be stopped
-                    current_campaign = storage.get_campaign(campaign_id)
+                    current_campaign = await async_storage.get_campaign(campaign_id)
                     if not current_campaign or current_campaign.get('status') != 'running':
                         logger.info(f"Campaign {campaign_id} stopped during processing")
-                        break
+                        await async_storage.release_claims(campaign_id, self.worker_id)
+                        return
+                    
+                    batch = await async_storage.claim_batch(campaign_id, self.worker_id, batch_size)
+                    if not batch:
+                        counts = await async_storage.queue_counts(campaign_id)
+                        if counts['pending'] == 0 and counts['processing'] == 0:
+                            break
+                        # Waiting on backed-off retries or another processor's claims
+                        await self._sleep_with_heartbeat(campaign_id, self._queue_wait(counts))
+                        continue
                     
-                    batch = emails_to_process[i:i + batch_size]
-                    batch_sent = 0
-                    batch_failed = 0
+                    taken_over = False
                     
                     # Process batch with individual error handling
-                    for j, email in enumerate(batch):
+                    for item in batch:
+                        # Beat between sends: a batch can outlast HEARTBEAT_STALE_SECONDS
+                        if not await self._heartbeat(campaign_id):
+                            taken_over = True
+                            break
                         try:
-                            # Update progress
-                            current_index = start_index + i + j
-                            campaign['last_email_index'] = current_index
-                            
                             # Simulate email sending (replace with actual Zoho API)
-                            success = await self._send_email_reliable(campaign, email)
-                            
-                            if success:
-                                batch_sent += 1
-                                storage.log_email(campaign_id, email, 'sent', 'Successfully sent')
+                            if await self._send_email_reliable(campaign, item['email']):
+                                sent.append(item)
                             else:
-                                batch_failed += 1
-                                storage.log_email(campaign_id, email, 'failed', 'Send failed')
+                                failed.append((item, 'Send failed'))
                             
                             # Small delay between emails
                             await asyncio.sleep(0.1)
                             
                         except Exception as e:
-                            logger.error(f"Error sending email {email} in campaign {campaign_id}: {e}")
-                            batch_failed += 1
-                            storage.log_email(campaign_id, email, 'failed', str(e))
+                            logger.error(f"Error sending email {item['email']} in campaign {campaign_id}: {e}")
+                            failed.append((item, str(e)))
                     
-                    # Update campaign statistics
-                    campaign['total_sent'] = campaign.get('total_sent', 0) + batch_sent
-                    campaign['total_failed'] = campaign.get('total_failed', 0) + batch_failed
-                    campaign['total_attempted'] = campaign['total_sent'] + campaign['total_failed']
-                    
-                    # Save progress
-                    storage.save_campaign(campaign)
+                    # Queue state, logs and counters in one transaction; shielded
+                    # so a stop cannot leave it unknown whether it committed
+                    recording = asyncio.ensure_future(async_storage.complete_batch(campaign_id, sent, failed))
+                    result = await asyncio.shield(recording)
+                    if taken_over:
+                        # Record what was sent; the new processor has the rest
+                        logger.warning(f"Campaign {campaign_id} was taken over mid-batch after {len(sent) + len(failed)} sends")
+                        return
+                    await self._heartbeat(campaign_id, progressed=True)
                     
                     # Broadcast real-time update
+                    campaign = await async_storage.get_campaign(campaign_id)
                     await manager.broadcast_campaign_update(campaign_id, campaign)
                     
-                    logger.info(f"Campaign {campaign_id}: Batch completed. Sent: {batch_sent}, Failed: {batch_failed}")
+                    logger.info(f"Campaign {campaign_id}: Batch completed. Sent: {result['sent']}, "
+                                f"Retrying: {result['retrying']}, Failed: {result['failed']}")
                     
                     # Delay between batches
-                    await asyncio.sleep(batch_delay)
+                    await self._sleep_with_heartbeat(campaign_id, batch_delay)
                     
+                except asyncio.CancelledError:
+                    # Stopped mid-batch: record what was already sent, so a
+                    # resume does not send it again, then hand the unfinished
+                    # claims straight back to pending
+                    if recording is None and (sent or failed):
+                        recording = asyncio.ensure_future(async_storage.complete_batch(campaign_id, sent, failed))
+                    if recording is not None:
+                        try:
+                            await asyncio.shield(recording)
+                        except Exception as e:
+                            logger.error(f"Could not record stopped batch in campaign {campaign_id}: {e}")
+                    await async_storage.release_claims(campaign_id, self.worker_id)
+                    raise
                 except Exception as e:
                     logger.error(f"Error processing batch in campaign {campaign_id}: {e}")
                     campaign['error_count'] = campaign.get('error_count', 0) + 1
@@ -591,20 +1019,27 @@ class ReliableCampaignProcessor:
                     
                     # If too many errors, stop campaign
                     if campaign['error_count'] >= 5:
-                        campaign['status'] = 'failed'
-                        campaign['completed_at'] = datetime.now().isoformat()
-                        storage.save_campaign(campaign)
-                        await manager.broadcast_campaign_update(campaign_id, campaign)
+                        await async_storage.release_claims(campaign_id, self.worker_id)
+                        await async_storage.update_campaign_fields(
+                            campaign_id, status='failed', error_count=campaign['error_count'],
+                            last_error=campaign['last_error'], completed_at=datetime.now().isoformat()
+                        )
+                        await manager.broadcast_campaign_update(campaign_id, await async_storage.get_campaign(campaign_id))
                         logger.error(f"Campaign {campaign_id} failed due to too many errors")
                         return
                     
+                    await async_storage.update_campaign_fields(
+                        campaign_id, error_count=campaign['error_count'], last_error=campaign['last_error']
+                    )
                     # Wait before retrying
-                    await asyncio.sleep(30)
+                    await self._sleep_with_heartbeat(campaign_id, 30)
             
             # Mark campaign as completed
-            campaign['status'] = 'completed'
-            campaign['completed_at'] = datetime.now().isoformat()
-            storage.save_campaign(campaign)
+            await async_storage.update_campaign_fields(
+                campaign_id, status='completed', completed_at=datetime.now().isoformat()
+            )
+            await async_storage.clear_heartbeat(campaign_id)
+            campaign = await async_storage.get_campaign(campaign_id)
             
             # Remove from running campaigns
             if campaign_id in self.running_campaigns:
@@ -614,17 +1049,19 @@ class ReliableCampaignProcessor:
             
             logger.info(f"Campaign {campaign_id} completed successfully. Sent: {campaign.get('total_sent', 0)}, Failed: {campaign.get('total_failed', 0)}")
             
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Critical error in campaign {campaign_id}: {e}")
             logger.error(traceback.format_exc())
             
-            # Mark campaign as failed
-            campaign = storage.get_campaign(campaign_id)
+            # Mark campaign as failed; its queue keeps the remaining work
+            await async_storage.release_claims(campaign_id, self.worker_id)
+            await async_storage.update_campaign_fields(
+                campaign_id, status='failed', last_error=str(e), completed_at=datetime.now().isoformat()
+            )
+            campaign = await async_storage.get_campaign(campaign_id)
             if campaign:
-                campaign['status'] = 'failed'
-                campaign['last_error'] = str(e)
-                campaign['completed_at'] = datetime.now().isoformat()
-                storage.save_campaign(campaign)
                 await manager.broadcast_campaign_update(campaign_id, campaign)
             
             # Clean up
@@ -633,6 +1070,15 @@ class ReliableCampaignProcessor:
             if campaign_id in self.campaign_tasks:
                 del self.campaign_tasks[campaign_id]
     
+    @staticmethod
+    def _queue_wait(counts: Dict[str, Any]) -> float:
+        """How long to sleep when nothing is claimable right now"""
+        next_available = counts.get('next_available_at')
+        if counts['pending'] and next_available:
+            due_in = (datetime.fromisoformat(next_available) - datetime.now()).total_seconds()
+            return max(1.0, min(due_in, 30.0))
+        return 5.0
+    
     async def _get_email_list(self, data_list_id: int, start_line: int = 1) -> List[str]:
         """Get email list with error handling"""
         try:
@@ -646,7 +1092,7 @@ class ReliableCampaignProcessor:
     
     async def _send_email_reliable(self, campaign: dict, email: str) -> bool:
         """Reliable email sending with retry logic"""
-        max_retries = 3
+        max_retries = SEND_MAX_RETRIES
         
         for attempt in range(max_retries):
             try:
@@ -686,7 +1132,7 @@ class CampaignCreate(BaseModel):
 @app.get("/api/stats")
 async def get_stats():
     """Get comprehensive statistics"""
-    campaigns = storage.get_all_campaigns()
+    campaigns = await async_storage.get_all_campaigns()
     
     total_campaigns = len(campaigns)
     active_campaigns = sum(1 for c in campaigns.values() if c.get('status') == 'running')
@@ -713,12 +1159,12 @@ async def get_stats():
 @app.get("/api/campaigns")
 async def get_campaigns():
     """Get all campaigns with real-time status"""
-    return storage.get_all_campaigns()
+    return await async_storage.get_all_campaigns()
 
 @app.get("/api/campaigns/{campaign_id}")
 async def get_campaign(campaign_id: str):
     """Get specific campaign"""
-    campaign = storage.get_campaign(campaign_id)
+    campaign = await async_storage.get_campaign(campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     return campaign
@@ -726,7 +1172,7 @@ async def get_campaign(campaign_id: str):
 @app.get("/api/campaigns/{campaign_id}/logs")
 async def get_campaign_logs(campaign_id: str, limit: int = 1000):
     """Get campaign logs"""
-    logs = storage.get_campaign_logs(campaign_id, limit)
+    logs = await async_storage.get_campaign_logs(campaign_id, limit)
     return {"logs": logs}
 
 @app.post("/api/campaigns")
@@ -752,7 +1198,7 @@ async def create_campaign(campaign: CampaignCreate):
         "error_count": 0
     }
     
-    if storage.save_campaign(new_campaign):
+    if await async_storage.save_campaign(new_campaign):
         logger.info(f"Created campaign {campaign_id}: {campaign.name}")
         return {"success": True, "campaign_id": campaign_id}
     else:
@@ -1217,7 +1663,7 @@ async def health_check():
     """Comprehensive health check"""
     try:
         # Check database
-        campaigns = storage.get_all_campaigns()
+        await async_storage.ping()
         db_status = "healthy"
     except Exception as e:
         db_status = f"unhealthy: {str(e)}"
@@ -64,6 +64,8 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from prometheus_client import Counter, Histogram, Gauge, generate_latest
 import requests
 
+from backend.partitions import dbapi_executor, maintain_partitions
+
 # Professional enums
 class CampaignStatus(Enum):
     DRAFT = "draft"
@@ -132,6 +134,9 @@ app.config.update(
     CELERY_RESULT_BACKEND=os.environ.get('REDIS_URL', 'redis://localhost:6379/2'),
     MAX_CONTENT_LENGTH=100 * 1024 * 1024,  # 100MB
     RATELIMIT_STORAGE_URL=os.environ.get('REDIS_URL', 'redis://localhost:6379/3'),
+    EMAIL_LOG_PARTITION_INTERVAL=os.environ.get('EMAIL_LOG_PARTITION_INTERVAL', 'day'),
+    EMAIL_LOG_PARTITIONS_AHEAD=int(os.environ.get('EMAIL_LOG_PARTITIONS_AHEAD', '7')),
+    EMAIL_LOG_RETENTION_DAYS=int(os.environ.get('EMAIL_LOG_RETENTION_DAYS', '90')),
 )
 
 # Professional rate limiting
@@ -273,18 +278,20 @@ class ProfessionalDatabase:
                     )
                 """)
                 
-                # Email logs table with partitioning for performance
+                # Email logs table with partitioning for performance; the
+                # primary key must include the partition key
                 cur.execute("""
                     CREATE TABLE IF NOT EXISTS email_logs (
-                        id UUID PRIMARY KEY,
+                        id UUID NOT NULL,
                         campaign_id UUID REFERENCES campaigns(id) ON DELETE CASCADE,
                         email VARCHAR(255) NOT NULL,
                         status VARCHAR(50) NOT NULL,
-                        timestamp TIMESTAMPTZ DEFAULT NOW(),
+                        timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
                         error_message TEXT,
                         delivery_time FLOAT,
                         tenant_id UUID NOT NULL,
-                        metadata JSONB DEFAULT '{}'
+                        metadata JSONB DEFAULT '{}',
+                        PRIMARY KEY (id, timestamp)
                     ) PARTITION BY RANGE (timestamp)
                 """)
                 
@@ -338,11 +345,14 @@ class ProfessionalDatabase:
                 # Create indexes for performance
                 cur.execute("CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns(status)")
                 cur.execute("CREATE INDEX IF NOT EXISTS idx_campaigns_tenant ON campaigns(tenant_id)")
-                cur.execute("CREATE INDEX IF NOT EXISTS idx_email_logs_campaign ON email_logs(campaign_id)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_email_logs_campaign ON email_logs(campaign_id, timestamp)")
                 cur.execute("CREATE INDEX IF NOT EXISTS idx_email_logs_status ON email_logs(status)")
                 cur.execute("CREATE INDEX IF NOT EXISTS idx_users_tenant ON users(tenant_id)")
                 cur.execute("CREATE INDEX IF NOT EXISTS idx_accounts_tenant ON accounts(tenant_id)")
                 
+                # Partitions for the coming days (inserts fail without one)
+                self._maintain_partitions(cur)
+                
                 conn.commit()
                 logger.info("Database schema initialized successfully")
         except Exception as e:
@@ -351,6 +361,29 @@ class ProfessionalDatabase:
         finally:
             self.put_connection(conn)
     
+    def _maintain_partitions(self, cur):
+        result = maintain_partitions(
+            dbapi_executor(cur),
+            interval=app.config['EMAIL_LOG_PARTITION_INTERVAL'],
+            ahead=app.config['EMAIL_LOG_PARTITIONS_AHEAD'],
+            retention_days=app.config['EMAIL_LOG_RETENTION_DAYS'],
+        )
+        if result['removed']:
+            logger.info("Dropped expired email_logs partitions", partitions=result['removed'])
+    
+    def maintain_email_log_partitions(self):
+        """Create upcoming email_logs partitions and drop those past retention"""
+        conn = self.get_connection()
+        try:
+            with conn.cursor() as cur:
+                self._maintain_partitions(cur)
+            conn.commit()
+        except Exception as e:
+            logger.error("Error maintaining email_logs partitions", error=str(e))
+            conn.rollback()
+        finally:
+            self.put_connection(conn)
+    
     def execute_query(self, query, params=None, fetch=False):
         """Execute query with connection handling"""
         conn = self.get_connection()
@@ -413,10 +446,14 @@ class ProfessionalCampaignManager:
     def _start_monitoring(self):
         """Start background monitoring tasks"""
         def monitor_loop():
+            last_partition_maintenance = time.time()
             while True:
                 try:
                     self._update_metrics()
                     self._check_stalled_campaigns()
+                    if time.time() - last_partition_maintenance >= 3600:
+                        db.maintain_email_log_partitions()
+                        last_partition_maintenance = time.time()
                     time.sleep(30)  # Monitor every 30 seconds
                 except Exception as e:
                     logger.error("Monitor loop error", error=str(e))
@@ -910,9 +947,17 @@ def get_campaign_logs_api(campaign_id):
             per_page = min(request.args.get('per_page', 100, type=int), 500)
             status_filter = request.args.get('status')
             
-            # Build query
-            where_clause = "WHERE campaign_id = %s"
-            params = [campaign_id]
+            # Build query; bounding timestamp by the campaign's creation lets
+            # Postgres skip every email_logs partition from before it
+            campaign_rows = db.execute_query(
+                "SELECT created_at FROM campaigns WHERE id = %s",
+                (campaign_id,), fetch=True
+            )
+            if not campaign_rows:
+                return jsonify({'error': 'Campaign not found'}), 404
+            
+            where_clause = "WHERE campaign_id = %s AND timestamp >= %s"
+            params = [campaign_id, campaign_rows[0][0]]
             
             if status_filter:
                 where_clause += " AND status = %s"
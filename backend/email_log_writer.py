@@ -0,0 +1,269 @@
+"""
+Buffered EmailLog ingestion through asyncpg.
+
+Rows are queued in memory and flushed in bulk with COPY (falling back to a
+multi-row executemany if COPY is rejected). A flush happens when
+flush_rows rows are waiting or flush_interval seconds have passed, whichever
+comes first. The buffer is bounded: once max_buffer rows are queued, add()
+waits until the flusher catches up, which applies backpressure to senders.
+
+A failed write drops its rows (a broken partition must not stall sending),
+but the next flush() raises EmailLogWriteError, so a caller that needs its
+rows durable learns they were lost and can write them again. A caller that
+shares the writer passes the ids of its own rows to flush(ids=...), so it is
+told only about those, and can ask existing_ids() which rows a crashed
+earlier attempt already got into the table (see log_record_id()).
+
+EmailLogWriter is for async code (the API). ThreadedEmailLogWriter runs one
+on a private event loop thread so synchronous Celery workers can use it.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+EMAIL_LOG_COLUMNS = ('id', 'campaign_id', 'email', 'status', 'timestamp', 'error_message', 'delivery_time')
+MAX_LOST_IDS = 100000  # Ids of dropped rows remembered for flush(ids=...)
+
+# Namespace for deterministic log row ids
+EMAIL_LOG_NAMESPACE = uuid.UUID('6f1d3c1e-9a4b-4f0e-8d2a-5b7c9e0a1f34')
+
+
+class EmailLogWriteError(RuntimeError):
+    """Rows queued before a flush() were not written"""
+
+
+def log_record_id(campaign_id, run_id, batch_index: int, email: str) -> uuid.UUID:
+    """Stable id for one recipient's log row in one batch of one run"""
+    return uuid.uuid5(EMAIL_LOG_NAMESPACE, f"{campaign_id}:{run_id}:{batch_index}:{email}")
+
+
+def make_log_record(campaign_id, email: str, status: str, error_message: Optional[str] = None,
+                    delivery_time: Optional[int] = None, timestamp: Optional[datetime] = None,
+                    record_id: Optional[uuid.UUID] = None) -> Tuple:
+    """Build a row tuple in EMAIL_LOG_COLUMNS order (random id unless record_id is given)"""
+    if not isinstance(campaign_id, uuid.UUID):
+        campaign_id = uuid.UUID(str(campaign_id))
+    return (record_id or uuid.uuid4(), campaign_id, email, status, timestamp or datetime.utcnow(),
+            error_message, delivery_time)
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """asyncpg wants a plain postgresql:// DSN, not the SQLAlchemy form"""
+    return database_url.replace('postgresql+asyncpg://', 'postgresql://').replace('postgresql+psycopg2://', 'postgresql://')
+
+
+class EmailLogWriter:
+    """Size- and time-bounded bulk writer for email_logs"""
+
+    def __init__(self, pool: asyncpg.Pool, table: str = 'email_logs', max_buffer: int = 20000,
+                 flush_rows: int = 2000, flush_interval: float = 1.0):
+        self.pool = pool
+        self.table = table
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffer)
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._use_copy = True
+        self._flush_waiters: List[asyncio.Future] = []
+        self._lost_rows = 0  # Rows dropped by failed writes since the last flush() returned
+        self._lost_ids: "OrderedDict[uuid.UUID, None]" = OrderedDict()
+        self._last_error: Optional[Exception] = None
+        self.stats = {'rows_written': 0, 'flushes': 0, 'flush_errors': 0, 'backpressure_waits': 0}
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def add(self, record: Sequence[Any]) -> None:
+        """Queue one row; waits while the buffer is full"""
+        if self._closed:
+            raise RuntimeError('EmailLogWriter is closed')
+        if self._queue.full():
+            self.stats['backpressure_waits'] += 1
+        await self._queue.put(tuple(record))
+
+    async def add_many(self, records: Sequence[Sequence[Any]]) -> None:
+        for record in records:
+            await self.add(record)
+
+    async def flush(self, ids: Optional[Iterable[uuid.UUID]] = None) -> None:
+        """Wait until everything queued so far has been written
+
+        Raises:
+            EmailLogWriteError: if any write since the previous flush failed,
+                or, when ids is given, only if one of those rows was dropped
+        """
+        try:
+            if self._task is None:
+                await self._write_or_record(self._drain(self._queue.qsize()))
+                error = self._take_lost_error()
+                if error:
+                    raise error
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                self._flush_waiters.append(waiter)
+                await waiter
+        except EmailLogWriteError:
+            if ids is None:
+                raise
+        if ids is not None:
+            lost = [row_id for row_id in ids if self._lost_ids.pop(row_id, False) is None]
+            if lost:
+                raise EmailLogWriteError(f"{len(lost)} email log rows were not written: {self._last_error}")
+
+    async def existing_ids(self, ids: Sequence[uuid.UUID]) -> Set[uuid.UUID]:
+        """Which of these row ids are already in the table"""
+        if not ids:
+            return set()
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(f"SELECT id FROM {self.table} WHERE id = ANY($1::uuid[])", list(ids))
+        return {row['id'] for row in rows}
+
+    def _take_lost_error(self) -> Optional[EmailLogWriteError]:
+        """The error to report for rows dropped since it was last reported"""
+        if not self._lost_rows:
+            return None
+        error = EmailLogWriteError(f"{self._lost_rows} email log rows were not written: {self._last_error}")
+        self._lost_rows = 0
+        return error
+
+    async def _write_or_record(self, batch: List[Tuple]) -> None:
+        try:
+            await self._write(batch)
+        except Exception as e:
+            # Rows are dropped rather than retried forever; losing log rows
+            # must not stall sending. The next flush() reports the loss.
+            self.stats['flush_errors'] += 1
+            self._lost_rows += len(batch)
+            for row in batch:
+                self._lost_ids[row[0]] = None
+            while len(self._lost_ids) > MAX_LOST_IDS:
+                self._lost_ids.popitem(last=False)
+            self._last_error = e
+            logger.error(f"EmailLog flush of {len(batch)} rows failed: {e}")
+
+    async def close(self) -> None:
+        """Flush remaining rows and stop the background flusher"""
+        self._closed = True
+        if self._task is not None:
+            try:
+                await self.flush()
+            except EmailLogWriteError as e:
+                logger.error(f"Closing EmailLogWriter: {e}")
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _drain(self, limit: int) -> List[Tuple]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.flush_rows and not self._flush_waiters:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                batch.extend(self._drain(self.flush_rows - len(batch)))
+
+            # A flush() request writes everything queued up to this point
+            waiters, self._flush_waiters = self._flush_waiters, []
+            if waiters:
+                batch.extend(self._drain(self._queue.qsize()))
+
+            await self._write_or_record(batch)
+            if not waiters:
+                continue
+            error = self._take_lost_error()
+            for waiter in waiters:
+                if waiter.done():
+                    continue
+                if error is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(error)
+
+    async def _write(self, batch: List[Tuple]) -> None:
+        if not batch:
+            return
+        async with self.pool.acquire() as conn:
+            if self._use_copy:
+                try:
+                    await conn.copy_records_to_table(self.table, records=batch, columns=EMAIL_LOG_COLUMNS)
+                except (asyncpg.InsufficientPrivilegeError, asyncpg.FeatureNotSupportedError) as e:
+                    logger.warning(f"COPY into {self.table} unavailable ({e}), falling back to executemany")
+                    self._use_copy = False
+            if not self._use_copy:
+                await conn.executemany(
+                    f"INSERT INTO {self.table} ({', '.join(EMAIL_LOG_COLUMNS)}) "
+                    f"VALUES ({', '.join(f'${i}' for i in range(1, len(EMAIL_LOG_COLUMNS) + 1))})",
+                    batch
+                )
+        self.stats['rows_written'] += len(batch)
+        self.stats['flushes'] += 1
+
+
+class ThreadedEmailLogWriter:
+    """EmailLogWriter running on its own event loop thread, for sync callers"""
+
+    def __init__(self, database_url: str, **writer_options):
+        self.database_url = asyncpg_dsn(database_url)
+        self.writer_options = writer_options
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='email-log-writer', daemon=True)
+        self._thread.start()
+        self._writer: EmailLogWriter = self._call(self._open())
+
+    async def _open(self) -> EmailLogWriter:
+        pool = await asyncpg.create_pool(self.database_url, min_size=1, max_size=2)
+        writer = EmailLogWriter(pool, **self.writer_options)
+        writer.start()
+        return writer
+
+    def _call(self, coro, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def add(self, record: Sequence[Any]) -> None:
+        """Queue one row; blocks the calling thread while the buffer is full"""
+        self._call(self._writer.add(record))
+
+    def flush(self, timeout: Optional[float] = None, ids: Optional[Iterable[uuid.UUID]] = None) -> None:
+        self._call(self._writer.flush(ids), timeout)
+
+    def existing_ids(self, ids: Sequence[uuid.UUID]) -> Set[uuid.UUID]:
+        return self._call(self._writer.existing_ids(ids))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self._writer.stats)
+
+    def close(self) -> None:
+        self._call(self._writer.close())
+        self._call(self._writer.pool.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
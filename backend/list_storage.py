@@ -0,0 +1,351 @@
+"""
+Managed on-disk storage for recipient data lists.
+
+Each list is one Parquet file, ``<list_id>.parquet``, with these columns:
+
+- address: the address as uploaded, trimmed
+- domain: the lowercased domain, dictionary-encoded
+- hash: uint64 address_hash() of the lowercased address
+- source_row: line number in the uploaded file
+
+Only lines containing '@' are kept, and duplicates are dropped. A list's
+"line" numbering (campaign start_line) is the row position in the file.
+
+DataListWriter consumes an upload chunk by chunk and writes a row group per
+ROW_GROUP_SIZE rows, so a list is never held in memory as a whole. Only
+the dedupe set of address hashes grows with the list (one Python int in a
+set, roughly 70-100 bytes per distinct address). MultipartListUpload feeds
+it from a streaming multipart/form-data body.
+
+scan_recipients memory-maps the file, reads only the columns it needs, skips
+the row groups before start_line, and applies domain filters and hash
+exclusions (suppression) as vectorized masks.
+
+Lists stored before the move to Parquet are plain ``.txt`` files, optionally
+with a ``.idx`` line-offset index; read_addresses still serves them.
+"""
+
+import hashlib
+import os
+import random
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from multipart.multipart import MultipartParser, parse_options_header
+
+ROW_GROUP_SIZE = 65536
+MAX_LINE_BYTES = 4096  # A "line" longer than this is not an address; it is skipped
+
+LIST_SCHEMA = pa.schema([
+    ('address', pa.string()),
+    ('domain', pa.string()),
+    ('hash', pa.uint64()),
+    ('source_row', pa.uint32()),
+])
+
+def list_path(directory: str, list_id) -> str:
+    return os.path.join(directory, f"{list_id}.parquet")
+
+def index_path(data_path: str) -> str:
+    return os.path.splitext(data_path)[0] + '.idx'
+
+def address_hash(address: str) -> int:
+    """Stable 64-bit key for an address (case-insensitive); shared with suppression"""
+    return int.from_bytes(hashlib.blake2b(address.strip().lower().encode('utf-8'), digest_size=8).digest(), 'little')
+
+def address_domain(address: str) -> str:
+    return address.rsplit('@', 1)[-1].strip().lower()
+
+class DataListWriter:
+    """Incrementally parse uploaded bytes into a managed Parquet list"""
+
+    def __init__(self, directory: str, list_id, row_group_size: int = ROW_GROUP_SIZE):
+        os.makedirs(directory, exist_ok=True)
+        self.path = list_path(directory, list_id)
+        self.row_group_size = row_group_size
+        self._file = open(self.path + '.part', 'wb')
+        self._writer = pq.ParquetWriter(self._file, LIST_SCHEMA, compression='zstd', use_dictionary=['domain'])
+        self._columns = {name: [] for name in LIST_SCHEMA.names}
+        self._pending = b''
+        self._skipping = False
+        self._source_row = 0
+        self._seen = set()
+        self.bytes_received = 0
+        self.total_lines = 0
+        self.total_count = 0
+        self.invalid_count = 0
+        self.duplicate_count = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self.bytes_received += len(chunk)
+        lines = (self._pending + chunk).split(b'\n')
+        self._pending = lines.pop()
+        if self._skipping and lines:
+            # The first piece ends the over-long line being discarded
+            lines.pop(0)
+            self._source_row += 1
+            self._skipping = False
+        for line in lines:
+            self._add_line(line)
+        if self._skipping:
+            self._pending = b''
+        elif len(self._pending) > MAX_LINE_BYTES:
+            # No newline for too long: count it once and discard up to the next newline
+            self._pending = b''
+            self._skipping = True
+            self.total_lines += 1
+            self.invalid_count += 1
+
+    def _add_line(self, raw: bytes) -> None:
+        self._source_row += 1
+        address = raw.decode('utf-8', errors='ignore').strip().lstrip('\ufeff')
+        if not address:
+            return
+        self.total_lines += 1
+        if '@' not in address or len(raw) > MAX_LINE_BYTES:
+            self.invalid_count += 1
+            return
+        key = address_hash(address)
+        if key in self._seen:
+            self.duplicate_count += 1
+            return
+        self._seen.add(key)
+
+        columns = self._columns
+        columns['address'].append(address)
+        columns['domain'].append(address_domain(address))
+        columns['hash'].append(key)
+        columns['source_row'].append(self._source_row)
+        self.total_count += 1
+        if len(columns['address']) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._columns['address']:
+            return
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(self._columns[field.name], type=field.type) for field in LIST_SCHEMA],
+            schema=LIST_SCHEMA
+        )
+        self._writer.write_batch(batch, row_group_size=self.row_group_size)
+        self._columns = {name: [] for name in LIST_SCHEMA.names}
+
+    def commit(self) -> str:
+        """Finish the upload and move the file into place; returns its path"""
+        if self._pending and not self._skipping:
+            self._add_line(self._pending)
+            self._pending = b''
+        self._flush()
+        self._seen = set()
+        self._writer.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.path + '.part', self.path)
+        return self.path
+
+    def abort(self) -> None:
+        try:
+            self._writer.close()
+        finally:
+            self._file.close()
+            try:
+                os.remove(self.path + '.part')
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'total_lines': self.total_lines,
+            'total_count': self.total_count,
+            'invalid_count': self.invalid_count,
+            'duplicate_count': self.duplicate_count,
+            'bytes_received': self.bytes_received,
+        }
+
+class MultipartListUpload:
+    """Incremental multipart/form-data parser: the file part goes into a DataListWriter,
+    small text fields (e.g. the list name) are collected in memory"""
+
+    MAX_FIELD_BYTES = 4096
+
+    def __init__(self, content_type: str, writer: DataListWriter, file_field: str = 'file'):
+        mime, options = parse_options_header(content_type or '')
+        boundary = options.get(b'boundary')
+        if mime != b'multipart/form-data' or not boundary:
+            raise ValueError("Expected multipart/form-data with a boundary")
+        self.writer = writer
+        self.file_field = file_field
+        self.fields: Dict[str, str] = {}
+        self.file_seen = False
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b''
+        self._header_value = b''
+        self._is_file = False
+        self._name = None
+        self._value = b''
+        self._parser = MultipartParser(boundary, {
+            'on_part_begin': self._on_part_begin,
+            'on_header_field': self._on_header_field,
+            'on_header_value': self._on_header_value,
+            'on_header_end': self._on_header_end,
+            'on_headers_finished': self._on_headers_finished,
+            'on_part_data': self._on_part_data,
+            'on_part_end': self._on_part_end,
+        })
+
+    def write(self, chunk: bytes) -> None:
+        self._parser.write(chunk)
+
+    def finalize(self) -> None:
+        self._parser.finalize()
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._name = None
+        self._is_file = False
+        self._value = b''
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b''
+        self._header_value = b''
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b'content-disposition', b''))
+        self._name = options.get(b'name', b'').decode('utf-8', errors='replace')
+        self._is_file = self._name == self.file_field
+        if self._is_file:
+            if self.file_seen:
+                raise ValueError(f"Only one '{self.file_field}' part is accepted")
+            self.file_seen = True
+
+    def _on_part_data(self, data, start, end):
+        if self._is_file:
+            self.writer.feed(data[start:end])
+            return
+        self._value += data[start:end]
+        if len(self._value) > self.MAX_FIELD_BYTES:
+            raise ValueError(f"Form field '{self._name}' is too large")
+
+    def _on_part_end(self):
+        if not self._is_file and self._name:
+            self.fields[self._name] = self._value.decode('utf-8', errors='replace')
+
+def is_columnar(data_path: str) -> bool:
+    return data_path.endswith('.parquet')
+
+def scan_recipients(data_path: str, start_line: int = 0, limit: Optional[int] = None,
+                    domains: Optional[Iterable[str]] = None, exclude_hashes=None,
+                    columns: Sequence[str] = ('address',)) -> pa.Table:
+    """Vectorized read of a Parquet list
+    
+    Rows before start_line are skipped by row group where possible. domains
+    keeps only those domains; exclude_hashes (any array-like of uint64
+    address_hash values, e.g. a suppression set) drops matching rows. Only
+    the requested columns and the ones the filters need are read.
+    """
+    parquet = pq.ParquetFile(data_path, memory_map=True)
+    domain_set = pa.array(sorted({d.strip().lower() for d in domains}), type=pa.string()) if domains else None
+    if isinstance(exclude_hashes, pa.ChunkedArray):
+        exclude_hashes = exclude_hashes.combine_chunks()
+    elif exclude_hashes is not None and not isinstance(exclude_hashes, pa.Array):
+        exclude_hashes = pa.array(list(exclude_hashes), type=pa.uint64())
+    needed = list(dict.fromkeys(
+        list(columns) + (['domain'] if domain_set is not None else []) + (['hash'] if exclude_hashes is not None else [])
+    ))
+
+    tables = []
+    found = 0
+    group_start = 0
+    for group in range(parquet.num_row_groups):
+        group_rows = parquet.metadata.row_group(group).num_rows
+        group_end = group_start + group_rows
+        if group_end <= start_line:
+            group_start = group_end
+            continue
+        table = parquet.read_row_group(group, columns=needed)
+        if start_line > group_start:
+            table = table.slice(start_line - group_start)
+        group_start = group_end
+
+        mask = None
+        if domain_set is not None:
+            mask = pc.is_in(table['domain'], value_set=domain_set)
+        if exclude_hashes is not None and len(exclude_hashes):
+            keep = pc.invert(pc.is_in(table['hash'], value_set=exclude_hashes))
+            mask = keep if mask is None else pc.and_(mask, keep)
+        if mask is not None:
+            table = table.filter(mask)
+        if limit is not None:
+            table = table.slice(0, limit - found)
+        tables.append(table.select(list(columns)))
+        found += table.num_rows
+        if limit is not None and found >= limit:
+            break
+    if not tables:
+        return LIST_SCHEMA.empty_table().select(list(columns))
+    return pa.concat_tables(tables)
+
+def domain_counts(data_path: str) -> Dict[str, int]:
+    """Recipients per domain, read from the domain column alone"""
+    table = pq.read_table(data_path, columns=['domain'], memory_map=True)
+    counts = pc.value_counts(table['domain'].combine_chunks())
+    return {item['values'].as_py(): item['counts'].as_py() for item in counts}
+
+def sample_recipients(data_path: str, size: int, seed: Optional[int] = None) -> List[str]:
+    """Random sample of addresses without reading the whole list into Python objects"""
+    addresses = pq.read_table(data_path, columns=['address'], memory_map=True)['address']
+    if size >= len(addresses):
+        return addresses.to_pylist()
+    positions = sorted(random.Random(seed).sample(range(len(addresses)), size))
+    return addresses.take(pa.array(positions)).to_pylist()
+
+def _indexed_offset(data_path: str, line: int) -> Optional[int]:
+    """Byte offset of a line from a legacy text list's index; None if there is no index"""
+    path = index_path(data_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        f.seek(line * 8)
+        entry = f.read(8)
+    if len(entry) < 8:
+        return os.path.getsize(data_path)  # Past the end of the list
+    return int.from_bytes(entry, 'little')
+
+def read_addresses(data_path: str, start_line: int = 0, limit: Optional[int] = None) -> List[str]:
+    """Addresses from start_line on, for Parquet and legacy text lists alike"""
+    if is_columnar(data_path):
+        return scan_recipients(data_path, start_line, limit)['address'].to_pylist()
+    addresses = []
+    offset = _indexed_offset(data_path, start_line) if start_line else 0
+    with open(data_path, 'rb') as f:
+        if offset is None:
+            # Text list without an index: skip line by line
+            lines = islice(f, start_line, None)
+        else:
+            f.seek(offset)
+            lines = f
+        for line in lines:
+            email = line.decode('utf-8', errors='ignore').strip()
+            if '@' in email:
+                addresses.append(email)
+                if limit is not None and len(addresses) >= limit:
+                    break
+    return addresses
+
+def remove_list(data_path: str) -> None:
+    for path in (data_path, index_path(data_path)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -6,19 +6,21 @@ Built for reliability, scalability, and performance
 
 import asyncio
 import os
+import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 import json
 import logging
 from contextlib import asynccontextmanager
 
 # FastAPI and async imports
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 
 # Database and caching
@@ -46,6 +48,13 @@ import secrets
 # Monitoring
 from prometheus_fastapi_instrumentator import Instrumentator
 
+from backend.list_storage import DataListWriter, MultipartListUpload, domain_counts, is_columnar, remove_list
+from backend.partitions import convert_legacy_table, ensure_partitions, lock_maintenance, sqlalchemy_executor
+from backend.stats_counters import (
+    RECONCILE_ATTEMPTS, RECONCILE_LOCK_SECONDS, RECONCILE_SQL, counters_from_rows, format_stats, needs_reconcile,
+    queue_campaign_added, queue_campaign_removed, queue_status_change, user_stats_key
+)
+
 # Logging setup
 logging.basicConfig(
     level=logging.INFO,
@@ -60,6 +69,14 @@ class Settings:
     SECRET_KEY = os.getenv("SECRET_KEY", secrets.token_urlsafe(32))
     CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/1")
     CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/2")
+    # email_logs partitioning: 'day' or 'month' partitions, created this many
+    # intervals ahead, dropped once older than the retention window (0 keeps all)
+    EMAIL_LOG_PARTITION_INTERVAL = os.getenv("EMAIL_LOG_PARTITION_INTERVAL", "day")
+    EMAIL_LOG_PARTITIONS_AHEAD = int(os.getenv("EMAIL_LOG_PARTITIONS_AHEAD", "7"))
+    EMAIL_LOG_RETENTION_DAYS = int(os.getenv("EMAIL_LOG_RETENTION_DAYS", "90"))
+    # Managed recipient list storage (shared with the Celery workers)
+    DATA_LIST_DIR = os.getenv("DATA_LIST_DIR", "data_lists")
+    MAX_DATA_LIST_BYTES = int(os.getenv("MAX_DATA_LIST_BYTES", str(2 * 1024 ** 3)))
 
 settings = Settings()
 
@@ -86,8 +103,7 @@ celery_app.conf.update(
     timezone='UTC',
     enable_utc=True,
     task_routes={
-        'send_campaign_emails': {'queue': 'email_queue'},
-        'process_campaign_batch': {'queue': 'campaign_queue'},
+        'backend.tasks.send_email_batch': {'queue': 'email_queue'},
     },
     worker_concurrency=10,
     task_acks_late=True,
@@ -147,6 +163,8 @@ class DataList(Base):
     name = Column(String(255), nullable=False)
     file_path = Column(String(500))
     total_count = Column(Integer, default=0)
+    invalid_count = Column(Integer, default=0, server_default='0')
+    duplicate_count = Column(Integer, default=0, server_default='0')
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -183,22 +201,38 @@ class Campaign(Base):
     __table_args__ = (
         Index('idx_campaigns_status_created', 'status', 'created_at'),
         Index('idx_campaigns_user_status', 'created_by', 'status'),
+        Index('idx_campaigns_user_created', 'created_by', 'created_at', 'id'),
     )
 
+class CampaignBatch(Base):
+    __tablename__ = "campaign_batches"
+    
+    # One row per batch whose counts were folded into its campaign; the
+    # primary key makes applying a redelivered batch a no-op
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id", ondelete="CASCADE"), primary_key=True)
+    run_id = Column(String(32), primary_key=True)
+    batch_index = Column(Integer, primary_key=True)
+    sent = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
 class EmailLog(Base):
     __tablename__ = "email_logs"
     
+    # Range-partitioned on timestamp (see backend/partitions.py); the primary
+    # key has to include the partition key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
     email = Column(String(255), nullable=False)
     status = Column(String(50), nullable=False, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
     error_message = Column(Text)
     delivery_time = Column(Integer)  # milliseconds
     
     __table_args__ = (
         Index('idx_email_logs_campaign_status', 'campaign_id', 'status'),
         Index('idx_email_logs_timestamp', 'timestamp'),
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
     )
 
 # Pydantic Models
@@ -236,14 +270,12 @@ class EmailAccountResponse(BaseModel):
     hourly_limit: int
     created_at: datetime
 
-class DataListCreate(BaseModel):
-    name: str = Field(..., min_length=1, max_length=255)
-    file_content: str  # Base64 encoded file content
-
 class DataListResponse(BaseModel):
     id: str
     name: str
     total_count: int
+    invalid_count: int = 0
+    duplicate_count: int = 0
     created_at: datetime
 
 class CampaignCreate(BaseModel):
@@ -284,53 +316,162 @@ class CampaignResponse(BaseModel):
     total_sent: int
     total_failed: int
 
+class CampaignSummary(BaseModel):
+    """Listing projection of a campaign: no subject/message bodies"""
+    id: str
+    name: str
+    status: str
+    account_id: str
+    data_list_id: str
+    created_at: datetime
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    total_recipients: int
+    total_sent: int
+    total_failed: int
+
+class CampaignPage(BaseModel):
+    items: List[CampaignSummary]
+    next_after: Optional[str] = None
+    has_more: bool = False
+
 # WebSocket Manager
+class ClientConnection:
+    """One websocket plus its bounded outbound queue and sender task"""
+    
+    def __init__(self, client_id: str, websocket: WebSocket, queue_size: int):
+        self.client_id = client_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.sender: Optional[asyncio.Task] = None
+        self.last_progress = time.monotonic()
+        self.dropped = 0
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.campaign_subscribers: Dict[str, List[str]] = {}
+    """Tracks websocket clients and their campaign subscriptions
+    
+    Every client has its own sender task draining a bounded queue of
+    pre-serialized messages, so a broadcast only enqueues and one slow socket
+    never delays the others. When a client's queue is full it is evicted if
+    it has not completed a send for stall_timeout seconds; otherwise it is
+    merely bursty and its oldest queued message is dropped. A single send
+    taking longer than send_timeout also evicts.
+    """
+    
+    def __init__(self, queue_size: int = 100, send_timeout: float = 10.0, stall_timeout: float = 2.0):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.stall_timeout = stall_timeout
+        self.active_connections: Dict[str, ClientConnection] = {}
+        self.campaign_subscribers: Dict[str, Set[str]] = {}
+        self.client_campaigns: Dict[str, Set[str]] = {}  # reverse index for O(1) cleanup
+        self.evictions = 0
     
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
-        self.active_connections[client_id] = websocket
+        # A reconnect under the same id replaces the old socket
+        if client_id in self.active_connections:
+            self._evict(self.active_connections[client_id], "replaced by new connection")
+        client = ClientConnection(client_id, websocket, self.queue_size)
+        client.sender = asyncio.create_task(self._sender(client))
+        self.active_connections[client_id] = client
         logger.info(f"Client {client_id} connected")
     
-    def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
-        # Remove from campaign subscriptions
-        for campaign_id, subscribers in self.campaign_subscribers.items():
-            if client_id in subscribers:
-                subscribers.remove(client_id)
+    def disconnect(self, client_id: str, websocket: Optional[WebSocket] = None):
+        client = self.active_connections.get(client_id)
+        # Ignore a late disconnect from a socket that has since been replaced
+        if client is None or (websocket is not None and client.websocket is not websocket):
+            return
+        self._remove(client)
         logger.info(f"Client {client_id} disconnected")
     
+    def _remove(self, client: ClientConnection):
+        self.active_connections.pop(client.client_id, None)
+        for campaign_id in self.client_campaigns.pop(client.client_id, ()):
+            subscribers = self.campaign_subscribers.get(campaign_id)
+            if subscribers is not None:
+                subscribers.discard(client.client_id)
+                if not subscribers:
+                    del self.campaign_subscribers[campaign_id]
+        if client.sender is not None and client.sender is not asyncio.current_task():
+            client.sender.cancel()
+    
+    def _evict(self, client: ClientConnection, reason: str):
+        self.evictions += 1
+        logger.warning(f"Evicting websocket client {client.client_id}: {reason}")
+        self._remove(client)
+        asyncio.create_task(self._close(client.websocket))
+    
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
+    
+    async def _sender(self, client: ClientConnection):
+        while True:
+            if client.queue.empty():
+                client.last_progress = time.monotonic()
+            text = await client.queue.get()
+            try:
+                await asyncio.wait_for(client.websocket.send_text(text), self.send_timeout)
+                client.last_progress = time.monotonic()
+            except asyncio.TimeoutError:
+                self._evict(client, f"send took longer than {self.send_timeout}s")
+                return
+            except Exception as e:
+                logger.error(f"Error sending message to {client.client_id}: {e}")
+                self._remove(client)
+                return
+    
+    def _enqueue(self, client_id: str, text: str):
+        client = self.active_connections.get(client_id)
+        if client is None:
+            return
+        if client.queue.full():
+            if time.monotonic() - client.last_progress > self.stall_timeout:
+                self._evict(client, f"{self.queue_size} messages backed up")
+                return
+            client.queue.get_nowait()
+            client.dropped += 1
+        client.queue.put_nowait(text)
+    
     async def subscribe_to_campaign(self, client_id: str, campaign_id: str):
-        if campaign_id not in self.campaign_subscribers:
-            self.campaign_subscribers[campaign_id] = []
-        if client_id not in self.campaign_subscribers[campaign_id]:
-            self.campaign_subscribers[campaign_id].append(client_id)
+        if client_id not in self.active_connections:
+            return
+        self.campaign_subscribers.setdefault(campaign_id, set()).add(client_id)
+        self.client_campaigns.setdefault(client_id, set()).add(campaign_id)
+    
+    async def send_personal(self, client_id: str, message: dict):
+        self._enqueue(client_id, json.dumps(message, default=str))
     
     async def broadcast_to_campaign(self, campaign_id: str, message: dict):
-        if campaign_id in self.campaign_subscribers:
-            for client_id in self.campaign_subscribers[campaign_id]:
-                if client_id in self.active_connections:
-                    try:
-                        await self.active_connections[client_id].send_json(message)
-                    except Exception as e:
-                        logger.error(f"Error sending message to {client_id}: {e}")
-                        self.disconnect(client_id)
+        subscribers = self.campaign_subscribers.get(campaign_id)
+        if not subscribers:
+            return
+        text = json.dumps(message, default=str)  # serialized once for every subscriber
+        for client_id in list(subscribers):
+            self._enqueue(client_id, text)
+        # Let idle senders pick the message up before the next broadcast, so a
+        # burst of broadcasts only backs up clients that are actually stalled
+        await asyncio.sleep(0)
     
     async def broadcast_to_all(self, message: dict):
-        disconnected = []
-        for client_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {e}")
-                disconnected.append(client_id)
-        
-        for client_id in disconnected:
-            self.disconnect(client_id)
+        if not self.active_connections:
+            return
+        text = json.dumps(message, default=str)
+        for client_id in list(self.active_connections):
+            self._enqueue(client_id, text)
+        await asyncio.sleep(0)
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": len(self.active_connections),
+            "campaigns_with_subscribers": len(self.campaign_subscribers),
+            "queued_messages": sum(c.queue.qsize() for c in self.active_connections.values()),
+            "dropped_messages": sum(c.dropped for c in self.active_connections.values()),
+            "evictions": self.evictions,
+        }
 
 manager = ConnectionManager()
 
@@ -368,6 +509,35 @@ async def get_current_user(
         raise HTTPException(status_code=401, detail="User not found")
     return user
 
+def ensure_indexes(sync_conn):
+    """create_all skips existing tables, so add indexes introduced since they were created"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+def ensure_columns(sync_conn):
+    """create_all skips existing tables, so add columns introduced since they were created"""
+    inspector = sa.inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column.name} {column.type.compile(dialect=sync_conn.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            sync_conn.execute(sa.text(ddl))
+
+def setup_email_log_partitions(sync_conn):
+    """Convert a legacy unpartitioned email_logs and create upcoming partitions"""
+    execute = sqlalchemy_executor(sync_conn)
+    lock_maintenance(execute)
+    convert_legacy_table(execute, lambda: EmailLog.__table__.create(sync_conn),
+                         interval=settings.EMAIL_LOG_PARTITION_INTERVAL)
+    # Retention runs in the scheduled maintenance task; startup only creates
+    ensure_partitions(execute, interval=settings.EMAIL_LOG_PARTITION_INTERVAL,
+                      ahead=settings.EMAIL_LOG_PARTITIONS_AHEAD)
+
 # Startup and shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -375,9 +545,13 @@ async def lifespan(app: FastAPI):
     global redis_client
     redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
     
-    # Create tables
+    # Create tables, then make sure email_logs is partitioned and has
+    # partitions for the coming days before any sends are logged
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(ensure_columns)
+        await conn.run_sync(ensure_indexes)
+        await conn.run_sync(setup_email_log_partitions)
     
     logger.info("Application started")
     yield
@@ -507,37 +681,66 @@ async def get_email_accounts(
 # Data Lists
 @app.post("/api/data-lists", response_model=DataListResponse)
 async def create_data_list(
-    data_list: DataListCreate,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    # Process file content (simplified - in production, handle file upload properly)
-    import base64
-    import tempfile
-    
+    """Upload a recipient list as multipart/form-data with `name` and `file` parts
+    
+    The body is parsed as it arrives and written straight into managed list
+    storage, so the addresses themselves are never held in memory. The one
+    per-address cost is deduplication: DataListWriter keeps a set of 64-bit
+    address hashes, roughly 70-100 bytes per distinct address (about 1 GB
+    for 10M addresses), bounded by MAX_DATA_LIST_BYTES.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_DATA_LIST_BYTES:
+        raise HTTPException(status_code=413, detail="Data list is too large")
+    
+    list_id = uuid.uuid4()
+    writer = DataListWriter(settings.DATA_LIST_DIR, list_id)
     try:
-        file_content = base64.b64decode(data_list.file_content).decode('utf-8')
-        emails = [line.strip() for line in file_content.split('\n') if '@' in line.strip()]
+        upload = MultipartListUpload(request.headers.get("content-type"), writer)
+        async for chunk in request.stream():
+            # Parsing and disk writes stay off the event loop
+            await run_in_threadpool(upload.write, chunk)
+            if writer.bytes_received > settings.MAX_DATA_LIST_BYTES:
+                raise HTTPException(status_code=413, detail="Data list is too large")
+        upload.finalize()
         
-        # Save to temporary file (in production, use proper file storage)
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-            f.write('\n'.join(emails))
-            file_path = f.name
-        
-        db_data_list = DataList(
-            name=data_list.name,
-            file_path=file_path,
-            total_count=len(emails),
-            created_by=current_user.id
-        )
+        name = upload.fields.get("name", "").strip()
+        if not name or len(name) > 255:
+            raise HTTPException(status_code=400, detail="A name of 1-255 characters is required")
+        if not upload.file_seen:
+            raise HTTPException(status_code=400, detail="Missing 'file' part")
+        file_path = await run_in_threadpool(writer.commit)
+    except HTTPException:
+        writer.abort()
+        raise
+    except Exception as e:
+        writer.abort()
+        raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+    
+    stats = writer.stats()
+    db_data_list = DataList(
+        id=list_id,
+        name=name,
+        file_path=file_path,
+        total_count=stats["total_count"],
+        invalid_count=stats["invalid_count"],
+        duplicate_count=stats["duplicate_count"],
+        created_by=current_user.id
+    )
+    try:
         db.add(db_data_list)
         await db.commit()
-        await db.refresh(db_data_list)
-        
-        return DataListResponse.from_orm(db_data_list)
+    except Exception:
+        remove_list(file_path)
+        raise
+    await db.refresh(db_data_list)
     
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+    logger.info(f"Data list {list_id} stored: {stats}")
+    return DataListResponse.from_orm(db_data_list)
 
 @app.get("/api/data-lists", response_model=List[DataListResponse])
 async def get_data_lists(
@@ -552,6 +755,28 @@ async def get_data_lists(
     data_lists = result.scalars().all()
     return [DataListResponse.from_orm(data_list) for data_list in data_lists]
 
+@app.get("/api/data-lists/{data_list_id}/domains")
+async def get_data_list_domains(
+    data_list_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Recipient count per domain, from the list's domain column alone"""
+    result = await db.execute(
+        sa.select(DataList).where(
+            DataList.id == data_list_id,
+            DataList.created_by == current_user.id
+        )
+    )
+    data_list = result.scalar_one_or_none()
+    if not data_list:
+        raise HTTPException(status_code=404, detail="Data list not found")
+    if not data_list.file_path or not is_columnar(data_list.file_path):
+        raise HTTPException(status_code=409, detail="Data list predates columnar storage; re-upload it")
+    
+    counts = await run_in_threadpool(domain_counts, data_list.file_path)
+    return {"data_list_id": data_list_id, "domains": dict(sorted(counts.items(), key=lambda item: -item[1]))}
+
 # Campaigns
 @app.post("/api/campaigns", response_model=CampaignResponse)
 async def create_campaign(
@@ -598,15 +823,18 @@ async def create_campaign(
     await db.refresh(db_campaign)
     
     # Cache in Redis
-    await redis_client.hset(
-        f"campaign:{db_campaign.id}",
-        mapping={
-            "status": CampaignStatus.READY,
-            "total_recipients": data_list.total_count,
-            "total_sent": "0",
-            "total_failed": "0"
-        }
-    )
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.hset(
+            f"campaign:{db_campaign.id}",
+            mapping={
+                "status": CampaignStatus.READY,
+                "total_recipients": data_list.total_count,
+                "total_sent": "0",
+                "total_failed": "0"
+            }
+        )
+        queue_campaign_added(pipe, current_user.id, CampaignStatus.READY)
+        await pipe.execute()
     
     # Broadcast update
     await manager.broadcast_to_all({
@@ -616,38 +844,109 @@ async def create_campaign(
     
     return CampaignResponse.from_orm(db_campaign)
 
-@app.get("/api/campaigns", response_model=List[CampaignResponse])
+CAMPAIGN_SUMMARY_COLUMNS = (
+    Campaign.id, Campaign.name, Campaign.status, Campaign.account_id, Campaign.data_list_id,
+    Campaign.created_at, Campaign.started_at, Campaign.completed_at,
+    Campaign.total_recipients, Campaign.total_sent, Campaign.total_failed,
+)
+
+def parse_campaign_cursor(after: str):
+    """Parse an `after=<created_at,id>` keyset cursor"""
+    try:
+        created_at, campaign_id = after.rsplit(",", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(campaign_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid after cursor, expected <created_at,id>")
+
+async def fetch_campaign_overlays(rows) -> Dict[uuid.UUID, list]:
+    """Real-time (status, total_sent, total_failed) for the running campaigns in a page
+    
+    The API and the workers write final counters and status changes to the
+    database, so only running campaigns can be ahead of their row; the rest
+    are served without touching Redis. The lookups go out as one pipeline.
+    """
+    live_ids = [row["id"] for row in rows if row["status"] == CampaignStatus.RUNNING]
+    if not live_ids:
+        return {}
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for campaign_id in live_ids:
+            pipe.hmget(f"campaign:{campaign_id}", "status", "total_sent", "total_failed")
+        results = await pipe.execute()
+    return dict(zip(live_ids, results))
+
+@app.get("/api/campaigns", response_model=CampaignPage)
 async def get_campaigns(
     status: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    query = sa.select(Campaign).where(Campaign.created_by == current_user.id)
+    # Newest first, keyset-paginated on (created_at, id); served by
+    # idx_campaigns_user_created, or idx_campaigns_user_status with a status filter
+    query = sa.select(*CAMPAIGN_SUMMARY_COLUMNS).where(Campaign.created_by == current_user.id)
     
     if status:
         query = query.where(Campaign.status == status)
     
-    query = query.order_by(Campaign.created_at.desc())
+    if after:
+        after_created_at, after_id = parse_campaign_cursor(after)
+        query = query.where(sa.tuple_(Campaign.created_at, Campaign.id) < sa.tuple_(after_created_at, after_id))
+    
+    query = query.order_by(Campaign.created_at.desc(), Campaign.id.desc()).limit(limit + 1)
     
     result = await db.execute(query)
-    campaigns = result.scalars().all()
+    rows = result.mappings().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     
     # Enhance with real-time data from Redis
-    enhanced_campaigns = []
-    for campaign in campaigns:
-        campaign_data = CampaignResponse.from_orm(campaign)
+    overlays = await fetch_campaign_overlays(rows)
+    items = []
+    for row in rows:
+        campaign_data = CampaignSummary(**{
+            **row,
+            "id": str(row["id"]),
+            "account_id": str(row["account_id"]),
+            "data_list_id": str(row["data_list_id"]),
+            "total_recipients": row["total_recipients"] or 0,
+            "total_sent": row["total_sent"] or 0,
+            "total_failed": row["total_failed"] or 0,
+        })
         
-        # Get real-time stats from Redis
-        redis_stats = await redis_client.hgetall(f"campaign:{campaign.id}")
-        if redis_stats:
-            campaign_data.total_sent = int(redis_stats.get("total_sent", campaign.total_sent))
-            campaign_data.total_failed = int(redis_stats.get("total_failed", campaign.total_failed))
-            if redis_stats.get("status"):
-                campaign_data.status = redis_stats["status"]
+        redis_status, redis_sent, redis_failed = overlays.get(row["id"], (None, None, None))
+        if redis_sent is not None:
+            campaign_data.total_sent = int(redis_sent)
+        if redis_failed is not None:
+            campaign_data.total_failed = int(redis_failed)
+        if redis_status:
+            campaign_data.status = redis_status
         
-        enhanced_campaigns.append(campaign_data)
+        items.append(campaign_data)
     
-    return enhanced_campaigns
+    next_after = None
+    if has_more:
+        last = rows[-1]
+        next_after = f"{last['created_at'].isoformat()},{last['id']}"
+    return CampaignPage(items=items, next_after=next_after, has_more=has_more)
+
+@app.get("/api/campaigns/{campaign_id}", response_model=CampaignResponse)
+async def get_campaign(
+    campaign_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Full campaign including subject and message (the listing omits them)"""
+    result = await db.execute(
+        sa.select(Campaign).where(
+            Campaign.id == campaign_id,
+            Campaign.created_by == current_user.id
+        )
+    )
+    campaign = result.scalar_one_or_none()
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return CampaignResponse.from_orm(campaign)
 
 @app.post("/api/campaigns/{campaign_id}/start")
 async def start_campaign(
@@ -671,18 +970,22 @@ async def start_campaign(
         raise HTTPException(status_code=400, detail="Campaign is already running")
     
     # Update status to running
+    previous_status = campaign.status
     campaign.status = CampaignStatus.RUNNING
     campaign.started_at = datetime.utcnow()
     await db.commit()
     
     # Update Redis
-    await redis_client.hset(
-        f"campaign:{campaign_id}",
-        mapping={
-            "status": CampaignStatus.RUNNING,
-            "started_at": campaign.started_at.isoformat()
-        }
-    )
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.hset(
+            f"campaign:{campaign_id}",
+            mapping={
+                "status": CampaignStatus.RUNNING,
+                "started_at": campaign.started_at.isoformat()
+            }
+        )
+        queue_status_change(pipe, current_user.id, previous_status, CampaignStatus.RUNNING)
+        await pipe.execute()
     
     # Start campaign processing with Celery
     from backend.tasks import process_campaign
@@ -722,7 +1025,10 @@ async def pause_campaign(
     await db.commit()
     
     # Update Redis
-    await redis_client.hset(f"campaign:{campaign_id}", "status", CampaignStatus.PAUSED)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.hset(f"campaign:{campaign_id}", "status", CampaignStatus.PAUSED)
+        queue_status_change(pipe, current_user.id, CampaignStatus.RUNNING, CampaignStatus.PAUSED)
+        await pipe.execute()
     
     # Broadcast update
     await manager.broadcast_to_campaign(campaign_id, {
@@ -750,11 +1056,15 @@ async def delete_campaign(
         raise HTTPException(status_code=404, detail="Campaign not found")
     
     # Delete from database (cascade will handle email_logs)
+    deleted_status, deleted_sent, deleted_failed = campaign.status, campaign.total_sent, campaign.total_failed
     await db.delete(campaign)
     await db.commit()
     
     # Clean up Redis
-    await redis_client.delete(f"campaign:{campaign_id}")
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.delete(f"campaign:{campaign_id}")
+        queue_campaign_removed(pipe, current_user.id, deleted_status, deleted_sent, deleted_failed)
+        await pipe.execute()
     
     # Broadcast update
     await manager.broadcast_to_all({
@@ -770,44 +1080,44 @@ async def get_stats(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    # Try Redis cache first
-    cache_key = f"stats:{current_user.id}"
-    cached_stats = await redis_client.get(cache_key)
-    
-    if cached_stats:
-        return json.loads(cached_stats)
-    
-    # Calculate from database
-    result = await db.execute(
-        sa.text("""
-            SELECT 
-                COUNT(*) as total_campaigns,
-                COUNT(*) FILTER (WHERE status = 'running') as active_campaigns,
-                COUNT(*) FILTER (WHERE status = 'completed') as completed_campaigns,
-                COALESCE(SUM(total_sent), 0) as total_sent,
-                COALESCE(SUM(total_failed), 0) as total_failed
-            FROM campaigns 
-            WHERE created_by = :user_id
-        """),
-        {"user_id": current_user.id}
-    )
-    
-    stats_row = result.fetchone()
-    
-    stats = {
-        "total_campaigns": stats_row[0],
-        "active_campaigns": stats_row[1],
-        "completed_campaigns": stats_row[2],
-        "total_sent": stats_row[3],
-        "total_failed": stats_row[4],
-        "delivery_rate": round((stats_row[3] / (stats_row[3] + stats_row[4]) * 100), 1) if (stats_row[3] + stats_row[4]) > 0 else 0,
-        "timestamp": datetime.utcnow().isoformat()
-    }
-    
-    # Cache for 10 seconds
-    await redis_client.setex(cache_key, 10, json.dumps(stats))
-    
-    return stats
+    # Counters are maintained incrementally (see backend/stats_counters.py);
+    # the SQL aggregate only runs to reconcile them
+    key = user_stats_key(current_user.id)
+    counters = await redis_client.hgetall(key)
+    
+    if needs_reconcile(counters):
+        # One reconciler per user at a time; others serve the current counters
+        got_lock = await redis_client.set(f"{key}:reconciling", "1", nx=True, ex=RECONCILE_LOCK_SECONDS)
+        if got_lock or "reconciled_at" not in counters:
+            counters = await reconcile_user_stats(db, current_user.id)
+    
+    return format_stats(counters, datetime.utcnow().isoformat())
+
+async def reconcile_user_stats(db: AsyncSession, user_id) -> Dict[str, Any]:
+    """Rebuild a user's stats hash from the campaigns table
+
+    The hash is WATCHed before the SQL aggregate runs, so an HINCRBY that
+    lands between the read and the rewrite aborts the rewrite instead of
+    being erased. Writers commit to Postgres before they increment, so any
+    change missing from the aggregate has not touched the hash yet either.
+    """
+    key = user_stats_key(user_id)
+    for _ in range(RECONCILE_ATTEMPTS):
+        async with redis_client.pipeline(transaction=True) as pipe:
+            await pipe.watch(key)
+            result = await db.execute(sa.text(RECONCILE_SQL), {"user_id": user_id})
+            counters = counters_from_rows(result.fetchall())
+            pipe.multi()
+            pipe.delete(key)
+            pipe.hset(key, mapping=counters)
+            try:
+                await pipe.execute()
+                return counters
+            except aioredis.WatchError:
+                continue
+    # Counters kept moving; serve them as they are and reconcile next time
+    logger.info(f"Stats reconcile for user {user_id} skipped after concurrent updates")
+    return await redis_client.hgetall(key)
 
 # Serve frontend
 @app.get("/", response_class=HTMLResponse)
@@ -846,14 +1156,18 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                     # Send current campaign stats
                     redis_stats = await redis_client.hgetall(f"campaign:{campaign_id}")
                     if redis_stats:
-                        await websocket.send_json({
+                        # Through the client's queue so it is the only writer to the socket
+                        await manager.send_personal(client_id, {
                             "type": "campaign_stats",
                             "campaign_id": campaign_id,
                             "stats": redis_stats
                         })
                         
-    except WebSocketDisconnect:
-        manager.disconnect(client_id)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the socket was closed by an eviction
+        pass
+    finally:
+        manager.disconnect(client_id, websocket)
 
 # Health check
 @app.get("/health")
@@ -880,6 +1194,7 @@ async def health_check():
             "database": "healthy" if db_healthy else "unhealthy",
             "redis": "healthy" if redis_healthy else "unhealthy"
         },
+        "websockets": manager.stats(),
         "timestamp": datetime.utcnow().isoformat()
     }
 
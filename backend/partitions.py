@@ -0,0 +1,251 @@
+"""
+Time-based partition management for email_logs.
+
+email_logs is RANGE-partitioned on ``timestamp``. This module creates the
+partitions ahead of time, detaches and drops partitions older than the
+retention window, and converts a legacy unpartitioned email_logs table in
+place (the old table is attached as one partition covering everything before
+the first managed partition).
+
+Functions take an ``execute(sql, params=None) -> rows`` callable, so the same
+code serves the SQLAlchemy engines in backend/ and the psycopg2 pool in
+app_professional.py. Partition names encode their lower bound:
+``email_logs_p20250804`` (daily) or ``email_logs_p202508`` (monthly).
+"""
+
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Execute = Callable[..., Sequence[Tuple]]
+
+DAILY = 'day'
+MONTHLY = 'month'
+
+# pg_advisory_xact_lock key shared by every process doing partition DDL
+MAINTENANCE_LOCK_ID = 7240311
+
+def lock_maintenance(execute: Execute) -> None:
+    """Serialize partition DDL across API workers and Celery (held until commit)"""
+    execute("SELECT pg_advisory_xact_lock(%(lock_id)s)", {'lock_id': MAINTENANCE_LOCK_ID})
+
+def sqlalchemy_executor(conn) -> Execute:
+    """Adapt a synchronous SQLAlchemy Connection (e.g. inside run_sync)"""
+    from sqlalchemy import text
+
+    def execute(sql: str, params: Optional[dict] = None):
+        result = conn.execute(text(re.sub(r"%\((\w+)\)s", r":\1", sql)), params or {})
+        return result.fetchall() if result.returns_rows else []
+    return execute
+
+def dbapi_executor(cursor) -> Execute:
+    """Adapt a pyformat DB-API cursor (psycopg2)"""
+    def execute(sql: str, params: Optional[dict] = None):
+        cursor.execute(sql, params)
+        return cursor.fetchall() if cursor.description else []
+    return execute
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def partition_bounds(day: date, interval: str) -> Tuple[date, date]:
+    """[start, end) of the partition containing day"""
+    if interval == MONTHLY:
+        start = _month_start(day)
+        return start, _next_month(start)
+    return day, day + timedelta(days=1)
+
+def partition_name(table: str, start: date, interval: str) -> str:
+    suffix = start.strftime('%Y%m') if interval == MONTHLY else start.strftime('%Y%m%d')
+    return f"{table}_p{suffix}"
+
+def parse_partition_name(table: str, name: str) -> Optional[Tuple[date, str]]:
+    """Recover (lower bound, interval) from a managed partition's name"""
+    match = re.fullmatch(rf"{re.escape(table)}_p(\d{{6}}|\d{{8}})", name)
+    if not match:
+        return None
+    digits = match.group(1)
+    if len(digits) == 6:
+        return datetime.strptime(digits, '%Y%m').date(), MONTHLY
+    return datetime.strptime(digits, '%Y%m%d').date(), DAILY
+
+def create_partition_sql(table: str, start: date, interval: str) -> str:
+    start, end = partition_bounds(start, interval)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, start, interval)} "
+        f"PARTITION OF {table} FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+def list_partitions(execute: Execute, table: str) -> List[str]:
+    rows = execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = %(table)s
+        ORDER BY c.relname
+        """,
+        {'table': table}
+    )
+    return [row[0] for row in rows]
+
+def table_kind(execute: Execute, table: str) -> Optional[str]:
+    """'p' for a partitioned table, 'r' for a plain table, None if missing"""
+    rows = execute(
+        "SELECT relkind FROM pg_class WHERE relname = %(table)s AND relkind IN ('r', 'p')",
+        {'table': table}
+    )
+    return rows[0][0] if rows else None
+
+def _bound_date(expr: str) -> Optional[date]:
+    """Date of one partition bound literal ('2025-08-04' or '2025-08-04 00:00:00'); None for MINVALUE/MAXVALUE"""
+    match = re.search(r"'(\d{4}-\d{2}-\d{2})", expr)
+    return datetime.strptime(match.group(1), '%Y-%m-%d').date() if match else None
+
+def partition_ranges(execute: Execute, table: str) -> List[Tuple[str, date, date]]:
+    """(name, start, end) of every attached partition, read from the catalog
+
+    MINVALUE/MAXVALUE map to date.min/date.max; a DEFAULT partition has no
+    range and is left out.
+    """
+    rows = execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = %(table)s
+        """,
+        {'table': table}
+    )
+    ranges = []
+    for name, bound in rows:
+        match = re.search(r"FROM \((.*?)\) TO \((.*?)\)", bound or '')
+        if not match:
+            continue
+        start = _bound_date(match.group(1)) or date.min
+        end = _bound_date(match.group(2)) or date.max
+        ranges.append((name, start, end))
+    return sorted(ranges, key=lambda r: r[1])
+
+def uncovered_ranges(start: date, end: date, existing: Sequence[Tuple[str, date, date]]) -> List[Tuple[date, date]]:
+    """Parts of [start, end) not covered by any existing partition range"""
+    gaps = []
+    cursor = start
+    for _, lower, upper in existing:
+        if upper <= cursor or lower >= end:
+            continue
+        if lower > cursor:
+            gaps.append((cursor, lower))
+        cursor = max(cursor, upper)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+def ensure_partitions(execute: Execute, table: str = 'email_logs', interval: str = DAILY,
+                      ahead: int = 7, today: Optional[date] = None) -> List[str]:
+    """Create partitions from today through `ahead` intervals into the future
+
+    Existing partitions are read from the catalog, so periods already
+    covered (by a converted legacy table, or by partitions made under a
+    different interval setting) are skipped. A period that is only partly
+    covered gets daily partitions for its gaps; CREATE IF NOT EXISTS alone
+    would fail there, because the overlapping partition has another name.
+    """
+    today = today or datetime.utcnow().date()
+    existing = partition_ranges(execute, table)
+    created = []
+    start, _ = partition_bounds(today, interval)
+    last = start
+    for _ in range(ahead):
+        last = partition_bounds(last, interval)[1]
+    while start <= last:
+        end = partition_bounds(start, interval)[1]
+        gaps = uncovered_ranges(start, end, existing)
+        if gaps == [(start, end)]:
+            pieces = [(start, interval)]
+        else:
+            pieces = [(day, DAILY) for gap_start, gap_end in gaps
+                      for day in (gap_start + timedelta(days=n) for n in range((gap_end - gap_start).days))]
+        for piece_start, piece_interval in pieces:
+            execute(create_partition_sql(table, piece_start, piece_interval))
+            name = partition_name(table, piece_start, piece_interval)
+            existing.append((name, *partition_bounds(piece_start, piece_interval)))
+            created.append(name)
+        existing.sort(key=lambda r: r[1])
+        start = end
+    return created
+
+def drop_expired_partitions(execute: Execute, table: str = 'email_logs', retention_days: int = 90,
+                            detach_only: bool = False, today: Optional[date] = None) -> List[str]:
+    """Detach (and by default drop) managed partitions entirely older than the retention window"""
+    today = today or datetime.utcnow().date()
+    cutoff = today - timedelta(days=retention_days)
+    removed = []
+    for name in list_partitions(execute, table):
+        parsed = parse_partition_name(table, name)
+        if parsed is None:
+            continue  # legacy or hand-made partition; leave it alone
+        # Each partition's own width comes from its name, so switching the
+        # interval setting later still expires the old partitions correctly
+        _, end = partition_bounds(*parsed)
+        if end > cutoff:
+            continue
+        execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+        if not detach_only:
+            execute(f"DROP TABLE IF EXISTS {name}")
+        removed.append(name)
+        logger.info(f"{'Detached' if detach_only else 'Dropped'} expired partition {name}")
+    return removed
+
+def convert_legacy_table(execute: Execute, create_parent: Callable[[], None], table: str = 'email_logs',
+                         interval: str = DAILY, today: Optional[date] = None) -> bool:
+    """Turn an existing unpartitioned table into the first partition of a new parent
+
+    create_parent() must create the partitioned parent table (e.g. via the
+    SQLAlchemy model). Returns True if a conversion happened.
+    """
+    if table_kind(execute, table) != 'r':
+        return False
+    today = today or datetime.utcnow().date()
+    legacy = f"{table}_legacy"
+    logger.warning(f"Converting unpartitioned {table} into {legacy} partition")
+    execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    # Index names are global; rename the old ones so the parent can reuse them
+    for (index_name,) in execute(
+        "SELECT indexname FROM pg_indexes WHERE tablename = %(table)s", {'table': legacy}
+    ):
+        execute(f'ALTER INDEX "{index_name}" RENAME TO "{index_name}_legacy"')
+    create_parent()
+    # The parent's primary key is (id, timestamp), so the column must be NOT NULL
+    execute(f"UPDATE {legacy} SET timestamp = NOW() WHERE timestamp IS NULL")
+    execute(f"ALTER TABLE {legacy} ALTER COLUMN timestamp SET NOT NULL")
+    # Cover every existing row, including today's; managed partitions start after it
+    newest = execute(f"SELECT MAX(timestamp) FROM {legacy}")[0][0]
+    newest_day = max(today, newest.date()) if newest else today
+    _, upper = partition_bounds(newest_day, interval)
+    execute(
+        f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{upper.isoformat()}')"
+    )
+    return True
+
+def maintain_partitions(execute: Execute, table: str = 'email_logs', interval: str = DAILY,
+                        ahead: int = 7, retention_days: Optional[int] = 90,
+                        detach_only: bool = False) -> dict:
+    """One maintenance pass: create upcoming partitions and expire old ones"""
+    lock_maintenance(execute)
+    created = ensure_partitions(execute, table, interval, ahead)
+    removed = []
+    if retention_days:
+        removed = drop_expired_partitions(execute, table, retention_days, detach_only)
+    return {'ensured': created, 'removed': removed}
@@ -0,0 +1,100 @@
+"""
+Incremental per-user campaign stats kept in a Redis hash.
+
+``user_stats:{user_id}`` holds:
+
+- total_campaigns
+- one ``status:<name>`` field per campaign status
+- total_sent and total_failed
+- reconciled_at
+
+The API and the Celery workers apply HINCRBY deltas on every status
+transition and batch completion, so /api/stats is served straight from the
+hash. The SQL aggregate (RECONCILE_SQL) runs only when the hash is missing or
+older than the reconcile interval, and overwrites whatever drift has built up.
+The rewrite is a WATCH/MULTI transaction, so increments applied while the
+aggregate runs are never lost; the reconcile just tries again.
+
+The queue_* helpers only add commands to a pipeline; they work with both the
+async (aioredis) and sync (redis-py) clients, and the caller executes it.
+"""
+
+import time
+from enum import Enum
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+RECONCILE_INTERVAL = 300     # Seconds between SQL reconciliations per user
+RECONCILE_LOCK_SECONDS = 30  # Only one dashboard request reconciles at a time
+RECONCILE_ATTEMPTS = 3       # Rewrites retried when a concurrent HINCRBY touches the hash
+
+RECONCILE_SQL = """
+    SELECT status, COUNT(*), COALESCE(SUM(total_sent), 0), COALESCE(SUM(total_failed), 0)
+    FROM campaigns
+    WHERE created_by = :user_id
+    GROUP BY status
+"""
+
+def user_stats_key(user_id) -> str:
+    return f"user_stats:{user_id}"
+
+def _status(status) -> str:
+    return status.value if isinstance(status, Enum) else str(status)
+
+def queue_campaign_added(pipe, user_id, status) -> None:
+    key = user_stats_key(user_id)
+    pipe.hincrby(key, "total_campaigns", 1)
+    pipe.hincrby(key, f"status:{_status(status)}", 1)
+
+def queue_campaign_removed(pipe, user_id, status, total_sent: int = 0, total_failed: int = 0) -> None:
+    key = user_stats_key(user_id)
+    pipe.hincrby(key, "total_campaigns", -1)
+    pipe.hincrby(key, f"status:{_status(status)}", -1)
+    queue_send_counts(pipe, user_id, -(total_sent or 0), -(total_failed or 0))
+
+def queue_status_change(pipe, user_id, old_status, new_status) -> None:
+    old_status, new_status = _status(old_status), _status(new_status)
+    if old_status == new_status:
+        return
+    key = user_stats_key(user_id)
+    pipe.hincrby(key, f"status:{old_status}", -1)
+    pipe.hincrby(key, f"status:{new_status}", 1)
+
+def queue_send_counts(pipe, user_id, sent: int, failed: int) -> None:
+    key = user_stats_key(user_id)
+    if sent:
+        pipe.hincrby(key, "total_sent", sent)
+    if failed:
+        pipe.hincrby(key, "total_failed", failed)
+
+def needs_reconcile(counters: Dict[str, str], interval: float = RECONCILE_INTERVAL) -> bool:
+    reconciled_at = counters.get("reconciled_at")
+    return reconciled_at is None or time.time() - float(reconciled_at) > interval
+
+def counters_from_rows(rows: Iterable[Tuple[str, int, int, int]]) -> Dict[str, Any]:
+    """Build the full hash contents from RECONCILE_SQL rows"""
+    counters: Dict[str, Any] = {"total_campaigns": 0, "total_sent": 0, "total_failed": 0}
+    for status, count, sent, failed in rows:
+        counters[f"status:{status}"] = int(count)
+        counters["total_campaigns"] += int(count)
+        counters["total_sent"] += int(sent)
+        counters["total_failed"] += int(failed)
+    counters["reconciled_at"] = time.time()
+    return counters
+
+def format_stats(counters: Dict[str, Any], timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """Shape the hash into the /api/stats response"""
+    def count(field):
+        return max(0, int(float(counters.get(field, 0) or 0)))
+
+    total_sent = count("total_sent")
+    total_failed = count("total_failed")
+    attempted = total_sent + total_failed
+    return {
+        "total_campaigns": count("total_campaigns"),
+        "active_campaigns": count("status:running"),
+        "completed_campaigns": count("status:completed"),
+        "total_sent": total_sent,
+        "total_failed": total_failed,
+        "delivery_rate": round(total_sent / attempted * 100, 1) if attempted > 0 else 0,
+        "timestamp": timestamp,
+    }
@@ -0,0 +1,190 @@
+"""
+Journaled in-memory queue that applies events in batches on a background thread.
+
+Webhook and link endpoints must answer in microseconds, while the stores
+behind them (SQLite) are much cheaper per row when written in batches. An
+intake built on JournaledBatchQueue:
+
+- on enqueue(): appends the events to a journal file and queues them;
+- on a background thread: drains up to batch_size events every
+  flush_interval seconds and hands them to apply_batch();
+- truncates the journal whenever the queue has been fully applied, and
+  replays it on start, so accepted events survive a restart;
+- retries a failed batch before newer events, and after MAX_ATTEMPTS
+  failures appends it to a dead-letter file (``<prefix>.dead.log``, same
+  line format as the journal) so one bad batch cannot stall the intake.
+
+Each process locks its own journal slot (``<prefix>.<n>.log``), so several
+workers can run the same intake side by side; a slot left behind by a dead
+process is replayed by the next process that claims it. Events must be
+JSON-serializable tuples.
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single journal without locking
+    fcntl = None
+
+
+class JournaledBatchQueue:
+    """Base class: subclasses implement apply_batch(events)"""
+
+    MAX_SLOTS = 64
+    MAX_ATTEMPTS = 20  # About ten seconds of retries at the default interval
+    thread_name = 'batch-intake'
+
+    def __init__(self, journal_prefix: str, batch_size: int = 1000, flush_interval: float = 0.5):
+        self.journal_prefix = journal_prefix
+        self.journal_path = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Tuple]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._journal = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._retry: List[Tuple] = []  # Batch whose apply failed; retried before new events
+        self._retry_attempts = 0
+        self.accepted = 0
+        self.applied = 0
+        self.dead_lettered = 0
+        self.replayed = 0
+        self.last_flush_at = None
+
+    def apply_batch(self, events: List[Tuple]) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._journal = self._claim_journal()
+        self.replayed = self._replay_journal()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+        if self.replayed:
+            print(f"📥 {self.thread_name}: replayed {self.replayed} journaled events")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._flush()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+    def _claim_journal(self):
+        for slot in range(self.MAX_SLOTS if fcntl else 1):
+            path = f"{self.journal_prefix}.{slot}.log"
+            journal = open(path, 'a+', encoding='utf-8')
+            if fcntl is None:
+                self.journal_path = path
+                return journal
+            try:
+                fcntl.flock(journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                journal.close()
+                continue
+            self.journal_path = path
+            return journal
+        raise RuntimeError(f"All {self.MAX_SLOTS} journal slots for {self.journal_prefix} are in use")
+
+    def _replay_journal(self) -> int:
+        events = []
+        self._journal.seek(0)
+        for line in self._journal:
+            try:
+                events.append(tuple(json.loads(line)))
+            except ValueError:
+                continue  # Torn last line from a crash mid-write
+        for i in range(0, len(events), self.batch_size):
+            self.apply_batch(events[i:i + self.batch_size])
+        self._journal.truncate(0)
+        self._journal.seek(0)
+        return len(events)
+
+    def enqueue(self, events: Sequence[Tuple]) -> int:
+        """Journal and queue already-validated events; returns how many were queued"""
+        if not events:
+            return 0
+        with self._lock:
+            if self._journal:
+                self._journal.write(''.join(json.dumps(event) + '\n' for event in events))
+                self._journal.flush()
+            for event in events:
+                self._queue.put(event)
+            self.accepted += len(events)
+        return len(events)
+
+    def _drain(self) -> List[Tuple]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self) -> int:
+        applied = 0
+        try:
+            while True:
+                batch = self._retry or self._drain()
+                if not batch:
+                    break
+                self._retry = batch
+                try:
+                    self.apply_batch(batch)
+                except Exception as e:
+                    self._retry_attempts += 1
+                    if self._retry_attempts < self.MAX_ATTEMPTS:
+                        raise
+                    self._dead_letter(batch, e)
+                else:
+                    applied += len(batch)
+                self._retry = []
+                self._retry_attempts = 0
+        finally:
+            if applied:
+                self.applied += applied
+                self.last_flush_at = time.time()
+        with self._lock:
+            # Every journaled event has been applied once the queue is empty
+            if self._journal and self._queue.empty() and not self._retry:
+                self._journal.truncate(0)
+                self._journal.seek(0)
+        return applied
+
+    def _dead_letter(self, batch: List[Tuple], error: Exception) -> None:
+        path = f"{self.journal_prefix}.dead.log"
+        with open(path, 'a', encoding='utf-8') as dead:
+            if fcntl:
+                fcntl.flock(dead.fileno(), fcntl.LOCK_EX)  # Shared by every slot
+            dead.write(''.join(json.dumps(event) + '\n' for event in batch))
+        self.dead_lettered += len(batch)
+        print(f"❌ {self.thread_name}: gave up on {len(batch)} events after {self.MAX_ATTEMPTS} attempts "
+              f"({error}); saved to {path}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self._flush()
+            except Exception as e:
+                print(f"❌ {self.thread_name}: error applying events: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'accepted': self.accepted,
+            'applied': self.applied,
+            'pending': self._queue.qsize() + len(self._retry),
+            'replayed': self.replayed,
+            'dead_lettered': self.dead_lettered,
+            'last_flush_at': self.last_flush_at,
+        }
@@ -0,0 +1,259 @@
+"""
+Indexed store and webhook intake for bounce events.
+
+Bounce webhooks arrive in bursts and are retried by the sender, so every
+event carries an idempotency key:
+
+- the request's Idempotency-Key header (suffixed with the event's position
+  when one request carries several events);
+- otherwise the event's own id;
+- otherwise a hash of (email, message id, type, timestamp).
+
+BounceIntake acknowledges straight away. It drops keys it has seen
+recently in memory, then journals and queues the rest (see batch_intake).
+Batches are recorded in SQLite, where the primary key on event_key makes
+replays harmless. The callback receives only events whose follow-up work
+(suppressing hard bounces, campaign counters) has not completed yet: a row
+stays unprocessed until the callback returns, so a failed callback is run
+again when the batch is retried or replayed from the journal.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from batch_intake import JournaledBatchQueue
+
+HARD = 'hard'
+SOFT = 'soft'
+
+# SMTP / provider wording that means the address will never accept mail
+HARD_BOUNCE_MARKERS = (
+    '5.1.1', '5.1.2', '5.1.3', '5.1.10', '550 5.1', 'user unknown', 'unknown user', 'no such user',
+    'does not exist', 'not found', 'invalid', 'mailbox unavailable', 'address rejected', 'recipient rejected',
+)
+
+# (event_key, email, campaign_id, bounce_type, reason, occurred_at)
+BounceEvent = Tuple[str, str, Optional[str], str, str, Optional[str]]
+
+
+def classify_bounce(bounce_type: Optional[str], reason: Optional[str]) -> str:
+    """'hard' or 'soft' from the provider's type, falling back to the diagnostic text"""
+    bounce_type = (bounce_type or '').strip().lower()
+    if bounce_type in ('hard', 'permanent', 'hardbounce', 'hard_bounce'):
+        return HARD
+    if bounce_type in ('soft', 'transient', 'temporary', 'softbounce', 'soft_bounce'):
+        return SOFT
+    reason = (reason or '').lower()
+    return HARD if any(marker in reason for marker in HARD_BOUNCE_MARKERS) else SOFT
+
+
+def _first(data: Dict[str, Any], *names):
+    for name in names:
+        value = data.get(name)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def parse_bounce_events(payload: Any, idempotency_key: Optional[str] = None) -> List[BounceEvent]:
+    """Normalize a webhook body (one event, a list, or {"events": [...]}) into BounceEvents"""
+    if isinstance(payload, dict) and isinstance(payload.get('events'), list):
+        items = payload['events']
+    elif isinstance(payload, list):
+        items = payload
+    else:
+        items = [payload]
+
+    events = []
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        email = _first(item, 'email', 'recipient', 'to', 'bounced_email')
+        if not isinstance(email, str) or '@' not in email:
+            continue
+        email = email.strip()
+        reason = str(_first(item, 'bounce_reason', 'reason', 'diagnostic', 'description') or 'Unknown bounce')
+        bounce_type = classify_bounce(_first(item, 'bounce_type', 'type', 'category'), reason)
+        occurred_at = _first(item, 'timestamp', 'time', 'bounced_at')
+        campaign_id = _first(item, 'campaign_id', 'campaignId')
+
+        if idempotency_key:
+            event_key = f"{idempotency_key}:{position}" if len(items) > 1 else idempotency_key
+        else:
+            event_key = _first(item, 'event_id', 'id', 'message_event_id')
+            if event_key is None:
+                fingerprint = '|'.join(str(part) for part in (
+                    email.lower(), _first(item, 'message_id', 'messageId'), bounce_type, occurred_at
+                ))
+                event_key = 'h:' + hashlib.blake2b(fingerprint.encode('utf-8'), digest_size=16).hexdigest()
+        events.append((str(event_key), email, str(campaign_id) if campaign_id is not None else None,
+                       bounce_type, reason[:500], str(occurred_at) if occurred_at is not None else None))
+    return events
+
+
+class BounceStore:
+    """SQLite bounce log with one row per distinct event"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS bounce_events (
+                event_key TEXT PRIMARY KEY,
+                email TEXT NOT NULL,
+                campaign_id TEXT,
+                bounce_type TEXT NOT NULL,
+                reason TEXT,
+                occurred_at TEXT,
+                received_at REAL NOT NULL,
+                processed INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_bounce_events_email ON bounce_events(email);
+            CREATE INDEX IF NOT EXISTS idx_bounce_events_campaign ON bounce_events(campaign_id, bounce_type);
+            CREATE INDEX IF NOT EXISTS idx_bounce_events_received ON bounce_events(received_at);
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(bounce_events)")}
+        if 'processed' not in columns:
+            # Rows recorded before the flag existed had their follow-up run already
+            self._conn.execute("ALTER TABLE bounce_events ADD COLUMN processed INTEGER NOT NULL DEFAULT 1")
+
+    def record_batch(self, events: List[BounceEvent]) -> List[BounceEvent]:
+        """Insert a batch in one transaction
+
+        Returns the events that still need their follow-up: the ones not
+        recorded before, plus recorded ones never marked processed.
+        """
+        if not events:
+            return []
+        # Collapse duplicates inside the batch itself
+        unique = list({event[0]: event for event in events}.values())
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so two processes
+            # cannot both decide the same key is new
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = {}
+                keys = [event[0] for event in unique]
+                for i in range(0, len(keys), 900):
+                    batch = keys[i:i + 900]
+                    existing.update(self._conn.execute(
+                        f"SELECT event_key, processed FROM bounce_events WHERE event_key IN ({','.join('?' * len(batch))})",
+                        batch
+                    ))
+                new_events = [event for event in unique if event[0] not in existing]
+                self._conn.executemany(
+                    "INSERT INTO bounce_events (event_key, email, campaign_id, bounce_type, reason, occurred_at, received_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(*event, now) for event in new_events]
+                )
+                new_events += [event for event in unique if existing.get(event[0]) == 0]
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return new_events
+
+    def mark_processed(self, event_keys: List[str]) -> None:
+        """Record that the follow-up for these events has completed"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for i in range(0, len(event_keys), 900):
+                    batch = event_keys[i:i + 900]
+                    self._conn.execute(
+                        f"UPDATE bounce_events SET processed = 1 WHERE event_key IN ({','.join('?' * len(batch))})", batch
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_bounces(self, campaign_id=None, bounce_type: Optional[str] = None,
+                    limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        query = "SELECT email, campaign_id, bounce_type, reason, occurred_at, received_at FROM bounce_events"
+        conditions, params = [], []
+        if campaign_id is not None:
+            conditions.append("campaign_id = ?")
+            params.append(str(campaign_id))
+        if bounce_type:
+            conditions.append("bounce_type = ?")
+            params.append(bounce_type)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY received_at DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {'email': email, 'campaign_id': cid, 'bounce_type': btype, 'reason': reason,
+             'occurred_at': occurred_at, 'received_at': received_at}
+            for email, cid, btype, reason, occurred_at, received_at in rows
+        ]
+
+    def counts(self, campaign_id=None) -> Dict[str, int]:
+        query = "SELECT bounce_type, COUNT(*) FROM bounce_events"
+        params = []
+        if campaign_id is not None:
+            query += " WHERE campaign_id = ?"
+            params.append(str(campaign_id))
+        query += " GROUP BY bounce_type"
+        with self._lock:
+            counts = dict(self._conn.execute(query, params).fetchall())
+        return {'hard': counts.get(HARD, 0), 'soft': counts.get(SOFT, 0), 'total': sum(counts.values())}
+
+
+class BounceIntake(JournaledBatchQueue):
+    """Acknowledge-first webhook intake: dedupe, journal, queue, apply in batches"""
+
+    thread_name = 'bounce-intake'
+
+    def __init__(self, store: BounceStore, journal_prefix: str,
+                 on_new: Optional[Callable[[List[BounceEvent]], None]] = None,
+                 recent_keys: int = 100000, batch_size: int = 1000, flush_interval: float = 0.5):
+        super().__init__(journal_prefix, batch_size, flush_interval)
+        self.store = store
+        self.on_new = on_new
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._recent_limit = recent_keys
+        self._recent_lock = threading.Lock()
+        self.duplicates = 0
+        self.new_events = 0
+
+    def submit_many(self, events: Iterable[BounceEvent]) -> Tuple[int, int]:
+        """Queue events not seen recently; returns (accepted, duplicates)"""
+        fresh = []
+        duplicates = 0
+        with self._recent_lock:
+            for event in events:
+                if event[0] in self._recent:
+                    duplicates += 1
+                    continue
+                self._recent[event[0]] = None
+                fresh.append(event)
+            while len(self._recent) > self._recent_limit:
+                self._recent.popitem(last=False)
+            self.duplicates += duplicates
+        return self.enqueue(fresh), duplicates
+
+    def apply_batch(self, events: List[BounceEvent]) -> None:
+        pending = self.store.record_batch([tuple(event) for event in events])
+        if pending and self.on_new:
+            # If this raises, the rows stay unprocessed and the retried batch
+            # hands them to on_new again
+            self.on_new(pending)
+        if pending:
+            self.store.mark_processed([event[0] for event in pending])
+        self.duplicates += len(events) - len(pending)
+        self.new_events += len(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), 'new_events': self.new_events, 'duplicates': self.duplicates}
@@ -1,18 +1,120 @@
 import requests
 import time
 import json
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional
 
+class StatusCheckScheduler:
+    """
+    Shared scheduler for delayed delivery-status checks
+    
+    Pending checks live in one heap ordered by due time. A single dispatcher
+    thread sleeps until the earliest check is due, then hands every due check
+    (up to batch_size at a time) to a small worker pool. Checks without a
+    definitive result are pushed back onto the heap for a later attempt.
+    Thread count is fixed and the heap is capped at max_pending, however
+    many emails are being tracked.
+    """
+    
+    FIRST_CHECK_DELAY = 5
+    RETRY_DELAY = 10
+    MAX_ATTEMPTS = 3
+    
+    def __init__(self, workers: int = 4, batch_size: int = 200, max_pending: int = 100000):
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._heap = []
+        self._seq = itertools.count()  # Tie-breaker so heap entries never compare trackers
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='status-check')
+        self._slots = threading.BoundedSemaphore(workers * 2)  # Batches queued or running
+        self._thread = threading.Thread(target=self._dispatch, name='status-check-scheduler', daemon=True)
+        self._thread.start()
+        self.scheduled = 0
+        self.dropped = 0
+        self.checked = 0
+    
+    def schedule(self, tracker: 'EmailTracker', tracking_id: str, email: str,
+                 delay: float = FIRST_CHECK_DELAY, attempt: int = 0) -> bool:
+        """Queue a status check; returns False if the scheduler is full"""
+        with self._cond:
+            if len(self._heap) >= self.max_pending:
+                self.dropped += 1
+                return False
+            due = time.monotonic() + delay
+            heapq.heappush(self._heap, (due, next(self._seq), tracker, tracking_id, email, attempt))
+            self.scheduled += 1
+            if self._heap[0][0] == due:
+                self._cond.notify()  # New earliest check: wake the dispatcher
+        return True
+    
+    def _dispatch(self):
+        while True:
+            self._slots.acquire()
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                now = time.monotonic()
+                batch = []
+                while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                    batch.append(heapq.heappop(self._heap))
+            self._executor.submit(self._run_batch, batch)
+    
+    def _run_batch(self, batch):
+        try:
+            for _, _, tracker, tracking_id, email, attempt in batch:
+                try:
+                    status = tracker.check_delivery_status(tracking_id, email)
+                except Exception:
+                    status = {}
+                if status.get('status') not in ('delivered', 'bounced') and attempt + 1 < self.MAX_ATTEMPTS:
+                    self.schedule(tracker, tracking_id, email, self.RETRY_DELAY, attempt + 1)
+        finally:
+            with self._cond:
+                self.checked += len(batch)
+            self._slots.release()
+    
+    def stats(self) -> Dict:
+        with self._cond:
+            pending = len(self._heap)
+        return {'pending': pending, 'scheduled': self.scheduled, 'checked': self.checked, 'dropped': self.dropped}
+
+_status_scheduler = None
+_status_scheduler_lock = threading.Lock()
+
+def get_status_scheduler() -> StatusCheckScheduler:
+    """The process-wide scheduler shared by every EmailTracker"""
+    global _status_scheduler
+    with _status_scheduler_lock:
+        if _status_scheduler is None:
+            _status_scheduler = StatusCheckScheduler()
+        return _status_scheduler
+
 class EmailTracker:
     """Advanced email delivery tracking and bounce detection for Zoho CRM"""
     
-    def __init__(self, account_cookies: Dict, account_headers: Dict):
+    # Counted per campaign; a record contributes 1 to each flag that is true for it
+    COUNTER_FLAGS = ('delivered', 'bounced', 'opened', 'clicked')
+    
+    def __init__(self, account_cookies: Dict, account_headers: Dict,
+                 max_records: int = 200000, max_bounces: int = 100000):
         self.cookies = account_cookies
         self.headers = account_headers
-        self.tracking_data = {}
-        self.bounce_cache = {}
+        # Both are ordered oldest first (sends are appended, bounces re-added at the end),
+        # so expiry pops from the front and touches only expired entries
+        self.tracking_data: "OrderedDict[str, Dict]" = OrderedDict()
+        self.bounce_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self.max_records = max_records
+        self.max_bounces = max_bounces
+        self.campaign_counters: Dict[str, Dict[str, int]] = {}
+        self.tracking_by_email = {}  # lowercased email -> tracking ids, for batch status updates
+        self.status_poller = None
+        self._lock = threading.RLock()
         
     def send_email_with_tracking(self, email: str, subject: str, sender: str, template_id: str, campaign_id: str = None) -> Dict:
         """
@@ -78,18 +180,21 @@ class EmailTracker:
             
             if response.get('success'):
                 # Store tracking info
-                self.tracking_data[tracking_id] = {
+                self._add_record(tracking_id, {
                     'email': email,
                     'subject': subject,
                     'sender': sender,
                     'campaign_id': campaign_id,
                     'sent_at': datetime.now().isoformat(),
+                    'sent_ts': time.time(),
                     'status': 'sent',
                     'tracking_id': tracking_id
-                }
+                })
                 
-                # Start monitoring for delivery status
-                self._start_delivery_monitoring(tracking_id, email)
+                # The account's status poller reports delivery for all recipients at once;
+                # without one, fall back to checking this email on its own
+                if self.status_poller is None:
+                    self._start_delivery_monitoring(tracking_id, email)
                 
                 return {
                     'success': True,
@@ -134,8 +239,7 @@ class EmailTracker:
             final_status = self._combine_status_checks(tracking_status, bounce_status, log_status)
             
             # Update tracking data
-            if tracking_id in self.tracking_data:
-                self.tracking_data[tracking_id].update(final_status)
+            self._update_record(tracking_id, final_status)
             
             return final_status
             
@@ -300,39 +404,108 @@ class EmailTracker:
         }
     
     def _start_delivery_monitoring(self, tracking_id: str, email: str):
-        """Start background monitoring for delivery status"""
-        def monitor_delivery():
-            # Wait a bit for delivery to process
-            time.sleep(5)
-            
-            # Check delivery status multiple times
-            for attempt in range(3):
-                status = self.check_delivery_status(tracking_id, email)
-                
-                if status['status'] in ['delivered', 'bounced']:
-                    # We have a definitive status
-                    break
-                
-                # Wait before next check
-                time.sleep(10)
+        """Queue delivery checks on the shared scheduler (first after 5s, up to 3 attempts)"""
+        get_status_scheduler().schedule(self, tracking_id, email)
+    
+    def attach_status_poller(self, poller):
+        """Take delivery and bounce updates from a ZohoStatusPoller instead of per-email checks"""
+        self.status_poller = poller
+        poller.add_listener(self.apply_status_updates)
+    
+    def apply_status_updates(self, records: List[Dict]) -> int:
+        """
+        Apply a page of Zoho email records (see ZohoOAuth2Client.iter_email_pages)
+        to every tracked email they mention; returns how many were updated
+        """
+        updated = 0
+        now = datetime.now().isoformat()
+        for record in records:
+            bounced = bool(record.get('bounce_count'))
+            delivered = bool(record.get('delivery_time')) or str(record.get('status') or '').lower() in ('delivered', 'sent', 'opened')
+            opened = bool(record.get('open_count'))
+            if not (bounced or delivered or opened):
+                continue
+            # One lock hold per record: the index lookup and the updates must
+            # not interleave with _add_record/_remove_record on other threads
+            with self._lock:
+                for recipient in record.get('recipients') or []:
+                    if bounced:
+                        self.add_bounce(recipient, record.get('bounce_reason') or 'Unknown bounce')
+                    for tracking_id in list(self.tracking_by_email.get(recipient.lower(), ())):
+                        data = self.tracking_data.get(tracking_id)
+                        if data is None:
+                            continue
+                        changes = {'timestamp': now}
+                        if bounced:
+                            changes.update({'status': 'bounced', 'delivery_status': 'failed',
+                                            'bounce_reason': record.get('bounce_reason') or 'Unknown bounce'})
+                        elif data.get('status') != 'bounced':
+                            changes.update({'status': 'delivered', 'delivery_status': 'success'})
+                        if opened:
+                            changes['opened'] = True
+                        self._update_record(tracking_id, changes)
+                        updated += 1
+        return updated
+    
+    def _flags(self, data: Dict) -> Dict[str, bool]:
+        return {
+            'delivered': data.get('status') == 'delivered',
+            'bounced': data.get('status') == 'bounced',
+            'opened': bool(data.get('opened')),
+            'clicked': bool(data.get('clicked'))
+        }
+    
+    def _add_record(self, tracking_id: str, data: Dict):
+        with self._lock:
+            if tracking_id in self.tracking_data:
+                self._remove_record(tracking_id)
+            self.tracking_data[tracking_id] = data
+            self.tracking_by_email.setdefault(data['email'].strip().lower(), []).append(tracking_id)
+            counters = self.campaign_counters.setdefault(
+                data.get('campaign_id'), dict.fromkeys(('total_sent',) + self.COUNTER_FLAGS, 0)
+            )
+            counters['total_sent'] += 1
+            for flag, value in self._flags(data).items():
+                counters[flag] += value
+            while len(self.tracking_data) > self.max_records:
+                self._remove_record(next(iter(self.tracking_data)))
+    
+    def _update_record(self, tracking_id: str, changes: Dict):
+        """Apply changes to a record, moving the campaign counters by the difference"""
+        with self._lock:
+            data = self.tracking_data.get(tracking_id)
+            if data is None:
+                return
+            before = self._flags(data)
+            data.update(changes)
+            counters = self.campaign_counters[data.get('campaign_id')]
+            for flag, value in self._flags(data).items():
+                counters[flag] += value - before[flag]
+    
+    def _remove_record(self, tracking_id: str):
+        data = self.tracking_data.pop(tracking_id)
+        counters = self.campaign_counters[data.get('campaign_id')]
+        counters['total_sent'] -= 1
+        for flag, value in self._flags(data).items():
+            counters[flag] -= value
+        if counters['total_sent'] <= 0:
+            del self.campaign_counters[data.get('campaign_id')]
         
-        # Start monitoring in background thread
-        thread = threading.Thread(target=monitor_delivery)
-        thread.daemon = True
-        thread.start()
+        email_key = data['email'].strip().lower()
+        remaining = [t for t in self.tracking_by_email.get(email_key, []) if t != tracking_id]
+        if remaining:
+            self.tracking_by_email[email_key] = remaining
+        else:
+            self.tracking_by_email.pop(email_key, None)
     
     def get_campaign_stats(self, campaign_id: str) -> Dict:
-        """Get delivery statistics for a campaign"""
-        campaign_emails = [
-            data for data in self.tracking_data.values() 
-            if data.get('campaign_id') == campaign_id
-        ]
-        
-        total_sent = len(campaign_emails)
-        delivered = len([e for e in campaign_emails if e.get('status') == 'delivered'])
-        bounced = len([e for e in campaign_emails if e.get('status') == 'bounced'])
-        opened = len([e for e in campaign_emails if e.get('opened', False)])
-        clicked = len([e for e in campaign_emails if e.get('clicked', False)])
+        """Get delivery statistics for a campaign (from its running counters)"""
+        counters = self.campaign_counters.get(campaign_id) or {}
+        total_sent = counters.get('total_sent', 0)
+        delivered = counters.get('delivered', 0)
+        bounced = counters.get('bounced', 0)
+        opened = counters.get('opened', 0)
+        clicked = counters.get('clicked', 0)
         
         return {
             'campaign_id': campaign_id,
@@ -349,41 +522,48 @@ class EmailTracker:
     
     def add_bounce(self, email: str, reason: str = "Unknown"):
         """Add a bounce notification"""
-        self.bounce_cache[email] = {
-            'bounced': True,
-            'bounce_reason': reason,
-            'timestamp': datetime.now().isoformat()
-        }
+        with self._lock:
+            self.bounce_cache.pop(email, None)  # Re-add at the end to keep time order
+            self.bounce_cache[email] = {
+                'bounced': True,
+                'bounce_reason': reason,
+                'timestamp': datetime.now().isoformat(),
+                'ts': time.time()
+            }
+            while len(self.bounce_cache) > self.max_bounces:
+                self.bounce_cache.popitem(last=False)
     
-    def clear_old_data(self, days: int = 30):
-        """Clear old tracking data"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        # Remove old tracking data
-        old_keys = [
-            key for key, data in self.tracking_data.items()
-            if datetime.fromisoformat(data['sent_at']) < cutoff_date
-        ]
-        
-        for key in old_keys:
-            del self.tracking_data[key]
-        
-        # Remove old bounce cache
-        old_bounces = [
-            email for email, data in self.bounce_cache.items()
-            if datetime.fromisoformat(data['timestamp']) < cutoff_date
-        ]
-        
-        for email in old_bounces:
-            del self.bounce_cache[email]
+    def clear_old_data(self, days: int = 30) -> int:
+        """Clear old tracking data; returns the number of tracking records removed"""
+        cutoff = time.time() - days * 86400
+        removed = 0
+        with self._lock:
+            # Oldest first: stop at the first entry that is still fresh
+            while self.tracking_data:
+                tracking_id, data = next(iter(self.tracking_data.items()))
+                if data['sent_ts'] >= cutoff:
+                    break
+                self._remove_record(tracking_id)
+                removed += 1
+            
+            while self.bounce_cache and next(iter(self.bounce_cache.values()))['ts'] < cutoff:
+                self.bounce_cache.popitem(last=False)
+        return removed
 
 # Global email tracker instance
 email_tracker = None
 
-def initialize_email_tracker(account_cookies: Dict, account_headers: Dict):
-    """Initialize the global email tracker"""
+def initialize_email_tracker(account_cookies: Dict, account_headers: Dict, status_poller=None):
+    """Initialize the global email tracker, optionally fed by the account's Zoho status poller
+
+    Library entry point: neither app.py nor the backend creates a tracker or
+    a poller. A caller that wants batched status feedback starts one with
+    ZohoOAuth2Client.start_status_poller() and passes it in here.
+    """
     global email_tracker
     email_tracker = EmailTracker(account_cookies, account_headers)
+    if status_poller is not None:
+        email_tracker.attach_status_poller(status_poller)
 
 def get_email_tracker() -> Optional[EmailTracker]:
     """Get the global email tracker instance"""
@@ -40,6 +40,9 @@ class CampaignManager {
         document.getElementById('status-filter')?.addEventListener('change', (e) => {
             this.loadCampaigns(e.target.value);
         });
+        document.getElementById('load-more-campaigns')?.addEventListener('click', () => {
+            this.loadCampaigns(this.campaignStatusFilter, true);
+        });
         
         // Modal
         document.getElementById('close-modal')?.addEventListener('click', () => this.hideModal());
@@ -134,18 +137,27 @@ class CampaignManager {
         }
     }
 
-    async loadCampaigns(statusFilter = '') {
-        const url = statusFilter ? `/campaigns?status=${statusFilter}` : '/campaigns';
-        const campaigns = await this.apiRequest(url);
+    async loadCampaigns(statusFilter = '', append = false) {
+        // The API returns one page at a time: {items, next_after, has_more}
+        const params = new URLSearchParams();
+        if (statusFilter) params.set('status', statusFilter);
+        if (append && this.campaignCursor) params.set('after', this.campaignCursor);
+        const query = params.toString();
+        const page = await this.apiRequest(query ? `/campaigns?${query}` : '/campaigns');
         
-        if (campaigns) {
-            this.renderCampaigns(campaigns);
+        if (page) {
+            this.campaignStatusFilter = statusFilter;
+            this.campaignCursor = page.has_more ? page.next_after : null;
+            this.campaigns = append ? [...(this.campaigns || []), ...page.items] : page.items;
+            this.renderCampaigns(this.campaigns);
         }
     }
 
     renderCampaigns(campaigns) {
         const grid = document.getElementById('campaigns-grid');
         const noCampaigns = document.getElementById('no-campaigns');
+        const loadMore = document.getElementById('load-more-campaigns');
+        loadMore?.classList.toggle('hidden', !this.campaignCursor);
         
         if (!campaigns || campaigns.length === 0) {
             grid.classList.add('hidden');
@@ -31,5 +31,11 @@ GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO campaign_user;
 ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO campaign_user;
 ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT USAGE, SELECT ON SEQUENCES TO campaign_user;
 
--- Optimize for email log partitioning (will be created by SQLAlchemy)
--- This is just a preparation script
\ No newline at end of file
+-- email_logs is RANGE-partitioned on timestamp. The parent table is created by
+-- SQLAlchemy at API startup; partitions (email_logs_pYYYYMMDD, or
+-- email_logs_pYYYYMM with EMAIL_LOG_PARTITION_INTERVAL=month) are created ahead
+-- of time and dropped after EMAIL_LOG_RETENTION_DAYS by backend/partitions.py,
+-- run at startup and hourly from Celery beat. To inspect them:
+--   SELECT inhrelid::regclass, pg_get_expr(c.relpartbound, c.oid)
+--   FROM pg_inherits JOIN pg_class c ON c.oid = inhrelid
+--   WHERE inhparent = 'email_logs'::regclass;
\ No newline at end of file
@@ -0,0 +1,380 @@
+"""
+Global suppression list: addresses that must never be sent to again.
+
+Entries (bounces, complaints, unsubscribes, manual blocks) are kept in a
+SQLite table keyed by a 64-bit hash of the normalized address. An in-memory
+Bloom filter over those hashes sits in front of the table:
+
+- most recipients are cleared by the filter alone, without touching SQLite;
+- the few it flags (real hits plus ~1% false positives) are confirmed
+  against the table, one batched query per chunk.
+
+filter_emails() consumes any iterable of addresses chunk by chunk, so a list
+is filtered while it is being read. Removing an entry only deletes the row;
+the Bloom filter keeps the bits and the exact check lets the address through.
+
+Several processes can share one database: sync() notices commits from other
+connections (PRAGMA data_version) and adds their new keys to the local filter.
+
+Unsubscribe links carry an HMAC-signed token (make_unsubscribe_token), and
+SuppressionIntake takes events at request speed and applies them to the
+store in batches (see batch_intake).
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from batch_intake import JournaledBatchQueue
+
+BOUNCE = 'bounce'
+COMPLAINT = 'complaint'
+UNSUBSCRIBE = 'unsubscribe'
+MANUAL = 'manual'
+REASONS = (BOUNCE, COMPLAINT, UNSUBSCRIBE, MANUAL)
+
+FILTER_CHUNK = 5000
+LOOKUP_BATCH = 900  # Stays under SQLite's host parameter limit
+MIN_BLOOM_CAPACITY = 100000
+SYNC_INTERVAL = 1.0  # Seconds between checks for other processes' writes
+SYNC_OVERLAP = 60.0  # Re-read this far behind the watermark: writers stamp rows before they commit
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def email_key(email: str) -> int:
+    """Signed 64-bit key (SQLite INTEGER) for a normalized address"""
+    digest = hashlib.blake2b(normalize_email(email).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+class BloomFilter:
+    """Bit-array Bloom filter over 64-bit keys (double hashing on the key halves)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(int(capacity), 1024)
+        self.size = int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, key: int) -> None:
+        key &= 0xFFFFFFFFFFFFFFFF
+        h1, h2 = key & 0xFFFFFFFF, (key >> 32) | 1
+        size, bits = self.size, self.bits
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        key &= 0xFFFFFFFFFFFFFFFF
+        h1, h2 = key & 0xFFFFFFFF, (key >> 32) | 1
+        size, bits = self.size, self.bits
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class SuppressionStore:
+    """SQLite-backed suppression list with a Bloom-filter prefilter"""
+
+    def __init__(self, db_path: str, error_rate: float = 0.01):
+        self.db_path = db_path
+        self.error_rate = error_rate
+        self.version = 0  # Bumped on every change, so readers can tell when to re-check
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS suppressions (
+                hash INTEGER PRIMARY KEY,
+                email TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                source TEXT,
+                campaign_id TEXT,
+                created_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_suppressions_reason ON suppressions(reason);
+            CREATE INDEX IF NOT EXISTS idx_suppressions_created ON suppressions(created_at);
+            CREATE TABLE IF NOT EXISTS suppression_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self._conn.commit()
+        self._synced_at = time.time()
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._watermark = 0.0
+        self._bloom = self._build_bloom()
+
+    def _build_bloom(self, min_capacity: int = 0) -> BloomFilter:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM suppressions").fetchone()[0]
+            bloom = BloomFilter(max(count * 2, min_capacity, MIN_BLOOM_CAPACITY), self.error_rate)
+            for key, created_at in self._conn.execute("SELECT hash, created_at FROM suppressions"):
+                bloom.add(key)
+                self._watermark = max(self._watermark, created_at)
+        return bloom
+
+    def sync(self, force: bool = False) -> bool:
+        """Pick up entries committed by other processes; True if anything changed"""
+        now = time.time()
+        if not force and now - self._synced_at < SYNC_INTERVAL:
+            return False
+        with self._lock:
+            self._synced_at = now
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return False
+            self._data_version = data_version
+            rows = self._conn.execute(
+                "SELECT hash, created_at FROM suppressions WHERE created_at >= ?",
+                (self._watermark - SYNC_OVERLAP,)
+            ).fetchall()
+            for key, created_at in rows:
+                self._bloom.add(key)
+                self._watermark = max(self._watermark, created_at)
+            if self._bloom.count > self._bloom.capacity:
+                self._bloom = self._build_bloom(self._bloom.capacity * 2)
+            # Removals elsewhere also land here; the exact check picks them up
+            self.version += 1
+        return True
+
+    def add_many(self, entries: Iterable[Tuple[str, str, Optional[str], Optional[str]]]) -> int:
+        """Add (email, reason, source, campaign_id) entries; returns how many were new
+
+        An address keeps the reason it was first suppressed with.
+        """
+        now = time.time()
+        rows = []
+        for email, reason, source, campaign_id in entries:
+            if not email or '@' not in email:
+                continue
+            rows.append((email_key(email), normalize_email(email), reason, source,
+                         str(campaign_id) if campaign_id is not None else None, now))
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO suppressions (hash, email, reason, source, campaign_id, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            added = self._conn.total_changes - before
+            self._watermark = max(self._watermark, now)
+            for row in rows:
+                self._bloom.add(row[0])
+            if self._bloom.count > self._bloom.capacity:
+                self._bloom = self._build_bloom(self._bloom.capacity * 2)
+            if added:
+                self.version += 1
+        return added
+
+    def add(self, email: str, reason: str, source: Optional[str] = None, campaign_id=None) -> bool:
+        return self.add_many([(email, reason, source, campaign_id)]) > 0
+
+    def remove(self, email: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM suppressions WHERE hash = ?", (email_key(email),))
+            self._conn.commit()
+            if cursor.rowcount:
+                self.version += 1
+            return cursor.rowcount > 0
+
+    def _lookup(self, keys: Set[int]) -> Dict[int, str]:
+        """Exact confirmation: reason for each key that really is suppressed"""
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            for i in range(0, len(keys), LOOKUP_BATCH):
+                batch = keys[i:i + LOOKUP_BATCH]
+                placeholders = ','.join('?' * len(batch))
+                found.update(self._conn.execute(
+                    f"SELECT hash, reason FROM suppressions WHERE hash IN ({placeholders})", batch
+                ).fetchall())
+        return found
+
+    def is_suppressed(self, email: str) -> Optional[str]:
+        """The suppression reason for an address, or None"""
+        self.sync()
+        key = email_key(email)
+        if key not in self._bloom:
+            return None
+        return self._lookup({key}).get(key)
+
+    def _filter_chunk(self, chunk: List[str], stats: Dict[str, Any]) -> List[str]:
+        bloom = self._bloom
+        keys = [email_key(email) for email in chunk]
+        candidates = {key for key in keys if key in bloom}
+        confirmed = self._lookup(candidates) if candidates else {}
+        stats['checked'] += len(chunk)
+        stats['bloom_candidates'] += len(candidates)
+        if not confirmed:
+            return chunk
+        allowed = []
+        by_reason = stats['by_reason']
+        for email, key in zip(chunk, keys):
+            reason = confirmed.get(key)
+            if reason is None:
+                allowed.append(email)
+            else:
+                stats['suppressed'] += 1
+                by_reason[reason] = by_reason.get(reason, 0) + 1
+        return allowed
+
+    def iter_allowed(self, emails: Iterable[str], stats: Optional[Dict[str, Any]] = None,
+                     chunk_size: int = FILTER_CHUNK) -> Iterator[str]:
+        """Yield the addresses that are not suppressed, filtering chunk by chunk"""
+        stats = stats if stats is not None else new_filter_stats()
+        self.sync()
+        chunk = []
+        for email in emails:
+            chunk.append(email)
+            if len(chunk) >= chunk_size:
+                yield from self._filter_chunk(chunk, stats)
+                chunk = []
+        if chunk:
+            yield from self._filter_chunk(chunk, stats)
+
+    def filter_emails(self, emails: Iterable[str], chunk_size: int = FILTER_CHUNK) -> Tuple[List[str], Dict[str, Any]]:
+        """(allowed addresses, stats) for an iterable of addresses"""
+        stats = new_filter_stats()
+        allowed = list(self.iter_allowed(emails, stats, chunk_size))
+        return allowed, stats
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT reason, COUNT(*) FROM suppressions GROUP BY reason").fetchall()
+        by_reason = dict(rows)
+        return {
+            'total': sum(by_reason.values()),
+            'by_reason': by_reason,
+            'bloom_capacity': self._bloom.capacity,
+            'bloom_hashes': self._bloom.hashes,
+            'version': self.version,
+        }
+
+    def list_entries(self, reason: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        query = "SELECT email, reason, source, campaign_id, created_at FROM suppressions"
+        params: List[Any] = []
+        if reason:
+            query += " WHERE reason = ?"
+            params.append(reason)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {'email': email, 'reason': reason, 'source': source, 'campaign_id': campaign_id, 'created_at': created_at}
+            for email, reason, source, campaign_id, created_at in rows
+        ]
+
+    def import_bounce_data(self, path: str) -> int:
+        """One-time import of the legacy per-campaign bounce_data.json"""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM suppression_meta WHERE key = 'bounce_data_imported'").fetchone():
+                return 0
+            added = 0
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r') as f:
+                        bounce_data = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    bounce_data = {}
+                if isinstance(bounce_data, dict):
+                    added = self.add_many(
+                        (entry.get('email'), BOUNCE, 'bounce_data.json', campaign_id)
+                        for campaign_id, entries in bounce_data.items() if isinstance(entries, list)
+                        for entry in entries if isinstance(entry, dict)
+                    )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO suppression_meta (key, value) VALUES ('bounce_data_imported', ?)",
+                (str(time.time()),)
+            )
+            self._conn.commit()
+        return added
+
+
+def new_filter_stats() -> Dict[str, Any]:
+    return {'checked': 0, 'suppressed': 0, 'bloom_candidates': 0, 'by_reason': {}}
+
+
+def make_unsubscribe_token(secret: str, email: str, campaign_id=None) -> str:
+    """URL-safe signed token identifying the recipient (and campaign) of a message"""
+    payload = json.dumps([normalize_email(email), campaign_id], separators=(',', ':')).encode('utf-8')
+    signature = hmac.new(secret.encode('utf-8'), payload, hashlib.sha256).digest()[:16]
+    return f"{_b64encode(payload)}.{_b64encode(signature)}"
+
+
+def read_unsubscribe_token(secret: str, token: str) -> Optional[Tuple[str, Any]]:
+    """(email, campaign_id) from a valid token, None if it is malformed or forged"""
+    try:
+        encoded_payload, encoded_signature = token.split('.', 1)
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, TypeError):
+        return None
+    expected = hmac.new(secret.encode('utf-8'), payload, hashlib.sha256).digest()[:16]
+    if not hmac.compare_digest(signature, expected):
+        return None
+    try:
+        email, campaign_id = json.loads(payload)
+    except (ValueError, TypeError):
+        return None
+    return email, campaign_id
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class SuppressionIntake(JournaledBatchQueue):
+    """Request-speed intake of suppression events, applied to the store in batches
+
+    submit() only journals and queues the event; nothing touches SQLite on
+    the request path. See batch_intake for the journal and flush cycle.
+    """
+
+    thread_name = 'suppression-intake'
+
+    def __init__(self, store: SuppressionStore, journal_prefix: str,
+                 batch_size: int = 1000, flush_interval: float = 0.5):
+        super().__init__(journal_prefix, batch_size, flush_interval)
+        self.store = store
+        self.new_suppressions = 0
+
+    def apply_batch(self, events: List[Tuple]) -> None:
+        self.new_suppressions += self.store.add_many(events)
+
+    def submit_many(self, events: Iterable[Tuple[str, str, Optional[str], Any]]) -> int:
+        """Queue (email, reason, source, campaign_id) events; returns how many were accepted"""
+        return self.enqueue([
+            (email.strip(), reason, source, campaign_id)
+            for email, reason, source, campaign_id in events
+            if isinstance(email, str) and '@' in email and reason in REASONS
+        ])
+
+    def submit(self, email: str, reason: str, source: Optional[str] = None, campaign_id=None) -> bool:
+        return self.submit_many([(email, reason, source, campaign_id)]) > 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), 'new_suppressions': self.new_suppressions}
@@ -0,0 +1,122 @@
+"""
+Per-account cache of detected Zoho template functions.
+
+Detecting which ``send_email_templateN`` functions an account has takes a
+round of HTTP probes, so it must never run on a send path. Lookups here are
+non-blocking: a fresh entry is returned as-is, a stale entry is returned
+while a background refresh runs (stale-while-revalidate), and a missing
+entry schedules a refresh and returns None so the caller can use its
+fallback template. Background refreshes of one account are at least
+retry_interval apart, so an account whose detection keeps failing (expired
+cookies) is not probed again on every lookup.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+class TemplateCapabilityCache:
+    """Template detection results per account with TTL and background refresh"""
+
+    def __init__(self, detector: Callable[..., List[Dict]],
+                 on_refresh: Optional[Callable[[Dict, List[Dict]], None]] = None,
+                 ttl: float = 6 * 3600, retry_interval: float = 15 * 60, max_workers: int = 4):
+        self.detector = detector
+        self.on_refresh = on_refresh
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._entries: Dict[Any, Dict] = {}
+        self._last_attempt: Dict[Any, float] = {}  # When a background refresh was last queued
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='template-refresh')
+
+    def seed(self, account: Dict) -> None:
+        """Load the template_info already stored on an account record"""
+        templates = account.get('template_info')
+        if not templates:
+            return
+        detected_at = account.get('template_info_updated_at') or 0
+        with self._lock:
+            entry = self._entries.get(account['id'])
+            if entry is None or entry['detected_at'] < detected_at:
+                self._entries[account['id']] = {'templates': list(templates), 'detected_at': detected_at}
+
+    def get(self, account: Dict) -> Optional[List[Dict]]:
+        """Return cached templates for an account without ever blocking
+
+        Schedules a background refresh when the entry is missing or older
+        than the TTL, unless one was attempted within retry_interval.
+        """
+        self.seed(account)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(account['id'])
+            last_attempt = self._last_attempt.get(account['id'], 0)
+        if (entry is None or now - entry['detected_at'] > self.ttl) and now - last_attempt > self.retry_interval:
+            self.refresh_async(account)
+        return entry['templates'] if entry else None
+
+    def refresh_async(self, account: Dict) -> bool:
+        """Queue a detection run for an account; False if one is already queued"""
+        account_id = account['id']
+        with self._lock:
+            if account_id in self._refreshing:
+                return False
+            self._refreshing.add(account_id)
+            self._last_attempt[account_id] = time.time()
+        self._executor.submit(self._refresh, dict(account))
+        return True
+
+    def refresh(self, account: Dict) -> List[Dict]:
+        """Run detection now (used by the explicit refresh endpoint)
+
+        The detector is called as detector(account, on_partial=callback) and
+        may report templates as they are confirmed; partial results are
+        served from memory right away, and the final list is persisted once.
+        """
+        templates = self.detector(account, on_partial=lambda partial: self._update(account, partial, persist=False))
+        self._update(account, templates)
+        return templates
+
+    def _refresh(self, account: Dict) -> None:
+        try:
+            self.refresh(account)
+        except Exception as e:
+            print(f"⚠️ Background template refresh failed for account {account.get('name')}: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(account['id'])
+
+    def _update(self, account: Dict, templates: List[Dict], persist: bool = True) -> None:
+        # An empty result usually means expired cookies or a network error;
+        # keep serving the last good list rather than dropping it.
+        if not templates:
+            return
+        with self._lock:
+            self._entries[account['id']] = {'templates': list(templates), 'detected_at': time.time()}
+        if persist and self.on_refresh:
+            try:
+                self.on_refresh(account, templates)
+            except Exception as e:
+                print(f"⚠️ Could not save template info: {e}")
+
+    def invalidate(self, account_id: Any) -> None:
+        with self._lock:
+            self._entries.pop(account_id, None)
+            self._last_attempt.pop(account_id, None)
+
+    def status(self) -> Dict[str, Any]:
+        """Per-account age and count of cached templates"""
+        now = time.time()
+        with self._lock:
+            return {
+                str(account_id): {
+                    'templates': len(entry['templates']),
+                    'age_seconds': round(now - entry['detected_at'], 1) if entry['detected_at'] else None,
+                    'refreshing': account_id in self._refreshing,
+                }
+                for account_id, entry in self._entries.items()
+            }
@@ -0,0 +1,304 @@
+"""
+Versioned in-process cache for the JSON data files.
+
+Entries are keyed by name and tagged with the version of the files they were
+built from (``st_mtime_ns`` + ``st_size``). A read re-stats the files and only
+reuses an entry whose version still matches, so writes made through any code
+path - including the many direct ``open(..., 'w')`` writes in app.py - are
+picked up on the next read instead of after a TTL expires.
+
+Cached JSON is stored frozen (``FrozenRecord`` / tuples) so one thread can
+never corrupt what another thread reads. ``get_snapshot`` hands out the
+shared frozen value, ``get_json`` hands out a private mutable copy, and
+``update_json`` is the write-through mutation path.
+"""
+
+import json
+import os
+import threading
+import tempfile
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+
+def file_version(file_path: str) -> Optional[Tuple[int, int]]:
+    """Return the (mtime_ns, size) version tag of a file, or None if missing"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FrozenRecord(Mapping):
+    """Read-only dict view used for cached JSON objects
+
+    Supports the usual read API (``record['id']``, ``record.get('status')``,
+    iteration) so templates and read-only callers work unchanged. Mutation
+    raises TypeError; use ``thaw`` or ``VersionedCache.update_json`` instead.
+    """
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data: Dict[str, Any]):
+        object.__setattr__(self, '_data', data)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __setattr__(self, name, value):
+        raise TypeError('FrozenRecord is read-only')
+
+    def __repr__(self) -> str:
+        return f'FrozenRecord({self._data!r})'
+
+    def thaw(self) -> Dict[str, Any]:
+        """Return a mutable deep copy"""
+        return thaw(self)
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert parsed JSON into FrozenRecord/tuple form"""
+    if isinstance(value, dict):
+        return FrozenRecord({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Recursively convert a frozen value back into plain dicts and lists"""
+    if isinstance(value, FrozenRecord):
+        return {k: thaw(v) for k, v in value._data.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def _to_plain(value: Any) -> Any:
+    """json.dump cannot serialize FrozenRecord, so thaw it if present"""
+    if isinstance(value, (FrozenRecord, tuple)):
+        return thaw(value)
+    if isinstance(value, dict):
+        return {k: _to_plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_plain(v) for v in value]
+    return value
+
+
+class _Flight:
+    """A load in progress that other readers of the same key wait on"""
+
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class VersionedCache:
+    """LRU cache whose entries are validated against file versions
+
+    - Bounded by entry count and by an approximate byte budget (the on-disk
+      size of the source files).
+    - Concurrent misses on the same key are collapsed into one load
+      (single-flight); the other callers wait for that result.
+    - Hit/miss/load/eviction counters are exposed through ``stats()``.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, Tuple[Any, Any, int, Tuple[str, ...]]]' = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._write_locks: Dict[str, threading.RLock] = {}
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'loads': 0,
+            'load_errors': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'writes': 0,
+        }
+
+    def get(self, key: str, sources: Iterable[str], loader: Callable[[], Any], size: Optional[int] = None) -> Any:
+        """Return the cached value for key, loading it if the sources changed
+
+        sources is the list of files the value is derived from; their combined
+        version is the cache validator. size overrides the byte accounting.
+        """
+        sources = tuple(sources)
+        version = tuple(file_version(path) for path in sources)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[1]
+
+            self._stats['misses'] += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self._stats['load_errors'] += 1
+                self._inflight.pop(key, None)
+            flight.error = e
+            flight.event.set()
+            raise
+
+        if size is None:
+            size = sum(v[1] for v in version if v is not None)
+
+        with self._lock:
+            self._stats['loads'] += 1
+            # Only store if the files did not change while we were loading;
+            # otherwise the next reader reloads with the newer version.
+            if tuple(file_version(path) for path in sources) == version:
+                self._store(key, sources, version, value, size)
+            self._inflight.pop(key, None)
+
+        flight.value = value
+        flight.event.set()
+        return value
+
+    def _store(self, key: str, sources: Tuple[str, ...], version: Any, value: Any, size: int) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        self._entries[key] = (version, value, size, sources)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats['evictions'] += 1
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one entry, or every entry when key is None"""
+        with self._lock:
+            if key is None:
+                self._stats['invalidations'] += len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                return
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+                self._stats['invalidations'] += 1
+
+    def invalidate_source(self, file_path: str) -> None:
+        """Drop every entry derived from file_path"""
+        with self._lock:
+            doomed = [k for k, entry in self._entries.items() if file_path in entry[3]]
+            for k in doomed:
+                self._bytes -= self._entries.pop(k)[2]
+            self._stats['invalidations'] += len(doomed)
+
+    def get_snapshot(self, file_path: str) -> Any:
+        """Return the shared, frozen contents of a JSON file (no copy)"""
+        def load():
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return freeze(json.load(f))
+        return self.get(f'json:{file_path}', (file_path,), load)
+
+    def get_json(self, file_path: str) -> Any:
+        """Return a private mutable copy of a JSON file (copy-on-read)"""
+        return thaw(self.get_snapshot(file_path))
+
+    def _write_lock(self, file_path: str) -> threading.RLock:
+        with self._lock:
+            lock = self._write_locks.get(file_path)
+            if lock is None:
+                lock = self._write_locks[file_path] = threading.RLock()
+            return lock
+
+    def write_json(self, file_path: str, data: Any) -> None:
+        """Atomically replace a JSON file and write the new value through"""
+        plain = _to_plain(data)
+        frozen = freeze(plain)
+        with self._write_lock(file_path):
+            directory = os.path.dirname(os.path.abspath(file_path))
+            fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=directory)
+            try:
+                try:
+                    mode = os.stat(file_path).st_mode & 0o777
+                except OSError:
+                    mode = 0o644
+                os.chmod(tmp_path, mode)
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(plain, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, file_path)
+            except Exception:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+            version = (file_version(file_path),)
+            self.invalidate_source(file_path)
+            with self._lock:
+                self._stats['writes'] += 1
+                self._store(f'json:{file_path}', (file_path,), version, frozen, version[0][1] if version[0] else 0)
+
+    def update_json(self, file_path: str, mutator: Callable[[Any], Any], default: Any = None) -> Any:
+        """Read-modify-write a JSON file under a per-file lock
+
+        mutator receives a private mutable copy of the current contents
+        (default only if the file does not exist) and may modify it in
+        place. The result is written atomically and becomes the cached
+        snapshot. Returns whatever mutator returned.
+
+        A file that exists but cannot be decoded raises ValueError: writing
+        default over it would throw away everything it holds.
+        """
+        with self._write_lock(file_path):
+            try:
+                data = self.get_json(file_path)
+            except FileNotFoundError:
+                data = thaw(freeze(default))
+            result = mutator(data)
+            self.write_json(file_path, data)
+            return result
+
+    def get_derived(self, name: str, sources: Iterable[str], compute: Callable[[], Any]) -> Any:
+        """Return a value computed from one or more files (e.g. dashboard stats)"""
+        sources = tuple(sources)
+        return self.get(f'derived:{name}', sources, compute, size=0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0
+        return stats
+
+
+# Shared instance used by the Flask app
+data_cache = VersionedCache()
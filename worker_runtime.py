@@ -0,0 +1,118 @@
+"""
+Persistent event loop and pooled clients for synchronous Celery tasks.
+
+Celery tasks are plain functions, but the app's Redis and database clients
+are async. Calling asyncio.run() for each operation builds and tears down an
+event loop and a fresh connection every time. WorkerRuntime instead keeps one
+loop running on a daemon thread per worker process; tasks submit coroutines
+to it with run(), and the Redis/asyncpg pools live on that loop for the life
+of the process.
+
+The runtime is fork-aware: state is created lazily and re-created if the
+process id changes, so a runtime touched in the Celery parent is never
+shared with prefork children.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+import aioredis
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerRuntime:
+    """One event loop thread plus Redis and Postgres pools per process"""
+
+    def __init__(self, redis_url: str, database_url: Optional[str] = None,
+                 redis_max_connections: int = 20, db_min_size: int = 1, db_max_size: int = 5,
+                 default_timeout: float = 30.0):
+        self.redis_url = redis_url
+        self.database_url = database_url
+        self.redis_max_connections = redis_max_connections
+        self.db_min_size = db_min_size
+        self.db_max_size = db_max_size
+        self.default_timeout = default_timeout
+        self._pid = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._redis = None
+        self._db_pool = None
+        self._db_lock: Optional[asyncio.Lock] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        if self._pid == os.getpid() and self._loop is not None:
+            return self._loop
+        with self._lock:
+            if self._pid != os.getpid() or self._loop is None:
+                # Fresh process (or first use): nothing inherited across fork is reused
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='worker-runtime', daemon=True)
+                self._thread.start()
+                self._redis = None
+                self._db_pool = None
+                self._db_lock = None
+                self._pid = os.getpid()
+        return self._loop
+
+    def start(self) -> None:
+        """Start eagerly (e.g. from Celery's worker_process_init)"""
+        self._ensure_started()
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the runtime's loop and wait for its result"""
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout if timeout is not None else self.default_timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def get_redis(self):
+        """Pooled Redis client bound to the runtime loop (call from coroutines run via run())"""
+        if self._redis is None:
+            self._redis = aioredis.from_url(
+                self.redis_url, max_connections=self.redis_max_connections, decode_responses=True
+            )
+        return self._redis
+
+    async def get_db_pool(self) -> asyncpg.Pool:
+        """asyncpg pool bound to the runtime loop, created on first use"""
+        if self.database_url is None:
+            raise RuntimeError('WorkerRuntime has no database_url configured')
+        if self._db_pool is None:
+            if self._db_lock is None:
+                self._db_lock = asyncio.Lock()
+            async with self._db_lock:
+                if self._db_pool is None:
+                    self._db_pool = await asyncpg.create_pool(
+                        self.database_url, min_size=self.db_min_size, max_size=self.db_max_size
+                    )
+        return self._db_pool
+
+    async def _close_clients(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+        if self._db_pool is not None:
+            await self._db_pool.close()
+            self._db_pool = None
+
+    def close(self) -> None:
+        """Close pools and stop the loop (worker_process_shutdown)"""
+        if self._pid != os.getpid() or self._loop is None:
+            return
+        try:
+            self.run(self._close_clients(), timeout=10)
+        except Exception as e:
+            logger.warning(f"Error closing worker runtime clients: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+        self._pid = None
@@ -6,11 +6,14 @@ Following the official Zoho OAuth2 flow for email delivery feedback
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import os
 import time
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, Optional, List
 import webbrowser
 from urllib.parse import urlencode, parse_qs, urlparse
 
@@ -18,6 +21,40 @@ from urllib.parse import urlencode, parse_qs, urlparse
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Zoho CRM API limits: stay well under the per-minute credit budget and back
+# off when the API answers 429
+API_CALLS_PER_MINUTE = 100
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_RETRY_AFTER = 60
+EMAILS_PER_PAGE = 200  # Zoho's maximum page size
+
+# Access tokens live an hour; renew this many seconds before expiry
+TOKEN_REFRESH_MARGIN = 300
+REFRESH_RETRY_BASE = 5
+REFRESH_RETRY_MAX = 120
+
+def _parse_zoho_time(value: Optional[str]) -> Optional[datetime]:
+    """Zoho timestamps are ISO 8601 with an offset (e.g. 2024-01-05T10:00:00+05:30)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def record_recipients(record: Dict) -> List[str]:
+    """Recipient addresses of an email record; 'to' is a string, a dict or a list of either"""
+    to = record.get('to')
+    items = to if isinstance(to, list) else [to]
+    recipients = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get('email')
+        if isinstance(item, str) and '@' in item:
+            recipients.append(item.strip())
+    return recipients
+
 class ZohoOAuth2Client:
     """
     Zoho CRM OAuth2 Client for proper API authentication
@@ -38,6 +75,25 @@ class ZohoOAuth2Client:
         # API endpoints
         self.api_base = "https://www.zohoapis.com"
         
+        # One pooled, keep-alive session for every API call from this account
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.min_call_interval = 60.0 / API_CALLS_PER_MINUTE
+        self._next_call_at = 0.0
+        self._throttle_lock = threading.Lock()
+        self.status_poller = None
+        
+        # Token manager: cached token, single-flight refresh, background renewal
+        self.refresh_margin = timedelta(seconds=TOKEN_REFRESH_MARGIN)
+        self.token_file: Optional[str] = None
+        self._refresh_lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._refresher_wake = threading.Event()
+        self._refresher_stop = threading.Event()
+        self._save_pending = False
+        
     def get_authorization_url(self, scopes: List[str] = None) -> str:
         """
         Generate the authorization URL for OAuth2 flow
@@ -117,6 +173,8 @@ class ZohoOAuth2Client:
                 expires_in = token_data.get('expires_in', 3600)
                 self.token_expires_at = datetime.now() + timedelta(seconds=expires_in)
                 
+                self._refresher_wake.set()
+                
                 logger.info("✅ Successfully exchanged code for tokens")
                 logger.info(f"   Access token expires at: {self.token_expires_at}")
                 
@@ -134,9 +192,17 @@ class ZohoOAuth2Client:
         """
         Refresh the access token using the refresh token
         
+        Concurrent callers are serialized, so only one refresh request is in
+        flight at a time.
+        
         Returns:
             bool: True if refresh successful
         """
+        with self._refresh_lock:
+            return self._request_new_access_token()
+    
+    def _request_new_access_token(self) -> bool:
+        """Token endpoint round trip; callers hold _refresh_lock"""
         if not self.refresh_token:
             logger.error("❌ No refresh token available")
             return False
@@ -149,7 +215,7 @@ class ZohoOAuth2Client:
                 'refresh_token': self.refresh_token
             }
             
-            response = requests.post(self.token_url, data=data, timeout=30)
+            response = self.session.post(self.token_url, data=data, timeout=30)
             
             if response.status_code == 200:
                 token_data = response.json()
@@ -161,6 +227,9 @@ class ZohoOAuth2Client:
                 logger.info("✅ Successfully refreshed access token")
                 logger.info(f"   New token expires at: {self.token_expires_at}")
                 
+                # Persisted by the refresher thread, off the caller's path
+                self._save_pending = True
+                self._refresher_wake.set()
                 return True
             else:
                 logger.error(f"❌ Failed to refresh access token: {response.status_code}")
@@ -171,25 +240,92 @@ class ZohoOAuth2Client:
             logger.error(f"❌ Error refreshing access token: {str(e)}")
             return False
     
+    def _token_is_fresh(self) -> bool:
+        """True while the token is valid for longer than the refresh margin"""
+        expires_at = self.token_expires_at
+        return bool(self.access_token) and (expires_at is None or datetime.now() + self.refresh_margin < expires_at)
+    
+    def _refresh_if_stale(self) -> bool:
+        """Single-flight refresh: whoever waited on the lock reuses the token just fetched"""
+        with self._refresh_lock:
+            if self._token_is_fresh():
+                return True
+            return self._request_new_access_token()
+    
     def get_valid_access_token(self) -> Optional[str]:
         """
         Get a valid access token, refreshing if necessary
         
+        The token is normally renewed ahead of time by the refresher thread
+        (see start_token_refresher), so this only returns the cached value.
+        
         Returns:
             Valid access token or None
         """
-        if not self.access_token:
+        access_token, expires_at = self.access_token, self.token_expires_at
+        if not access_token:
             logger.error("❌ No access token available")
             return None
         
-        # Check if token is expired (with 5 minute buffer)
-        if self.token_expires_at and datetime.now() + timedelta(minutes=5) >= self.token_expires_at:
-            logger.info("🔄 Access token expired, refreshing...")
-            if not self.refresh_access_token():
-                return None
+        now = datetime.now()
+        if expires_at is None or now + self.refresh_margin < expires_at:
+            return access_token
+        # Inside the margin but still valid: the refresher is about to renew it
+        if now < expires_at and self._refresher and self._refresher.is_alive():
+            return access_token
         
+        logger.info("🔄 Access token expired, refreshing...")
+        if not self._refresh_if_stale():
+            return None
         return self.access_token
     
+    def start_token_refresher(self, token_file: Optional[str] = "zoho_tokens.json",
+                              refresh_margin: Optional[float] = None):
+        """
+        Renew the access token refresh_margin seconds before it expires on a
+        background thread, saving refreshed tokens to token_file
+        """
+        if refresh_margin is not None:
+            self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.token_file = token_file
+        if self._refresher and self._refresher.is_alive():
+            self._refresher_wake.set()
+            return
+        self._refresher_stop.clear()
+        self._refresher = threading.Thread(target=self._run_token_refresher, name='zoho-token-refresher', daemon=True)
+        self._refresher.start()
+        logger.info(f"🔁 Token refresher started ({self.refresh_margin.total_seconds():.0f}s before expiry)")
+    
+    def stop_token_refresher(self):
+        self._refresher_stop.set()
+        self._refresher_wake.set()
+        if self._refresher:
+            self._refresher.join(timeout=5)
+    
+    def _run_token_refresher(self):
+        failures = 0
+        while not self._refresher_stop.is_set():
+            if self._save_pending and self.token_file:
+                self._save_pending = False
+                self.save_tokens(self.token_file)
+            
+            if not self.refresh_token:
+                delay = 60
+            elif self.token_expires_at is None:
+                delay = None  # No known expiry: wait until woken
+            else:
+                delay = (self.token_expires_at - self.refresh_margin - datetime.now()).total_seconds()
+                if delay <= 0:
+                    if self._refresh_if_stale():
+                        failures = 0
+                        continue
+                    failures += 1
+                    delay = min(REFRESH_RETRY_BASE * 2 ** (failures - 1), REFRESH_RETRY_MAX)
+                    logger.warning(f"⚠️ Token refresh failed, retrying in {delay:.0f}s")
+            
+            self._refresher_wake.wait(delay)
+            self._refresher_wake.clear()
+    
     def get_authorized_headers(self) -> Dict:
         """
         Get headers with valid OAuth2 token for API requests
@@ -206,6 +342,40 @@ class ZohoOAuth2Client:
             'Content-Type': 'application/json'
         }
     
+    def _throttle(self):
+        """Space API calls at least min_call_interval apart across threads"""
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_call_at - now
+            self._next_call_at = max(now, self._next_call_at) + self.min_call_interval
+        if wait > 0:
+            time.sleep(wait)
+    
+    def _api_request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Authorized, throttled request on the pooled session; retries 429s after Retry-After
+        
+        Raises:
+            RuntimeError: if there is no valid access token
+        """
+        extra_headers = kwargs.pop('headers', None) or {}
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            headers = self.get_authorized_headers()
+            if not headers:
+                raise RuntimeError('No valid access token')
+            headers.update(extra_headers)
+            self._throttle()
+            response = self.session.request(method, f"{self.api_base}{path}", headers=headers, timeout=30, **kwargs)
+            if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                return response
+            try:
+                retry_after = min(float(response.headers.get('Retry-After', 5)), MAX_RETRY_AFTER)
+            except ValueError:
+                retry_after = 5
+            logger.warning(f"⏳ Zoho API rate limit hit, retrying in {retry_after:.0f}s")
+            time.sleep(retry_after * (attempt + 1))
+        return response
+    
     def send_email(self, from_email: str, to_emails: List[str], subject: str, content: str) -> Dict:
         """
         Send email via Zoho CRM API with OAuth2 authentication
@@ -219,13 +389,7 @@ class ZohoOAuth2Client:
         Returns:
             Dict with API response
         """
-        headers = self.get_authorized_headers()
-        if not headers:
-            return {'error': 'No valid access token'}
-        
         try:
-            url = f"{self.api_base}/crm/v5/Emails"
-            
             data = {
                 "data": [{
                     "from": from_email,
@@ -235,7 +399,7 @@ class ZohoOAuth2Client:
                 }]
             }
             
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = self._api_request('POST', '/crm/v5/Emails', json=data)
             
             if response.status_code == 201:
                 result = response.json()
@@ -250,6 +414,92 @@ class ZohoOAuth2Client:
             logger.error(f"❌ Error sending email: {str(e)}")
             return {'error': str(e)}
     
+    @staticmethod
+    def _process_email_record(email: Dict) -> Dict:
+        return {
+            'id': email.get('id'),
+            'to': email.get('to'),
+            'recipients': record_recipients(email),
+            'subject': email.get('subject'),
+            'status': email.get('status'),
+            'delivery_time': email.get('delivery_time'),
+            'open_count': email.get('open_count', 0),
+            'last_open_time': email.get('last_open_time'),
+            'bounce_count': email.get('bounce_count', 0),
+            'bounce_reason': email.get('bounce_reason'),
+            'created_time': email.get('created_time'),
+            'modified_time': email.get('modified_time') or email.get('Modified_Time') or email.get('created_time')
+        }
+    
+    def iter_email_pages(self, modified_since: Optional[datetime] = None, per_page: int = EMAILS_PER_PAGE,
+                         max_pages: Optional[int] = None) -> Iterator[List[Dict]]:
+        """
+        Page through email records, oldest change first
+        
+        The list shifts while it is read (a record modified mid-scan moves to
+        the end), so page numbers are not stable. After each page the query
+        starts again from that page's newest Modified_Time; page numbers only
+        advance while a single second holds more than a page of records.
+        
+        Args:
+            modified_since: Only records changed after this time (sent as If-Modified-Since)
+            per_page: Records per request (Zoho allows up to 200)
+            max_pages: Stop after this many requests
+            
+        Yields:
+            One list of processed email records per API page, each change once
+        
+        Raises:
+            RuntimeError: on a failed request, so callers keep their position
+        """
+        since = modified_since
+        cursor: Optional[datetime] = None  # Newest Modified_Time yielded so far
+        seen_at_cursor = set()  # Ids yielded at exactly cursor; re-queries overlap it
+        page = 1
+        requests_made = 0
+        while max_pages is None or requests_made < max_pages:
+            headers = {}
+            if since:
+                if not since.tzinfo:
+                    since = since.astimezone()
+                headers['If-Modified-Since'] = since.isoformat(timespec='seconds')
+            response = self._api_request('GET', '/crm/v5/Emails', headers=headers, params={
+                'page': page,
+                'per_page': per_page,
+                'sort_by': 'Modified_Time',
+                'sort_order': 'asc'
+            })
+            requests_made += 1
+            if response.status_code in (204, 304):
+                return  # Nothing (more) changed
+            if response.status_code != 200:
+                raise RuntimeError(f'HTTP {response.status_code}: {response.text[:200]}')
+            
+            data = response.json()
+            emails = data.get('data', [])
+            page_start = cursor
+            fresh = []
+            for record in (self._process_email_record(email) for email in emails):
+                modified = _parse_zoho_time(record.get('modified_time'))
+                if cursor and modified:
+                    if modified < cursor or (modified == cursor and record.get('id') in seen_at_cursor):
+                        continue
+                if modified and (cursor is None or modified > cursor):
+                    cursor, seen_at_cursor = modified, set()
+                if modified and modified == cursor:
+                    seen_at_cursor.add(record.get('id'))
+                fresh.append(record)
+            if fresh:
+                yield fresh
+            if not emails or not data.get('info', {}).get('more_records'):
+                return
+            if cursor != page_start:
+                # Ask again from one second earlier (the API compares whole
+                # seconds); what was already yielded is skipped above
+                since, page = cursor - timedelta(seconds=1), 1
+            else:
+                page += 1
+    
     def get_email_status(self, email_id: str = None, limit: int = 100) -> Dict:
         """
         Get email delivery status and feedback from Zoho CRM API
@@ -261,40 +511,17 @@ class ZohoOAuth2Client:
         Returns:
             Dict with email status information
         """
-        headers = self.get_authorized_headers()
-        if not headers:
-            return {'error': 'No valid access token'}
-        
         try:
             if email_id:
-                url = f"{self.api_base}/crm/v5/Emails/{email_id}"
+                response = self._api_request('GET', f'/crm/v5/Emails/{email_id}')
             else:
-                url = f"{self.api_base}/crm/v5/Emails?per_page={limit}"
-            
-            response = requests.get(url, headers=headers, timeout=30)
+                response = self._api_request('GET', '/crm/v5/Emails', params={'per_page': min(limit, EMAILS_PER_PAGE)})
             
             if response.status_code == 200:
                 data = response.json()
                 logger.info(f"✅ Retrieved email status from Zoho API")
                 
-                # Process email data
-                emails = data.get('data', [])
-                processed_emails = []
-                
-                for email in emails:
-                    processed_email = {
-                        'id': email.get('id'),
-                        'to': email.get('to'),
-                        'subject': email.get('subject'),
-                        'status': email.get('status'),
-                        'delivery_time': email.get('delivery_time'),
-                        'open_count': email.get('open_count', 0),
-                        'last_open_time': email.get('last_open_time'),
-                        'bounce_count': email.get('bounce_count', 0),
-                        'bounce_reason': email.get('bounce_reason'),
-                        'created_time': email.get('created_time')
-                    }
-                    processed_emails.append(processed_email)
+                processed_emails = [self._process_email_record(email) for email in data.get('data', [])]
                 
                 return {
                     'success': True,
@@ -310,71 +537,63 @@ class ZohoOAuth2Client:
             logger.error(f"❌ Error getting email status: {str(e)}")
             return {'error': str(e)}
     
+    @staticmethod
+    def bounce_reports_from_records(records: List[Dict]) -> List[Dict]:
+        """Bounce report entries (one per recipient) for the bounced records in a page"""
+        reports = []
+        for record in records:
+            if not record.get('bounce_count'):
+                continue
+            for recipient in record.get('recipients') or [record.get('to')]:
+                reports.append({
+                    'email': recipient,
+                    'reason': record.get('bounce_reason') or 'Unknown bounce',
+                    'type': 'hard',
+                    'timestamp': record.get('created_time'),
+                    'source': 'zoho_oauth_api',
+                    'email_id': record.get('id')
+                })
+        return reports
+    
     def get_bounce_reports(self, days: int = 7) -> List[Dict]:
         """
         Get bounce reports from Zoho CRM API
         
+        Pages through every email changed in the window instead of reading a
+        single page.
+        
         Args:
             days: Number of days to look back
             
         Returns:
             List of bounce reports
         """
-        headers = self.get_authorized_headers()
-        if not headers:
-            return []
-        
         try:
-            # Get emails from the last N days
-            url = f"{self.api_base}/crm/v5/Emails?per_page=200"
+            cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+            bounce_reports = []
+            for records in self.iter_email_pages(modified_since=cutoff):
+                recent = [r for r in records if (_parse_zoho_time(r.get('created_time')) or cutoff) >= cutoff]
+                bounce_reports.extend(self.bounce_reports_from_records(recent))
             
-            response = requests.get(url, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                emails = data.get('data', [])
-                
-                # Filter for bounced emails
-                bounce_reports = []
-                cutoff_date = datetime.now() - timedelta(days=days)
-                
-                for email in emails:
-                    # Check if email has bounced
-                    if email.get('bounce_count', 0) > 0:
-                        created_time = email.get('created_time')
-                        if created_time:
-                            try:
-                                email_date = datetime.fromisoformat(created_time.replace('Z', '+00:00'))
-                                if email_date >= cutoff_date:
-                                    bounce_reports.append({
-                                        'email': email.get('to'),
-                                        'reason': email.get('bounce_reason', 'Unknown bounce'),
-                                        'type': 'hard' if email.get('bounce_count', 0) > 0 else 'soft',
-                                        'timestamp': created_time,
-                                        'source': 'zoho_oauth_api',
-                                        'email_id': email.get('id')
-                                    })
-                            except:
-                                # If date parsing fails, include anyway
-                                bounce_reports.append({
-                                    'email': email.get('to'),
-                                    'reason': email.get('bounce_reason', 'Unknown bounce'),
-                                    'type': 'hard' if email.get('bounce_count', 0) > 0 else 'soft',
-                                    'timestamp': created_time,
-                                    'source': 'zoho_oauth_api',
-                                    'email_id': email.get('id')
-                                })
-                
-                logger.info(f"📊 Retrieved {len(bounce_reports)} bounce reports from Zoho OAuth API")
-                return bounce_reports
-            else:
-                logger.error(f"❌ Failed to get bounce reports: {response.status_code}")
-                return []
+            logger.info(f"📊 Retrieved {len(bounce_reports)} bounce reports from Zoho OAuth API")
+            return bounce_reports
                 
         except Exception as e:
             logger.error(f"❌ Error getting bounce reports: {str(e)}")
             return []
     
+    def start_status_poller(self, state_file: str = "zoho_status_poller.json",
+                            interval: float = 60.0) -> 'ZohoStatusPoller':
+        """Start (or return) this account's single status poller
+
+        Nothing in the app calls this; it is for callers that build their own
+        client and hand the poller to email_tracker.initialize_email_tracker().
+        """
+        if self.status_poller is None:
+            self.status_poller = ZohoStatusPoller(self, state_file, interval)
+        self.status_poller.start()
+        return self.status_poller
+    
     def save_tokens(self, filepath: str = "zoho_tokens.json"):
         """
         Save tokens to file for persistence
@@ -393,8 +612,16 @@ class ZohoOAuth2Client:
                 'saved_at': datetime.now().isoformat()
             }
             
-            with open(filepath, 'w') as f:
+            # Write a private temp file and rename it over the old one, so a
+            # crash never leaves a half-written token file
+            directory = os.path.dirname(os.path.abspath(filepath))
+            tmp_path = os.path.join(directory, f".{os.path.basename(filepath)}.{os.getpid()}.{threading.get_ident()}.tmp")
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
                 json.dump(token_data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
             
             logger.info(f"✅ Tokens saved to {filepath}")
             
@@ -421,6 +648,7 @@ class ZohoOAuth2Client:
             expires_at = token_data.get('token_expires_at')
             if expires_at:
                 self.token_expires_at = datetime.fromisoformat(expires_at)
+            self._refresher_wake.set()  # Reschedule a running refresher for the loaded expiry
             
             logger.info(f"✅ Tokens loaded from {filepath}")
             return True
@@ -432,6 +660,144 @@ class ZohoOAuth2Client:
             logger.error(f"❌ Error loading tokens: {str(e)}")
             return False
 
+class ZohoStatusPoller:
+    """
+    One background poller per Zoho account for delivery/bounce feedback
+    
+    Each cycle pages through the email records changed since a stored
+    high-water mark (the newest Modified_Time seen) and hands every page to
+    the registered listeners, so one API request updates up to 200
+    recipients. The mark advances and is saved only after every listener
+    has accepted a page, so a restart resumes where polling stopped, and a
+    page a listener failed on is delivered again on the next cycle
+    (listeners must therefore tolerate seeing a record twice).
+    """
+    
+    def __init__(self, client: ZohoOAuth2Client, state_file: str = "zoho_status_poller.json",
+                 interval: float = 60.0, initial_lookback: timedelta = timedelta(days=1)):
+        self.client = client
+        self.state_file = state_file
+        self.interval = interval
+        self.initial_lookback = initial_lookback
+        self.listeners: List[Callable[[List[Dict]], None]] = []
+        self.high_water: Optional[datetime] = None
+        self._seen_at_mark = set()  # Record ids at exactly high_water, already delivered
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.polls = 0
+        self.records_seen = 0
+        self.last_poll_at = None
+        self.last_error = None
+        self._load_state()
+    
+    def add_listener(self, callback: Callable[[List[Dict]], None]):
+        """Register a callback that receives each page of changed email records"""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+    
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            self.high_water = _parse_zoho_time(state.get('high_water'))
+            self._seen_at_mark = set(state.get('seen_at_mark', []))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read poller state {self.state_file}: {str(e)}")
+    
+    def _save_state(self):
+        state = {
+            'high_water': self.high_water.isoformat() if self.high_water else None,
+            'seen_at_mark': sorted(self._seen_at_mark),
+            'saved_at': datetime.now().isoformat()
+        }
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_file)
+    
+    def poll_once(self) -> int:
+        """Fetch everything changed since the high-water mark; returns the number of new records
+
+        Raises the first listener error, leaving the mark before the failed page.
+        """
+        with self._lock:
+            since = self.high_water or datetime.now(timezone.utc) - self.initial_lookback
+            # Ask from one second earlier: the API compares whole seconds, and
+            # records already delivered at the mark are skipped below
+            since -= timedelta(seconds=1)
+            delivered = 0
+            try:
+                for records in self.client.iter_email_pages(modified_since=since):
+                    # The page's mark is worked out on the side and kept only
+                    # once every listener has taken the page
+                    high_water, seen_at_mark = self.high_water, set(self._seen_at_mark)
+                    fresh = []
+                    for record in records:
+                        modified = _parse_zoho_time(record.get('modified_time'))
+                        if modified is None:
+                            fresh.append(record)
+                            continue
+                        if high_water and modified <= high_water:
+                            if modified < high_water or record.get('id') in seen_at_mark:
+                                continue
+                        if not high_water or modified > high_water:
+                            high_water = modified
+                            seen_at_mark = set()
+                        seen_at_mark.add(record.get('id'))
+                        fresh.append(record)
+                    
+                    if fresh:
+                        for listener in self.listeners:
+                            try:
+                                listener(fresh)
+                            except Exception as e:
+                                logger.error(f"❌ Status poller listener failed, page will be retried: {str(e)}")
+                                raise
+                        delivered += len(fresh)
+                    self.high_water, self._seen_at_mark = high_water, seen_at_mark
+                    self._save_state()
+            finally:
+                self.polls += 1
+                self.records_seen += delivered
+                self.last_poll_at = datetime.now().isoformat()
+            return delivered
+    
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='zoho-status-poller', daemon=True)
+        self._thread.start()
+        logger.info(f"📡 Zoho status poller started (every {self.interval:.0f}s)")
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"❌ Zoho status poll failed: {str(e)}")
+            self._stop.wait(self.interval)
+    
+    def stats(self) -> Dict:
+        return {
+            'high_water': self.high_water.isoformat() if self.high_water else None,
+            'polls': self.polls,
+            'records_seen': self.records_seen,
+            'last_poll_at': self.last_poll_at,
+            'last_error': self.last_error,
+            'listeners': len(self.listeners)
+        }
+
 # Global OAuth2 client instance
 zoho_oauth_client = None
 
@@ -463,6 +829,7 @@ def setup_zoho_oauth_flow(client_id: str, client_secret: str, redirect_uri: str
     # Try to load existing tokens
     if zoho_oauth_client.load_tokens():
         logger.info("✅ Loaded existing tokens")
+        zoho_oauth_client.start_token_refresher()
         return zoho_oauth_client
     
     # Generate authorization URL
@@ -500,6 +867,7 @@ def complete_oauth_setup(grant_code: str):
     if token_data:
         # Save tokens for future use
         zoho_oauth_client.save_tokens()
+        zoho_oauth_client.start_token_refresher()
         logger.info("✅ OAuth2 setup completed successfully")
         return True
     else: